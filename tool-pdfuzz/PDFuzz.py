@@ -15,8 +15,12 @@ import logging
 import time
 import argparse
 import pdfuzz.core.fuzzengine as fuzzengine
+import pdfuzz.core.threadengine as threadengine
 import pdfuzz.core.db_connection as db_connection
+import pdfuzz.core.spool as Spool
+import pdfuzz.core.phantomconnection as phantomconnection
 import pdfuzz.config.config as cfg
+import pdfuzz.config.navscrapers.api.timing as Timing
 
 
 # global variables
@@ -25,6 +29,27 @@ VERSION           = "0.1"
 VERSION_INFO      = "PDFuzz v{version}".format(version=VERSION)
 
 
+def positive_float(value):
+    ##
+    #   Argument type for numbers that have to be greater than zero.
+    #
+    #   @param {string} value - Value from the commandline.
+    #
+    #   @return {float}
+    #
+
+    try:
+        number = float(value)
+
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid number: '{0}'".format(value))
+
+    if number <= 0:
+        raise argparse.ArgumentTypeError("has to be greater than 0: '{0}'".format(value))
+
+    return number
+
+
 def parse_commandline_arguments():
     ##
     #   Parses the commandline arguments.
@@ -36,21 +61,61 @@ def parse_commandline_arguments():
         description="This is PDFuzz. A tool to find price discrimination in e-commerce websites based on the device fingerprint.",
     )
 
-    # Create a default name for the results table.
+    # Create a default name for the run.
     default_results_table_name = "pdfuzz_results_{time}".format(
         time=time.strftime("%Y%m%d%H%M", time.gmtime())
     )
 
-    # Handle the parameter to set a name for the result table.
+    # Handle the parameter to set a name for the run.
     parser.add_argument(
         "-r",
         "--rename-table",
         action="store",
         dest="result_table_name",
-        help="change the table name for the results. A valid string for a MySQL table name is required.",
+        help="change the name of the run in the run catalog. The name must not belong to an existing run (see --resume and --drop-run).",
         default=default_results_table_name
     )
 
+    # Handle the parameter to resume an interrupted run.
+    parser.add_argument(
+        "--resume",
+        action="store",
+        dest="resume_run",
+        metavar="RUN",
+        help="resume the run with the given name. Tasks that were completed are skipped.",
+        default=None
+    )
+
+    # Handle the parameter to delete a run.
+    parser.add_argument(
+        "--drop-run",
+        action="store",
+        dest="drop_run",
+        metavar="RUN",
+        help="delete the results and the task states of the run with the given name and exit.",
+        default=None
+    )
+
+    # Handle the parameter to print the timing report of a run.
+    parser.add_argument(
+        "--timing-report",
+        action="store",
+        dest="timing_report_run",
+        metavar="RUN",
+        help="print the p50/p95 durations of the scan stages per website of the run with the given name and exit.",
+        default=None
+    )
+
+    # Handle the parameter to print the price report of a run.
+    parser.add_argument(
+        "--price-report",
+        action="store",
+        dest="price_report_run",
+        metavar="RUN",
+        help="print the products with the highest price spread and the price offset of the fingerprints of the run with the given name and exit. Requires numpy.",
+        default=None
+    )
+
     # Handle the parameter to set a name for the fingerprint table.
     parser.add_argument(
         "-f",
@@ -61,6 +126,109 @@ def parse_commandline_arguments():
         default=cfg.FINGERPRINT_TABLE_NAME
     )
 
+    # Handle the parameters to filter the fingerprints.
+    parser.add_argument(
+        "--fp-min-id",
+        dest="fingerprint_min_id",
+        type=int,
+        default=cfg.FINGERPRINT_MIN_ID,
+        help="scan only fingerprints with an id greater than or equal to this value."
+    )
+
+    parser.add_argument(
+        "--fp-max-id",
+        dest="fingerprint_max_id",
+        type=int,
+        default=cfg.FINGERPRINT_MAX_ID,
+        help="scan only fingerprints with an id less than or equal to this value."
+    )
+
+    parser.add_argument(
+        "--fp-sample-rate",
+        dest="fingerprint_sample_rate",
+        type=float,
+        default=cfg.FINGERPRINT_SAMPLE_RATE,
+        help="scan a deterministic sample of the fingerprints, e.g. 0.1 for about 10%% (default: {0})".format(cfg.FINGERPRINT_SAMPLE_RATE)
+    )
+
+    # Handle the parameter to set a file with fixed exchange rates.
+    parser.add_argument(
+        "--exchange-rates",
+        action="store",
+        dest="exchange_rates_file",
+        help="use the exchange rates of a JSON file (i.e. {\"USD\": 0.92}) instead of requesting them.",
+        default=cfg.EXCHANGE_RATES_OFFLINE_FILE
+    )
+
+    # Handle the parameter to set the browser engine of the webdriver servers.
+    parser.add_argument(
+        "--driver-backend",
+        action="store",
+        dest="driver_backend",
+        help="set the browser engine of the webdriver servers (default: {0})".format(cfg.DRIVER_BACKEND),
+        choices=phantomconnection.DRIVER_BACKENDS,
+        default=cfg.DRIVER_BACKEND
+    )
+
+    # Handle the parameter to set the fuzzing engine.
+    parser.add_argument(
+        "--engine",
+        action="store",
+        dest="fuzzing_engine",
+        help="run every webdriver session in its own process or all sessions as threads of one process (default: {0})".format(cfg.FUZZING_ENGINE),
+        choices=["process", "thread"],
+        default=cfg.FUZZING_ENGINE
+    )
+
+    # Handle the parameter to record the pages for the offline replay.
+    parser.add_argument(
+        "--record",
+        action="store",
+        dest="record_dir",
+        metavar="DIR",
+        help="record the pages and XHR responses of every scan into DIR for the offline replay.",
+        default=cfg.RECORD_DIR
+    )
+
+    # Handle the parameter to collect the pages of the scraping benchmark.
+    parser.add_argument(
+        "--dump-pages",
+        action="store",
+        dest="page_dump_dir",
+        metavar="DIR",
+        help="save every page that a scraping routine receives into the corpus DIR of the scraping benchmark.",
+        default=cfg.PAGE_DUMP_DIR
+    )
+
+    # Handle the parameter to spool the results on the local disk.
+    parser.add_argument(
+        "--spool",
+        action="store",
+        dest="spool_dir",
+        metavar="DIR",
+        help="append the results to spool files in DIR, which are loaded into the database by a separate ingestion thread.",
+        default=cfg.SPOOL_DIR
+    )
+
+    # Handle the parameter to load the remaining spool files of a run.
+    parser.add_argument(
+        "--ingest-spool",
+        action="store",
+        dest="ingest_spool_run",
+        metavar="RUN",
+        help="load the spool files of the run with the given name from the --spool directory into the database and exit.",
+        default=None
+    )
+
+    # Handle the parameter to set the port of the metrics server.
+    parser.add_argument(
+        "--metrics-port",
+        dest="metrics_port",
+        type=int,
+        default=cfg.METRICS_PORT,
+        help="set the port of the HTTP server with the live metrics, 0 = off (default: {0})".format(cfg.METRICS_PORT)
+    )
+
     # Handle the parameter to use the debug mode for the log file.
     parser.add_argument(
         "--debug",
@@ -71,14 +239,14 @@ def parse_commandline_arguments():
         help="enable debug information."
     )
 
-    # Handle the parameter to set the anti ddos delay.
+    # Handle the parameter to set the anti ddos rate limit.
     parser.add_argument(
         "-a",
-        "--anti-ddos-delay",
-        dest="anti_ddos_delay",
-        type=int,
-        default=cfg.ANTI_DDOS_DELAY_SECONDS,
-        help="set the anti DDoS delay in seconds (default: {0})".format(cfg.ANTI_DDOS_DELAY_SECONDS)
+        "--anti-ddos-rate",
+        dest="anti_ddos_rate",
+        type=positive_float,
+        default=cfg.HOST_REQUESTS_PER_MINUTE,
+        help="set the maximal number of requests per minute for a single host (default: {0})".format(cfg.HOST_REQUESTS_PER_MINUTE)
     )
 
     # Handle the parameter to set the timeout limit.
@@ -126,25 +294,32 @@ def parse_commandline_arguments():
 
     settings = parser.parse_args()
 
-    if settings.result_table_name == "fingerprints" or \
-        settings.result_table_name == "product" or \
-        settings.result_table_name == "search_parameters":
-
-        print("ERROR: The table names 'fingerprints', 'product' and 'search_parameters' are reserved!")
+    if not 0.0 < settings.fingerprint_sample_rate <= 1.0:
+        print("ERROR: The sample rate has to be in the range (0, 1]!")
         exit(2)
 
+    if settings.resume_run is not None:
+        # The run is identified by its name in the run catalog.
+        settings.result_table_name = settings.resume_run
+
     return settings
 
 
-def init_database(new_results_table_name, website_type):
+def init_database(run_name, website_type, fingerprint_table_name, resume=False):
     ##
     #   Initializes the several tables in the MySQL database to store the reqults
     #   of the fuzzing routine. This is done, using the sql file in the db_setup
     #   directory. Every line holds a single command to initialize the database.
+    #   The results of all runs of a website type are stored in one table,
+    #   which has a partition per run.
     #
-    #   @param {string} new_results_table_name - Name of the results table in
-    #   the database.
+    #   @param {string} run_name - Name of the run in the run catalog.
     #   @param {string} website_type - Type of the website. Example: 'hotels'.
+    #   @param {string} fingerprint_table_name - Name of the fingerprint table
+    #   of the run.
+    #   @param {bool} resume - (optional) If True, the existing results and
+    #   the scan ledger of the run are kept. Otherwise the run must not exist
+    #   in the run catalog.
     #
 
     # Init database connection
@@ -154,23 +329,108 @@ def init_database(new_results_table_name, website_type):
         mode="init"
     )
 
-    # Determine path to commands file.
-    init_commands_filename = \
-        "{current_dir}/pdfuzz/config/db_setup/prepare_storage.sql".format(
-            current_dir=PACKAGE_DIRECTORY
-        )
+    # Init the scan ledger, which records the state of every task.
+    db_manager.init_storage_tables(commands_filename=os.path.join(
+        PACKAGE_DIRECTORY, "pdfuzz", "config", "db_setup", "prepare_ledger.sql"))
 
-    # Init the storage tables.
-    db_manager.init_storage_tables(commands_filename=init_commands_filename)
+    # Init the storage tables. Existing tables are kept.
+    db_manager.init_storage_tables(commands_filename=os.path.join(
+        PACKAGE_DIRECTORY, "pdfuzz", "config", "db_setup", "prepare_storage.sql"))
 
-    # Rename the results table.
-    old_results_table_name = "pdfuzz_results_" + website_type
-    db_manager.rename_table(old_name=old_results_table_name, new_name=new_results_table_name)
+    if resume:
+
+        run = db_manager.get_run(run_name)
+
+        if run is None or run["website_type"] != website_type:
+            print("ERROR: The run '{0}' can not be resumed. It is not a {1} run of the run catalog!".format(
+                run_name, website_type))
+            db_manager.close()
+            exit(2)
+
+        logging.info("[*] Resuming run '{0}'.".format(run_name))
+
+    else:
+
+        # Never replace an old run with the same name implicitly.
+        if db_manager.get_run(run_name) is not None:
+            print("ERROR: The run '{0}' already exists. Resume it with --resume {0} or delete it with --drop-run {0}.".format(
+                run_name))
+            db_manager.close()
+            exit(2)
+
+        # Forget the tasks of a run from before the run catalog.
+        db_manager.clear_scan_ledger(run_name=run_name)
+
+        # Add the run to the run catalog. Every result row refers to it.
+        db_manager.register_run(
+            run_name=run_name,
+            fingerprint_table_name=fingerprint_table_name
+        )
 
     # close database connection.
     db_manager.close()
 
 
+def drop_run(run_name):
+    ##
+    #   Deletes the results, the catalog entry and the task states of a run.
+    #
+    #   @param {string} run_name - Name of the run.
+    #
+
+    db_manager = db_connection.DBManager(
+        settings=cfg.MYSQL,
+        website_type=None,
+        mode="init"
+    )
+
+    try:
+        if not db_manager.drop_run(run_name=run_name):
+            print("ERROR: Unknown run: '{0}'".format(run_name))
+            exit(2)
+
+        print("[*] Run '{0}' dropped.".format(run_name))
+        logging.info("[*] Run '{0}' dropped.".format(run_name))
+
+    finally:
+        db_manager.close()
+
+
+def ingest_spool(run_name, spool_dir):
+    ##
+    #   Loads the spool segments of a run into the database, e.g. after the
+    #   database was not available at the end of the run. No worker may
+    #   write into the spool of the run meanwhile.
+    #
+    #   @param {string} run_name - Name of the run.
+    #   @param {string} spool_dir - Spool directory.
+    #
+
+    if spool_dir is None:
+        print("ERROR: The spool directory is required (--spool DIR).")
+        exit(2)
+
+    spool_ingestor = Spool.SpoolIngestor(
+        db_manager=db_connection.DBManager(
+            settings=cfg.MYSQL,
+            website_type=None,
+            mode="ingest",
+            run_name=run_name
+        ),
+        spool_dir=Spool.get_run_spool_dir(spool_dir, run_name),
+        interval=cfg.SPOOL_INGEST_INTERVAL
+    )
+
+    loaded_segments = spool_ingestor.ingest(include_open=True)
+    remaining_segments = len(Spool.get_segment_filenames(spool_ingestor.spool_dir, include_open=True))
+
+    print("[*] {loaded} spool segments loaded, {remaining} remaining.".format(
+        loaded=loaded_segments, remaining=remaining_segments))
+
+    if remaining_segments > 0:
+        exit(1)
+
+
 def init_logging(log_prefix, log_filename, log_level):
     ##
     #   Configures the logging environment.
@@ -223,10 +483,20 @@ def init_config_parameters(cl_settings):
     #   @param {arparse.results} cl_settings - Object with the parsed command-
     #   line arguments.
 
-    cfg.ANTI_DDOS_DELAY_SECONDS = cl_settings.anti_ddos_delay
-    cfg.TIMEOUT_LIMIT           = cl_settings.timeout_limit
-    cfg.PAGE_LOAD_TIMEOUT       = cl_settings.page_load_timeout
-    cfg.FINGERPRINT_TABLE_NAME  = cl_settings.fingerprint_table_name
+    cfg.HOST_REQUESTS_PER_MINUTE = cl_settings.anti_ddos_rate
+    cfg.TIMEOUT_LIMIT            = cl_settings.timeout_limit
+    cfg.PAGE_LOAD_TIMEOUT        = cl_settings.page_load_timeout
+    cfg.FINGERPRINT_TABLE_NAME   = cl_settings.fingerprint_table_name
+    cfg.FINGERPRINT_MIN_ID       = cl_settings.fingerprint_min_id
+    cfg.FINGERPRINT_MAX_ID       = cl_settings.fingerprint_max_id
+    cfg.FINGERPRINT_SAMPLE_RATE  = cl_settings.fingerprint_sample_rate
+    cfg.EXCHANGE_RATES_OFFLINE_FILE = cl_settings.exchange_rates_file
+    cfg.DRIVER_BACKEND           = cl_settings.driver_backend
+    cfg.FUZZING_ENGINE           = cl_settings.fuzzing_engine
+    cfg.METRICS_PORT             = cl_settings.metrics_port or None
+    cfg.RECORD_DIR               = cl_settings.record_dir
+    cfg.PAGE_DUMP_DIR            = cl_settings.page_dump_dir
+    cfg.SPOOL_DIR                = cl_settings.spool_dir
 
 
 def init(cl_settings):
@@ -251,8 +521,10 @@ def init(cl_settings):
     )
     init_phantomjs()
     init_database(
-        new_results_table_name=cl_settings.result_table_name,
-        website_type=cl_settings.target_website_type
+        run_name=cl_settings.result_table_name,
+        website_type=cl_settings.target_website_type,
+        fingerprint_table_name=cl_settings.fingerprint_table_name,
+        resume=cl_settings.resume_run is not None
     )
     init_config_parameters(cl_settings)
 
@@ -298,6 +570,31 @@ def main():
     # Parse possible command-line arguments.
     cl_settings = parse_commandline_arguments()
 
+    if cl_settings.timing_report_run is not None:
+        timing_log_filename = fuzzengine.get_timing_log_filename(cl_settings.timing_report_run)
+
+        if not os.path.isfile(timing_log_filename):
+            print("ERROR: No timing log found: '{0}'".format(timing_log_filename))
+            exit(2)
+
+        Timing.print_report(timing_log_filename)
+        return
+
+    if cl_settings.drop_run is not None:
+        drop_run(cl_settings.drop_run)
+        return
+
+    if cl_settings.ingest_spool_run is not None:
+        ingest_spool(run_name=cl_settings.ingest_spool_run, spool_dir=cl_settings.spool_dir)
+        return
+
+    if cl_settings.price_report_run is not None:
+        # NumPy is only required for the analysis.
+        import pdfuzz.analysis.price_matrix as price_matrix
+
+        price_matrix.print_report(cl_settings.price_report_run)
+        return
+
     # Initialize the fuzzing environment.
     init(cl_settings=cl_settings)
 
@@ -309,7 +606,10 @@ def main():
     )
 
     # Start Fuzzing.
-    fuzzengine.start_fuzzing(cl_settings=cl_settings, search_parameters_id=search_parameters_id)
+    if cfg.FUZZING_ENGINE == "thread":
+        threadengine.start_fuzzing(cl_settings=cl_settings, search_parameters_id=search_parameters_id)
+    else:
+        fuzzengine.start_fuzzing(cl_settings=cl_settings, search_parameters_id=search_parameters_id)
 
 
 if __name__ == '__main__':
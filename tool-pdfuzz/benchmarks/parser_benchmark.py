@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   Benchmark of the HTML parser backends. A scraping routine of a NavScraper
+#   is run over saved result pages with every available backend. The script
+#   reports the time per page and checks that all backends extract the same
+#   rows.
+#
+#   Example:
+#   python benchmarks/parser_benchmark.py booking _default_scraping_routine \
+#       benchmarks/pages/booking/_default_scraping_routine/*.html
+#
+#   @date   18.10.2026
+#
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+# Make the pdfuzz package importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
+
+
+def parse_commandline_arguments():
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the HTML parser backends for the scraping routines.",
+    )
+
+    parser.add_argument(
+        "navscraper",
+        help="name of the NavScraper module without the '_navscraper' suffix. Example: hotels"
+    )
+
+    parser.add_argument(
+        "routine",
+        help="name of the scraping routine. Example: _scraping_routine"
+    )
+
+    parser.add_argument(
+        "pages",
+        nargs="+",
+        help="saved result pages."
+    )
+
+    parser.add_argument(
+        "-n",
+        "--repetitions",
+        dest="repetitions",
+        type=int,
+        default=5,
+        help="number of runs over all pages (default: 5)"
+    )
+
+    return parser.parse_args()
+
+
+def load_pages(filenames):
+
+    pages = []
+
+    for filename in filenames:
+        with open(filename, "r") as page_file:
+            pages.append(page_file.read().decode("utf-8"))
+
+    return pages
+
+
+def strip_volatile_fields(rows):
+    ##
+    #   Removes the fields that differ between two runs.
+    #
+
+    return [
+        dict((key, value) for key, value in row.items() if key not in ["access_time"])
+        for row in rows
+    ]
+
+
+def run_benchmark(scraping_routine, pages, repetitions):
+    ##
+    #   Runs the scraping routine over all pages.
+    #
+    #   @return {float} seconds per page, {list} rows of the last run.
+    #
+
+    rows = []
+
+    start = time.time()
+
+    for _ in range(repetitions):
+        rows = []
+        for page_source in pages:
+            rows.extend(scraping_routine(page_source=page_source))
+
+    duration = time.time() - start
+
+    return duration / (repetitions * len(pages)), strip_volatile_fields(rows)
+
+
+def main():
+
+    settings = parse_commandline_arguments()
+
+    # Use fixed exchange rates, so that the benchmark does not request the
+    # network.
+    CurrencyConverter.EXCHANGE_RATES_OFFLINE = True
+    for currency_code in CurrencyConverter.CURRENCY_CODES:
+        CurrencyConverter.EXCHANGE_RATES[currency_code] = 1.0
+
+    navscraper_module = importlib.import_module(
+        "pdfuzz.config.navscrapers.{0}_navscraper".format(settings.navscraper))
+    navscraper = navscraper_module.NavScraper()
+    scraping_routine = getattr(navscraper, settings.routine)
+
+    pages = load_pages(settings.pages)
+
+    backends = ["bs4"]
+    if Parser.LXML_AVAILABLE:
+        backends.append("lxml")
+
+    results = {}
+
+    for backend in backends:
+        Parser.set_backend(backend)
+        seconds_per_page, rows = run_benchmark(
+            scraping_routine=scraping_routine,
+            pages=pages,
+            repetitions=settings.repetitions
+        )
+        results[backend] = (seconds_per_page, rows)
+
+        print("{backend:5} {ms:10.2f} ms/page {rows:6} rows".format(
+            backend=backend,
+            ms=seconds_per_page * 1000,
+            rows=len(rows)
+        ))
+
+    if "lxml" in results:
+        print("Speedup lxml: {0:.2f}x".format(results["bs4"][0] / results["lxml"][0]))
+
+        if results["bs4"][1] != results["lxml"][1]:
+            print("WARNING: The backends extracted different rows!")
+            exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   Offline benchmark of the navigation and scraping routines. Every
+#   recording (see PDFuzz.py --record) is served by a ReplayServer, which is
+#   the proxy of the browser, so that no request reaches the target website.
+#   The NavScraper navigates from the recorded entry page and scrapes the
+#   recorded result page. The script reports the time per navigation and per
+#   scraping and compares the rows with the recorded rows.
+#
+#   Requires a running webdriver server, e.g. "phantomjs --webdriver=8910".
+#
+#   Example:
+#   python benchmarks/replay_benchmark.py recordings/*
+#
+#   @date   18.10.2026
+#
+
+import os
+import sys
+import time
+import argparse
+import importlib
+
+# Make the pdfuzz package importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import selenium.webdriver
+
+import pdfuzz.core.replay as replay
+import pdfuzz.core.phantomconnection as phanconn
+import pdfuzz.selenium_extension.expected_conditions as MyEC
+import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
+
+
+def parse_commandline_arguments():
+
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark of the navigation and scraping routines with recorded pages.",
+    )
+
+    parser.add_argument(
+        "recordings",
+        nargs="+",
+        help="directories of the recordings."
+    )
+
+    parser.add_argument(
+        "-w",
+        "--webdriver",
+        dest="webdriver",
+        default="127.0.0.1:8910",
+        help="address of the webdriver server (default: 127.0.0.1:8910)"
+    )
+
+    parser.add_argument(
+        "--driver-backend",
+        dest="driver_backend",
+        choices=phanconn.DRIVER_BACKENDS,
+        default="phantomjs",
+        help="browser engine of the webdriver server (default: phantomjs)"
+    )
+
+    parser.add_argument(
+        "-n",
+        "--repetitions",
+        dest="repetitions",
+        type=int,
+        default=3,
+        help="number of runs per recording (default: 3)"
+    )
+
+    parser.add_argument(
+        "--skip-navigation",
+        dest="skip_navigation",
+        action="store_true",
+        help="benchmark only the scraping routines."
+    )
+
+    return parser.parse_args()
+
+
+def create_phantom_wrapper(settings, replay_server):
+    ##
+    #   Creates the wrapper of the webdriver server and the dcap, which use
+    #   the replay server as proxy.
+    #
+    #   @return {PhantomWrapper}, {dict} dcap
+    #
+
+    ip, port = settings.webdriver.split(":")
+
+    if settings.driver_backend == "chromium":
+        phw = phanconn.ChromiumWrapper(
+            remote_webdriver_ip=ip,
+            remote_webdriver_port=int(port),
+            proxy_ip=replay_server.host,
+            proxy_port=replay_server.port
+        )
+        dcap = dict(selenium.webdriver.DesiredCapabilities.CHROME)
+        dcap["phantomjs.page.onInitialized.jsInject"] = MyEC.NETWORK_MONITOR_INSTALL_SCRIPT
+        return phw, dcap
+
+    phw = phanconn.PhantomWrapper(remote_webdriver_ip=ip, remote_webdriver_port=int(port))
+
+    dcap = dict(selenium.webdriver.DesiredCapabilities.PHANTOMJS)
+    dcap["proxy"] = {
+        "proxyType": "MANUAL",
+        "httpProxy": replay_server.get_proxy_address(),
+        "sslProxy": replay_server.get_proxy_address(),
+    }
+
+    # Monitor the requests of every document like in a scan.
+    dcap["phantomjs.page.onInitialized.jsInject"] = MyEC.NETWORK_MONITOR_INSTALL_SCRIPT
+
+    return phw, dcap
+
+
+def run_recording(settings, recording_dir):
+    ##
+    #   Runs the NavScraper of a recording against the replay server.
+    #
+    #   @return {dict} Statistics of the runs.
+    #
+
+    manifest = replay.load_recording(recording_dir)
+
+    module_name, class_name = manifest["navscraper"].rsplit(".", 1)
+    navscraper = getattr(importlib.import_module(module_name), class_name)()
+
+    replay_server = replay.ReplayServer(recording_dir)
+    replay_server.start()
+
+    phw, dcap = create_phantom_wrapper(settings, replay_server)
+
+    statistics = {
+        "navigation_seconds": [],
+        "navigation_successful": 0,
+        "scraping_seconds": [],
+        "rows": None,
+    }
+
+    try:
+        for _ in range(settings.repetitions):
+
+            phw.connect(dcap=dcap)
+            driver = phw.get_driver()
+
+            if not settings.skip_navigation:
+                driver.get(replay_server.get_step_url("entry"))
+
+                start = time.time()
+                nav_status = navscraper.navigate_to_results(
+                    driver=driver,
+                    search_parameters=manifest["search_parameters"]
+                )
+                statistics["navigation_seconds"].append(time.time() - start)
+
+                if nav_status:
+                    statistics["navigation_successful"] += 1
+
+            driver.get(replay_server.get_step_url("results"))
+
+            start = time.time()
+            rows = navscraper.scrape_results(driver=driver)
+            statistics["scraping_seconds"].append(time.time() - start)
+            statistics["rows"] = len(rows or [])
+
+            phw.release()
+
+    finally:
+        phw.disconnect()
+        replay_server.stop()
+
+    statistics["recorded_rows"] = len(manifest["rows"] or [])
+
+    return statistics
+
+
+def median(values):
+
+    if len(values) == 0:
+        return float("nan")
+
+    values = sorted(values)
+
+    return values[len(values) // 2]
+
+
+def main():
+
+    settings = parse_commandline_arguments()
+
+    # Use fixed exchange rates, so that the benchmark does not request the
+    # network.
+    CurrencyConverter.EXCHANGE_RATES_OFFLINE = True
+    for currency_code in CurrencyConverter.CURRENCY_CODES:
+        CurrencyConverter.EXCHANGE_RATES[currency_code] = 1.0
+
+    print("{name:35} {nav:>12} {nav_ok:>7} {scraping:>14} {rows:>6} {recorded:>9}".format(
+        name="recording", nav="navigation", nav_ok="nav ok", scraping="scraping", rows="rows", recorded="recorded"))
+
+    rows_differ = False
+
+    for recording_dir in settings.recordings:
+
+        if not os.path.isfile(os.path.join(recording_dir, replay.MANIFEST_FILENAME)):
+            # The recorded scan did not finish.
+            continue
+
+        statistics = run_recording(settings, recording_dir)
+
+        print("{name:35} {nav:10.2f} s {nav_ok:7} {scraping:12.2f} s {rows:6} {recorded:9}".format(
+            name=os.path.basename(os.path.normpath(recording_dir)),
+            nav=median(statistics["navigation_seconds"]),
+            nav_ok="{0}/{1}".format(statistics["navigation_successful"], len(statistics["navigation_seconds"])),
+            scraping=median(statistics["scraping_seconds"]),
+            rows=statistics["rows"],
+            recorded=statistics["recorded_rows"]
+        ))
+
+        if statistics["rows"] != statistics["recorded_rows"]:
+            rows_differ = True
+
+    if rows_differ:
+        print("WARNING: The number of scraped rows differs from the recording!")
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
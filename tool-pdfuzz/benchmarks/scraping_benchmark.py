@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   Benchmark suite of the scraping routines. Every scraping routine of every
+#   NavScraper is run over the saved pages of the corpus:
+#
+#   benchmarks/pages/VERSION
+#   benchmarks/pages/<navscraper>/<routine>/<page>.html
+#   benchmarks/pages/<navscraper>/<routine>/<page>.json          (state)
+#   benchmarks/pages/<navscraper>/<routine>/<page>.golden.json   (rows)
+#
+#   The pages are collected with "python PDFuzz.py --dump-pages <dir>" (see
+#   pdfuzz/config/navscrapers/api/corpus.py). The script reports rows per
+#   second, milliseconds per page and the peak memory of every routine and
+#   checks the rows against the golden outputs. Every routine runs in its own
+#   process, so that the peak memory is measured per routine.
+#
+#   The golden outputs are written with --update-golden. They are stamped
+#   with the version of the corpus, which has to be increased whenever pages
+#   are replaced, so that outputs of an older corpus are reported as stale.
+#
+#   Example:
+#   python benchmarks/scraping_benchmark.py --navscraper booking
+#
+#   @date   18.10.2026
+#
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import resource
+import importlib
+import traceback
+import multiprocessing
+
+# Make the pdfuzz package importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
+
+from parser_benchmark import strip_volatile_fields
+
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+GOLDEN_SUFFIX = ".golden.json"
+
+
+def parse_commandline_arguments():
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark suite of the scraping routines over the saved pages of the corpus.",
+    )
+
+    parser.add_argument(
+        "--corpus",
+        dest="corpus_dir",
+        default=DEFAULT_CORPUS_DIR,
+        help="directory of the corpus (default: benchmarks/pages)"
+    )
+
+    parser.add_argument(
+        "--navscraper",
+        dest="navscrapers",
+        action="append",
+        help="run only this NavScraper, e.g. booking. Can be repeated."
+    )
+
+    parser.add_argument(
+        "--routine",
+        dest="routines",
+        action="append",
+        help="run only this scraping routine, e.g. _mobile_scraping_routine. Can be repeated."
+    )
+
+    parser.add_argument(
+        "--backend",
+        dest="backend",
+        choices=["lxml", "bs4"],
+        default=Parser.BACKEND,
+        help="backend of the HTML parser (default: {0})".format(Parser.BACKEND)
+    )
+
+    parser.add_argument(
+        "-n",
+        "--repetitions",
+        dest="repetitions",
+        type=int,
+        default=5,
+        help="number of runs over the pages of a routine (default: 5)"
+    )
+
+    parser.add_argument(
+        "--update-golden",
+        dest="update_golden",
+        action="store_true",
+        help="write the extracted rows as the new golden outputs."
+    )
+
+    return parser.parse_args()
+
+
+def read_corpus_version(corpus_dir):
+    ##
+    #   Reads the version of the corpus.
+    #
+    #   @return {int} 0 if the corpus has no VERSION file.
+    #
+
+    version_filename = os.path.join(corpus_dir, "VERSION")
+
+    if not os.path.isfile(version_filename):
+        return 0
+
+    with open(version_filename, "r") as version_file:
+        return int(version_file.read().strip())
+
+
+def find_routines(corpus_dir, navscrapers=None, routines=None):
+    ##
+    #   Finds the routines of the corpus that have pages.
+    #
+    #   @return {list} Tuples (navscraper, routine, page base names).
+    #
+
+    found = []
+
+    for navscraper_name in sorted(os.listdir(corpus_dir)):
+
+        if navscrapers and navscraper_name not in navscrapers:
+            continue
+
+        navscraper_dir = os.path.join(corpus_dir, navscraper_name)
+        if not os.path.isdir(navscraper_dir):
+            continue
+
+        for routine_name in sorted(os.listdir(navscraper_dir)):
+
+            if routines and routine_name not in routines:
+                continue
+
+            page_names = sorted(
+                filename[:-len(".html")]
+                for filename in glob.glob(os.path.join(navscraper_dir, routine_name, "*.html"))
+            )
+
+            if len(page_names) > 0:
+                found.append((navscraper_name, routine_name, page_names))
+
+    return found
+
+
+def load_page(page_name):
+    ##
+    #   Reads a page of the corpus and the state of the NavScraper.
+    #
+    #   @return {unicode} page source, {dict} state.
+    #
+
+    with open(page_name + ".html", "r") as page_file:
+        page_source = page_file.read().decode("utf-8")
+
+    state = {}
+    if os.path.isfile(page_name + ".json"):
+        with open(page_name + ".json", "r") as state_file:
+            state = json.load(state_file)
+
+    return page_source, state
+
+
+def normalize_rows(rows):
+    ##
+    #   Brings the rows into the form of the golden outputs.
+    #
+
+    return json.loads(json.dumps(strip_volatile_fields(rows), default=str))
+
+
+def get_peak_memory():
+    ##
+    #   Returns the peak resident memory of the process in bytes.
+    #
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes.
+    if sys.platform != "darwin":
+        peak *= 1024
+
+    return peak
+
+
+def run_routine(navscraper_name, routine_name, pages, repetitions, connection):
+    ##
+    #   Runs a scraping routine over its pages. Runs in its own process and
+    #   sends the statistics through the connection.
+    #
+
+    try:
+        navscraper_module = importlib.import_module(
+            "pdfuzz.config.navscrapers.{0}_navscraper".format(navscraper_name))
+        navscraper = navscraper_module.NavScraper()
+        scraping_routine = getattr(navscraper, routine_name)
+
+        if not getattr(scraping_routine, "is_scraping_routine", False):
+            raise ValueError("'{0}' is not a scraping routine of '{1}'".format(routine_name, navscraper_name))
+
+        memory_before = get_peak_memory()
+        rows_by_page = []
+
+        start = time.time()
+
+        for _ in range(repetitions):
+            rows_by_page = []
+            for page_source, state in pages:
+                vars(navscraper).update(state)
+                rows_by_page.append(scraping_routine(page_source=page_source))
+
+        duration = time.time() - start
+
+        connection.send({
+            "seconds": duration,
+            "peak_memory": get_peak_memory() - memory_before,
+            "rows_by_page": [normalize_rows(rows) for rows in rows_by_page],
+        })
+
+    except:
+        connection.send({"error": traceback.format_exc()})
+
+    finally:
+        connection.close()
+
+
+def check_golden(page_names, rows_by_page, corpus_version, update_golden):
+    ##
+    #   Compares the rows of every page with the golden output, or writes the
+    #   golden outputs.
+    #
+    #   @return {string} "ok", "updated", "missing", "stale" or "FAILED".
+    #
+
+    status = "ok"
+
+    for page_name, rows in zip(page_names, rows_by_page):
+
+        golden_filename = page_name + GOLDEN_SUFFIX
+
+        if update_golden:
+            with open(golden_filename, "w") as golden_file:
+                json.dump({"corpus_version": corpus_version, "rows": rows}, golden_file,
+                          indent=1, sort_keys=True, separators=(",", ": "))
+            status = "updated"
+            continue
+
+        if not os.path.isfile(golden_filename):
+            status = "missing" if status == "ok" else status
+            continue
+
+        with open(golden_filename, "r") as golden_file:
+            golden = json.load(golden_file)
+
+        if golden["rows"] != rows:
+            print("[!] Rows differ from the golden output: {0}".format(golden_filename))
+            status = "FAILED"
+
+        elif golden.get("corpus_version") != corpus_version and status == "ok":
+            status = "stale"
+
+    return status
+
+
+def main():
+
+    settings = parse_commandline_arguments()
+
+    # Use fixed exchange rates, so that the benchmark does not request the
+    # network and the prices match the golden outputs.
+    CurrencyConverter.EXCHANGE_RATES_OFFLINE = True
+    for currency_code in CurrencyConverter.CURRENCY_CODES:
+        CurrencyConverter.EXCHANGE_RATES[currency_code] = 1.0
+
+    Parser.set_backend(settings.backend)
+
+    corpus_version = read_corpus_version(settings.corpus_dir)
+    print("Corpus version {0}, parser backend {1}".format(corpus_version, settings.backend))
+
+    print("{name:45} {pages:>6} {rows:>6} {rows_per_second:>10} {ms:>10} {memory:>9} {golden:>8}".format(
+        name="routine", pages="pages", rows="rows", rows_per_second="rows/s",
+        ms="ms/page", memory="peak MB", golden="golden"))
+
+    failed = False
+
+    for navscraper_name, routine_name, page_names in find_routines(
+            settings.corpus_dir, settings.navscrapers, settings.routines):
+
+        pages = [load_page(page_name) for page_name in page_names]
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=run_routine,
+            args=(navscraper_name, routine_name, pages, settings.repetitions, sender)
+        )
+        process.start()
+        sender.close()
+        statistics = receiver.recv()
+        process.join()
+
+        name = "{0}.{1}".format(navscraper_name, routine_name)
+
+        if "error" in statistics:
+            print("{name:45} ERROR".format(name=name))
+            print(statistics["error"])
+            failed = True
+            continue
+
+        rows = sum(len(page_rows) for page_rows in statistics["rows_by_page"])
+        runs = settings.repetitions * len(pages)
+
+        golden_status = check_golden(
+            page_names=page_names,
+            rows_by_page=statistics["rows_by_page"],
+            corpus_version=corpus_version,
+            update_golden=settings.update_golden
+        )
+
+        print("{name:45} {pages:6} {rows:6} {rows_per_second:10.1f} {ms:10.2f} {memory:9.1f} {golden:>8}".format(
+            name=name,
+            pages=len(pages),
+            rows=rows,
+            rows_per_second=rows * settings.repetitions / statistics["seconds"] if statistics["seconds"] else 0.0,
+            ms=statistics["seconds"] * 1000 / runs,
+            memory=statistics["peak_memory"] / (1024.0 * 1024.0),
+            golden=golden_status
+        ))
+
+        if golden_status in ["FAILED", "missing", "stale"]:
+            failed = True
+
+    if failed:
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
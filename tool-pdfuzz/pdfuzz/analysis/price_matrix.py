@@ -0,0 +1,465 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module builds the price matrix of a run for the analysis of the
+#   price discrimination. The results of the run are streamed in chunks and the
+#   prices are aggregated into a dense matrix
+#
+#   product x fingerprint x request country
+#
+#   with the mean price of every cell (NaN if the product was not seen). The
+#   spread of the products, the relative deviation from the median of the
+#   country and the offset of the fingerprints are computed on the whole
+#   matrix with NumPy.
+#
+#   The aggregated sums and counts are cached per run in
+#   PRICE_MATRIX_CACHE_DIR. A later call only streams the rows that were
+#   added since and the last PRICE_MATRIX_CACHE_MARGIN rows, which are never
+#   cached, so repeated queries do not read the run again.
+#
+#   Requires NumPy.
+#
+#   @date   18.10.2026
+#
+
+import os
+import logging
+import warnings
+
+import numpy
+
+import pdfuzz.config.config as cfg
+import pdfuzz.core.db_connection as db_connection
+
+
+# Column of the normalized price (EUR) per website type.
+PRICE_COLUMNS = {
+    cfg.PAGE_TYPES.HOTELS: "price_euro",
+    cfg.PAGE_TYPES.CARS: "price_norm_total",
+}
+
+# Bits of the product, fingerprint and country index in the cell keys.
+FINGERPRINT_BITS = 28
+COUNTRY_BITS = 10
+
+
+class PriceMatrix:
+    ##
+    #   PriceMatrix holds the mean prices of a run and computes the measures
+    #   of the price discrimination.
+    #
+
+    def __init__(self, products, fingerprints, countries, values, counts):
+        ##
+        #
+        #   @param {list} products - Products, i.e. tuples of the provider
+        #   and the product columns.
+        #   @param {numpy.ndarray} fingerprints - Fingerprint ids.
+        #   @param {list} countries - Request countries.
+        #   @param {numpy.ndarray} values - Mean prices, shape (products,
+        #   fingerprints, countries). NaN marks missing prices.
+        #   @param {numpy.ndarray} counts - Number of prices per cell.
+        #
+
+        self.products = products
+        self.fingerprints = fingerprints
+        self.countries = countries
+        self.values = values
+        self.counts = counts
+
+    def product_spread(self):
+        ##
+        #   Spread of the prices of every product over all fingerprints and
+        #   countries.
+        #
+        #   @return {numpy.ndarray} absolute spread (max - min),
+        #   {numpy.ndarray} relative spread ((max - min) / min).
+        #
+
+        flat_values = self.values.reshape(len(self.products), -1)
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            minimum = numpy.nanmin(flat_values, axis=1)
+            spread = numpy.nanmax(flat_values, axis=1) - minimum
+            relative_spread = spread / minimum
+
+        return spread, relative_spread
+
+    def country_median(self):
+        ##
+        #   Median price of every product per country over the fingerprints.
+        #
+        #   @return {numpy.ndarray} shape (products, countries).
+        #
+
+        # Products that were not seen in a country have no median.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return numpy.nanmedian(self.values, axis=1)
+
+    def relative_deviation(self):
+        ##
+        #   Relative deviation of every price from the median of its product
+        #   and country, e.g. 0.1 for 10% above the median.
+        #
+        #   @return {numpy.ndarray} shape (products, fingerprints, countries).
+        #
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return self.values / self.country_median()[:, numpy.newaxis, :] - 1.0
+
+    def fingerprint_offset(self):
+        ##
+        #   Mean relative deviation of every fingerprint over all products and
+        #   countries. A positive offset means higher prices for the
+        #   fingerprint.
+        #
+        #   @return {numpy.ndarray} offset, {numpy.ndarray} number of prices
+        #   per fingerprint.
+        #
+
+        deviation = self.relative_deviation()
+        valid = numpy.isfinite(deviation)
+
+        number_of_prices = valid.sum(axis=(0, 2))
+        deviation_sum = numpy.where(valid, deviation, 0.0).sum(axis=(0, 2))
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return deviation_sum / number_of_prices, number_of_prices
+
+
+class PriceMatrixBuilder:
+    ##
+    #   PriceMatrixBuilder aggregates the prices chunk by chunk by the ids of
+    #   the products, fingerprints and request countries. The cells are
+    #   kept sparse as sorted cell keys with the sum and number of their
+    #   prices, so the dense matrix is only allocated once by build(). The
+    #   aggregated chunks are merged into the cells once they outgrow them,
+    #   so every row is only merged a few times.
+    #
+
+    def __init__(self):
+
+        self.product_index = {}
+        self.fingerprint_index = {}
+        self.country_index = {}
+
+        self.cell_keys = numpy.zeros(0, dtype=numpy.int64)
+        self.cell_sums = numpy.zeros(0, dtype=numpy.float64)
+        self.cell_counts = numpy.zeros(0, dtype=numpy.int64)
+
+        # Aggregated chunks that are not merged yet.
+        self.pending_cells = []
+        self.pending_size = 0
+
+        # Id of the last aggregated row of the results table.
+        self.max_id = 0
+
+    def _get_codes(self, values, index):
+        ##
+        #   Maps the values of a chunk to their indices. Only the distinct
+        #   values of the chunk are looked up.
+        #
+
+        distinct_values, inverse = numpy.unique(values, return_inverse=True)
+
+        codes = numpy.empty(len(distinct_values), dtype=numpy.int64)
+        for position, value in enumerate(distinct_values.tolist()):
+            codes[position] = index.setdefault(value, len(index))
+
+        return codes[inverse]
+
+    def add_chunk(self, products, fingerprints, countries, prices):
+        ##
+        #   Adds the prices of a chunk of rows. Rows without price are
+        #   skipped.
+        #
+        #   @param {list} products - Product ids of the rows.
+        #   @param {list} fingerprints - Fingerprint ids of the rows.
+        #   @param {list} countries - Country ids of the rows.
+        #   @param {list} prices - Prices of the rows.
+        #
+
+        prices = numpy.array(prices, dtype=numpy.float64)
+        valid = numpy.isfinite(prices)
+
+        if not valid.any():
+            return
+
+        product_codes = self._get_codes(numpy.array(products, dtype=numpy.int64)[valid], self.product_index)
+        fingerprint_codes = self._get_codes(numpy.array(fingerprints, dtype=numpy.int64)[valid], self.fingerprint_index)
+        country_codes = self._get_codes(numpy.array(countries, dtype=numpy.int64)[valid], self.country_index)
+
+        if len(self.fingerprint_index) >= 2 ** FINGERPRINT_BITS or len(self.country_index) >= 2 ** COUNTRY_BITS:
+            raise ValueError("Too many fingerprints or countries for the price matrix.")
+
+        keys = (product_codes << (FINGERPRINT_BITS + COUNTRY_BITS)) | (fingerprint_codes << COUNTRY_BITS) | country_codes
+
+        chunk_cells = _aggregate(keys, prices[valid], numpy.ones(len(keys), dtype=numpy.int64))
+        self.pending_cells.append(chunk_cells)
+        self.pending_size += len(chunk_cells[0])
+
+        if self.pending_size >= len(self.cell_keys):
+            self._merge_pending()
+
+    def _merge_pending(self):
+        ##
+        #   Merges the aggregated chunks into the cells.
+        #
+
+        if len(self.pending_cells) == 0:
+            return
+
+        self.cell_keys, self.cell_sums, self.cell_counts = _aggregate(
+            numpy.concatenate([self.cell_keys] + [cells[0] for cells in self.pending_cells]),
+            numpy.concatenate([self.cell_sums] + [cells[1] for cells in self.pending_cells]),
+            numpy.concatenate([self.cell_counts] + [cells[2] for cells in self.pending_cells])
+        )
+
+        self.pending_cells = []
+        self.pending_size = 0
+
+    def build(self):
+        ##
+        #   Creates the dense price matrix.
+        #
+        #   @return {PriceMatrix} with the ids of the products and countries.
+        #
+
+        self._merge_pending()
+
+        products = _sorted_by_index(self.product_index)
+        fingerprints = numpy.array(_sorted_by_index(self.fingerprint_index), dtype=numpy.int64)
+        countries = _sorted_by_index(self.country_index)
+
+        shape = (len(products), len(fingerprints), len(countries))
+
+        values = numpy.full(shape, numpy.nan)
+        counts = numpy.zeros(shape, dtype=numpy.int64)
+
+        product_codes = self.cell_keys >> (FINGERPRINT_BITS + COUNTRY_BITS)
+        fingerprint_codes = (self.cell_keys >> COUNTRY_BITS) & (2 ** FINGERPRINT_BITS - 1)
+        country_codes = self.cell_keys & (2 ** COUNTRY_BITS - 1)
+
+        values[product_codes, fingerprint_codes, country_codes] = self.cell_sums / self.cell_counts
+        counts[product_codes, fingerprint_codes, country_codes] = self.cell_counts
+
+        return PriceMatrix(
+            products=products,
+            fingerprints=fingerprints,
+            countries=countries,
+            values=values,
+            counts=counts
+        )
+
+    def save(self, filename):
+        ##
+        #   Writes the aggregated cells into a cache file.
+        #
+        #   @param {string} filename - Path of the .npz file.
+        #
+
+        self._merge_pending()
+
+        # Write into a temporary file first, so that an interrupted write
+        # does not leave a broken cache.
+        temporary_filename = filename + ".tmp"
+
+        with open(temporary_filename, "wb") as cache_file:
+            numpy.savez(
+                cache_file,
+                products=numpy.array(_sorted_by_index(self.product_index), dtype=numpy.int64),
+                fingerprints=numpy.array(_sorted_by_index(self.fingerprint_index), dtype=numpy.int64),
+                countries=numpy.array(_sorted_by_index(self.country_index), dtype=numpy.int64),
+                cell_keys=self.cell_keys,
+                cell_sums=self.cell_sums,
+                cell_counts=self.cell_counts,
+                max_id=numpy.array(self.max_id, dtype=numpy.int64)
+            )
+
+        os.rename(temporary_filename, filename)
+
+    @classmethod
+    def load(cls, filename):
+        ##
+        #   Reads the aggregated cells from a cache file.
+        #
+        #   @param {string} filename - Path of the .npz file.
+        #
+        #   @return {PriceMatrixBuilder}
+        #
+
+        builder = cls()
+
+        with numpy.load(filename) as cache:
+            builder.product_index = dict((value, i) for i, value in enumerate(cache["products"].tolist()))
+            builder.fingerprint_index = dict((value, i) for i, value in enumerate(cache["fingerprints"].tolist()))
+            builder.country_index = dict((value, i) for i, value in enumerate(cache["countries"].tolist()))
+            builder.cell_keys = cache["cell_keys"]
+            builder.cell_sums = cache["cell_sums"]
+            builder.cell_counts = cache["cell_counts"]
+            builder.max_id = int(cache["max_id"])
+
+        return builder
+
+
+def _aggregate(keys, sums, counts):
+    ##
+    #   Sums up the cells with the same key.
+    #
+    #   @return {tuple} sorted keys, sums, counts.
+    #
+
+    distinct_keys, inverse = numpy.unique(keys, return_inverse=True)
+
+    return (
+        distinct_keys,
+        numpy.bincount(inverse, weights=sums, minlength=len(distinct_keys)),
+        numpy.bincount(inverse, weights=counts, minlength=len(distinct_keys)).astype(numpy.int64)
+    )
+
+
+def _sorted_by_index(index):
+
+    return [value for value, _ in sorted(index.items(), key=lambda item: item[1])]
+
+
+def get_cache_filename(run_id):
+
+    # A run that is started again with the same name gets a new id and
+    # therefore a new cache file.
+    return os.path.join(cfg.PRICE_MATRIX_CACHE_DIR, "price_matrix_run{0}.npz".format(run_id))
+
+
+def load_price_matrix(run_name, use_cache=True, chunk_size=None):
+    ##
+    #   Builds the price matrix of a run. Only the rows that were added since
+    #   the cached matrix was built are read from the database. The last
+    #   PRICE_MATRIX_CACHE_MARGIN rows of the run are read every time and not
+    #   cached, because a running scan may still commit rows with a lower id
+    #   than the last row.
+    #
+    #   @param {string} run_name - Name of the run.
+    #   @param {bool} use_cache - (optional) If False, all rows of the run
+    #   are read and the cache is replaced.
+    #   @param {int} chunk_size - (optional) Number of rows per chunk.
+    #
+    #   @return {PriceMatrix}
+    #
+
+    chunk_size = chunk_size or cfg.PRICE_MATRIX_CHUNK_SIZE
+
+    db_manager = db_connection.DBManager(
+        settings=cfg.MYSQL,
+        website_type=None,
+        mode="analysis",
+        run_name=run_name
+    )
+
+    try:
+        website_type = db_manager.website_type
+        cache_filename = get_cache_filename(db_manager.run_id)
+        max_id = db_manager.get_max_result_id()
+
+        # Rows up to this id are cached.
+        cache_max_id = max(max_id - cfg.PRICE_MATRIX_CACHE_MARGIN, 0)
+
+        builder = None
+        if use_cache and os.path.isfile(cache_filename):
+            builder = PriceMatrixBuilder.load(cache_filename)
+
+            if builder.max_id > max_id:
+                # Rows of the run were deleted.
+                builder = None
+
+        if builder is None:
+            builder = PriceMatrixBuilder()
+
+        if builder.max_id < cache_max_id:
+            add_result_rows(builder, db_manager, website_type, builder.max_id, cache_max_id, chunk_size)
+            builder.max_id = cache_max_id
+
+            if not os.path.isdir(cfg.PRICE_MATRIX_CACHE_DIR):
+                os.makedirs(cfg.PRICE_MATRIX_CACHE_DIR)
+            builder.save(cache_filename)
+
+        # The last rows are added after the cache was written.
+        if builder.max_id < max_id:
+            add_result_rows(builder, db_manager, website_type, builder.max_id, max_id, chunk_size)
+
+        price_matrix = builder.build()
+
+        # Replace the ids by the names of the dimension tables.
+        product_labels = db_manager.get_product_labels(website_type)
+        country_labels = db_manager.get_country_labels()
+
+        price_matrix.products = [product_labels.get(product_id, (product_id,)) for product_id in price_matrix.products]
+        price_matrix.countries = [country_labels.get(country_id, country_id) for country_id in price_matrix.countries]
+
+    finally:
+        db_manager.close()
+
+    return price_matrix
+
+
+def add_result_rows(builder, db_manager, website_type, min_id, max_id, chunk_size):
+    ##
+    #   Streams the rows of a run with an id in (min_id, max_id] into the
+    #   builder.
+    #
+
+    logging.info("Reading rows {0} to {1} of '{2}'".format(min_id + 1, max_id, db_manager.run_name))
+
+    select_expressions = ["product_id", "fp_id", "country_id", PRICE_COLUMNS[website_type]]
+
+    for chunk in db_manager.stream_result_chunks(
+            select_expressions, min_id=min_id, max_id=max_id, chunk_size=chunk_size):
+
+        products, fingerprints, countries, prices = zip(*chunk)
+        builder.add_chunk(
+            products=products,
+            fingerprints=[-1 if fp_id is None else fp_id for fp_id in fingerprints],
+            countries=countries,
+            prices=[numpy.nan if price is None else price for price in prices]
+        )
+
+
+def print_report(run_name, limit=20):
+    ##
+    #   Prints the products with the highest relative spread and the offset
+    #   of the fingerprints.
+    #
+    #   @param {string} run_name - Name of the run.
+    #   @param {int} limit - (optional) Number of products and fingerprints.
+    #
+
+    price_matrix = load_price_matrix(run_name)
+
+    if len(price_matrix.products) == 0:
+        print("No prices found.")
+        return
+
+    spread, relative_spread = price_matrix.product_spread()
+
+    print("{product:60} {spread:>10} {relative:>9}".format(
+        product="product", spread="spread", relative="relative"))
+
+    for i in numpy.argsort(-numpy.nan_to_num(relative_spread))[:limit]:
+        print(u"{product:60} {spread:10.2f} {relative:8.1f}%".format(
+            product=u" / ".join(unicode(value) for value in price_matrix.products[i] if value is not None)[:60],
+            spread=spread[i],
+            relative=relative_spread[i] * 100
+        ).encode("utf-8"))
+
+    offset, number_of_prices = price_matrix.fingerprint_offset()
+
+    print("")
+    print("{fp_id:>12} {offset:>9} {prices:>8}".format(fp_id="fingerprint", offset="offset", prices="prices"))
+
+    for i in numpy.argsort(-numpy.abs(numpy.nan_to_num(offset)))[:limit]:
+        print("{fp_id:12} {offset:8.2f}% {prices:8}".format(
+            fp_id=price_matrix.fingerprints[i],
+            offset=offset[i] * 100,
+            prices=number_of_prices[i]
+        ))
@@ -88,9 +88,13 @@ class NetworkErrorException(NavScraperException):
         error_msg = "NETWORK_ERROR"
 
         # Call the base class constructor with the parameters it needs
-        super(NoResultsException, self) \
+        super(NetworkErrorException, self) \
             .__init__(message, target_website, country, fp_id, error_msg)
 
 
 class PageLoadTimeoutException(Exception):
     pass
+
+
+class WebDriverUnavailableException(Exception):
+    pass
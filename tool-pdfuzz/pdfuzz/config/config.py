@@ -120,6 +120,24 @@ WEBDRIVERS_SETTINGS = [
 ]
 
 
+# Browser engine of the webdriver servers: "phantomjs" or "chromium". The
+# chromium backend starts ChromeDriver servers, which control a headless
+# Chromium. This variable is modified via the commandline interface.
+DRIVER_BACKEND = "phantomjs"
+
+
+# Fuzzing engine: "process" starts a process for every local webdriver server
+# and every VM worker. "thread" drives all webdriver sessions with threads of
+# a single process. This variable is modified via the commandline interface.
+FUZZING_ENGINE = "process"
+
+
+# Path to the ChromeDriver binary and to the Chromium binary for the chromium
+# backend. None uses the Chromium that is found by ChromeDriver.
+CHROMEDRIVER_BIN = "chromedriver"
+CHROMIUM_BIN = None
+
+
 # Number of VM PhantomJS instances
 NUM_VM_PHANTOMJS_INSTANCES = 6
 
@@ -128,8 +146,10 @@ NUM_VM_PHANTOMJS_INSTANCES = 6
 PAGE_LOAD_TIMEOUT = 20
 
 
-# Seconds to wait, so that the server will not be ddosed.
-ANTI_DDOS_DELAY_SECONDS = 20
+# Maximal number of requests per minute that all workers together send to a
+# single host, so that the server will not be ddosed. The default matches the
+# former delay of 20 seconds per worker with 24 workers.
+HOST_REQUESTS_PER_MINUTE = 72
 
 
 # Timeout counter: Number of maximal timeouts per website. If the number of
@@ -141,6 +161,96 @@ TIMEOUT_LIMIT = -1
 FP_RETRY = 2
 
 
+# Number of fingerprints that are scanned with the same WebDriver session. The
+# session is reset between the fingerprints and recycled after this number of
+# uses or after an error.
+MAX_SESSION_USES = 20
+
+
+# Maximal number of seconds to wait for the webdriver servers to answer after
+# they are launched. All servers are polled in parallel and every worker
+# starts as soon as its server answers.
+WEBDRIVER_STARTUP_TIMEOUT = 60
+
+
+# Health monitoring of the webdriver servers. Every server is probed via its
+# /status URL every WEBDRIVER_PROBE_INTERVAL seconds. After
+# WEBDRIVER_MAX_PROBE_FAILURES failed probes in a row, or at once after a
+# network error of a worker, the server is taken out of scheduling and
+# restarted in the background. A restart fails, if the server does not answer
+# within WEBDRIVER_RESTART_TIMEOUT seconds. A worker waits for its server as
+# long as it is restarted and stops after WEBDRIVER_MAX_RESTARTS failed
+# restarts in a row.
+WEBDRIVER_PROBE_INTERVAL = 10
+WEBDRIVER_PROBE_TIMEOUT = 5
+WEBDRIVER_MAX_PROBE_FAILURES = 2
+WEBDRIVER_RESTART_TIMEOUT = 120
+WEBDRIVER_MAX_RESTARTS = 3
+
+
+# Shell command to restart a webdriver server on a VM. The placeholders {ip},
+# {port}, {proxy_ip} and {proxy_port} are replaced. With None, the fuzzer
+# waits for the server to be restarted on the VM (e.g. by a supervisor) and
+# reattaches it.
+# Example: "ssh {ip} 'supervisorctl restart phantomjs-{port}'"
+WEBDRIVER_RESTART_COMMAND = None
+
+
+# Preprocess the fingerprints once at the start of a run into a store file in
+# FINGERPRINT_STORE_DIR. It holds the prepared dcap, the parsed values of the
+# injection template and the minified injection code for the timezone offsets
+# of the workers, so that the workers neither parse nor render them again.
+# The workers stream the store record by record.
+FINGERPRINT_STORE = True
+FINGERPRINT_STORE_DIR = "cache/"
+
+
+# Record the durations of the stages of every scan (connect, load, navigation,
+# scraping, store and the steps of the NavScrapers) as JSON lines in
+# TIMING_LOG_DIR/<results table name>.jsonl. The report is printed with
+# "python PDFuzz.py --timing-report <results table name>".
+TIMING_LOG = True
+TIMING_LOG_DIR = "timings/"
+
+
+# Directory to record the pages and XHR responses of every scan for the offline
+# replay (see pdfuzz/core/replay.py and benchmarks/replay_benchmark.py). None
+# turns the recording off. This variable is modified via the commandline
+# interface.
+RECORD_DIR = None
+
+
+# Directory to save every page that a scraping routine receives, with the
+# state of the NavScraper, as corpus of the scraping benchmark (see
+# benchmarks/scraping_benchmark.py). None turns the dump off. This variable is
+# modified via the commandline interface.
+PAGE_DUMP_DIR = None
+
+
+# Address of the HTTP server with the live metrics of a run in the Prometheus
+# text format (http://<host>:<port>/metrics). None turns the metrics off. The
+# port is modified via the commandline interface. The throughput is averaged
+# over the last METRICS_THROUGHPUT_WINDOW seconds.
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9101
+METRICS_THROUGHPUT_WINDOW = 300
+
+
+# Price matrix of the analysis (see pdfuzz/analysis/price_matrix.py). The
+# results table is read in chunks of PRICE_MATRIX_CHUNK_SIZE rows. The
+# aggregated prices are cached in PRICE_MATRIX_CACHE_DIR, so that only new rows
+# are read by the next analysis of the same run.
+PRICE_MATRIX_CHUNK_SIZE = 100000
+PRICE_MATRIX_CACHE_DIR = "cache/"
+
+
+# Number of the last rows of a run that are never cached in the price matrix.
+# The writers of a running scan commit their rows in batches, so a row may be
+# committed after rows with a greater id. The last rows are read again by
+# every analysis, so that such a row is not skipped.
+PRICE_MATRIX_CACHE_MARGIN = 100000
+
+
 # Configuration parameter for the database connection.
 MYSQL = {
 
@@ -153,6 +263,74 @@ MYSQL = {
 }
 
 
+# Connection pool of every process. At most MYSQL_POOL_SIZE connections are
+# used at the same time, further queries wait for a free connection. Up to
+# MYSQL_POOL_MAX_IDLE unused connections are kept open, but not longer than
+# MYSQL_POOL_IDLE_SECONDS. A kept connection is checked with a ping if it was
+# not used for MYSQL_PING_SECONDS.
+MYSQL_POOL_SIZE = 4
+MYSQL_POOL_MAX_IDLE = 1
+MYSQL_POOL_IDLE_SECONDS = 300
+MYSQL_PING_SECONDS = 30
+
+
+# Number of attempts of a query if the connection to the database is lost,
+# e.g. by a restart of the server. The delay in seconds before the next
+# attempt is doubled after every attempt.
+MYSQL_RETRIES = 6
+MYSQL_RETRY_DELAY = 2
+
+
+# Directory of the local spool files of the results (see pdfuzz/core/spool.py).
+# If set, the workers append their results to spool segments instead of
+# writing them to the database, and the segments are loaded into the database
+# by a separate ingestion thread. None writes the results directly. This
+# variable is modified via the commandline interface.
+SPOOL_DIR = None
+
+
+# The spool files are synced to the disk after SPOOL_FSYNC_ROWS rows or
+# SPOOL_FSYNC_SECONDS seconds. A segment is sealed for the ingestion after
+# SPOOL_SEGMENT_ROWS rows or SPOOL_SEGMENT_SECONDS seconds.
+SPOOL_FSYNC_ROWS = 500
+SPOOL_FSYNC_SECONDS = 5
+SPOOL_SEGMENT_ROWS = 50000
+SPOOL_SEGMENT_SECONDS = 300
+
+
+# Number of seconds between two loads of the sealed spool segments.
+SPOOL_INGEST_INTERVAL = 60
+
+
+# Number of result rows that are written to the database in one batch.
+RESULT_WRITER_BATCH_SIZE = 500
+
+
+# Maximal number of seconds that result rows are buffered before they are
+# written to the database. A batch that could not be written is kept and
+# written again after this number of seconds.
+RESULT_WRITER_FLUSH_SECONDS = 10
+
+
+# Spool directory for the batches that could still not be written when a
+# worker stops. They are stored as spool segments of the run and can be
+# loaded with --ingest-spool RUN --spool RESULT_WRITER_FALLBACK_SPOOL_DIR.
+RESULT_WRITER_FALLBACK_SPOOL_DIR = "spool/"
+
+
+# JSON file to cache the exchange rates of the currency converter. The cache
+# is shared by all processes and runs. Cached rates expire after
+# EXCHANGE_RATES_TTL seconds.
+EXCHANGE_RATES_CACHE_FILE = "exchange_rates.json"
+EXCHANGE_RATES_TTL = 12 * 3600
+
+
+# JSON file with fixed exchange rates to EUR, i.e. {"USD": 0.92}. If it is set,
+# no exchange rates are requested from the network. This variable is modified
+# via the commandline interface.
+EXCHANGE_RATES_OFFLINE_FILE = None
+
+
 # Dictionary to save the search parameters for the different types of websites.
 # The keys need to be added to the WebsiteTypes class in
 # config_data_structures.py which is located in the same folder as config.py.
@@ -229,3 +407,32 @@ IGNORED_FINGERPRINT_TABLE_COLUMNS = [
     "factor_2",
     "factor_3",
 ]
+
+
+# Prefixes of the fingerprint table columns that hold fingerprint features.
+# Only these columns and the id are read from the fingerprint table.
+FINGERPRINT_FEATURE_PREFIXES = [
+    "navigator.",
+    "screen.",
+    "httpHeader.",
+]
+
+
+# Filters for the fingerprints of a run. Only fingerprints with an id between
+# FINGERPRINT_MIN_ID and FINGERPRINT_MAX_ID (None = no limit) are scanned.
+# FINGERPRINT_SAMPLE_RATE selects a deterministic share of them, e.g. 0.1 for
+# about 10%. All workers select the same sample. These variables are modified
+# via the commandline interface.
+FINGERPRINT_MIN_ID = None
+FINGERPRINT_MAX_ID = None
+FINGERPRINT_SAMPLE_RATE = 1.0
+
+
+# Number of fingerprints that are read from the database with one query.
+FINGERPRINT_PAGE_SIZE = 1000
+
+
+# Maximal number of fingerprints in the task queue of a website on a VM. The
+# queues are filled by feeder threads while the workers consume them, so the
+# fingerprints are never held in memory as a whole.
+TASK_QUEUE_SIZE = 64
@@ -0,0 +1,4 @@
+CREATE TABLE IF NOT EXISTS `scan_ledger` (id BIGINT AUTO_INCREMENT PRIMARY KEY, run_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, navscraper VARCHAR(255) CHARACTER SET utf8 NOT NULL, fp_id BIGINT NOT NULL, worker_country VARCHAR(100) CHARACTER SET utf8 NOT NULL, status VARCHAR(20) NOT NULL, attempts INT NOT NULL DEFAULT 0, updated_at DATETIME NOT NULL, UNIQUE KEY `task` (run_name, navscraper, fp_id, worker_country))
+UPDATE `scan_ledger` SET updated_at=DATE_FORMAT(STR_TO_DATE(updated_at, '%d-%m-%Y %H:%i:%s'), '%Y-%m-%d %H:%i:%s') WHERE updated_at LIKE '__-__-____ %'
+ALTER TABLE `scan_ledger` MODIFY updated_at DATETIME NOT NULL
+CREATE TABLE IF NOT EXISTS `spool_segments` (name VARCHAR(255) CHARACTER SET utf8 NOT NULL PRIMARY KEY, run_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, num_rows INT NOT NULL, loaded_at DATETIME NOT NULL, KEY `run_name` (run_name))
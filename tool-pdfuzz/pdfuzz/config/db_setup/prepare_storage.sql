@@ -1,9 +1,11 @@
 DROP TABLE IF EXISTS `product`
-DROP TABLE IF EXISTS `pdfuzz_results_hotels`
-DROP TABLE IF EXISTS `pdfuzz_results_cars`
 CREATE TABLE IF NOT EXISTS `search_parameters` (id BIGINT AUTO_INCREMENT PRIMARY KEY, check_in VARCHAR(20), check_out VARCHAR(20), travel_target VARCHAR(255), number_of_adults INT, number_of_single_rooms INT, number_of_double_rooms INT)
-CREATE TABLE IF NOT EXISTS `pdfuzz_results_hotels` (id BIGINT AUTO_INCREMENT PRIMARY KEY, provider_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, product_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, location VARCHAR(255) CHARACTER SET utf8, room_type VARCHAR(255) CHARACTER SET utf8, price DOUBLE, currency VARCHAR(20) CHARACTER SET utf8, price_euro DOUBLE, nights INT, rating_value FLOAT, rating_unit VARCHAR(50), fp_id BIGINT, fp_table_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, search_param_id BIGINT, request_country VARCHAR(100) CHARACTER SET utf8 NOT NULL, request_timezone_offset INT, proxy_address VARCHAR(80), access_time VARCHAR(50) NOT NULL)
-ALTER TABLE `pdfuzz_results_hotels` ADD INDEX (`provider_name`, `product_name`);
 CREATE TABLE IF NOT EXISTS `search_parameters_cars` (id BIGINT AUTO_INCREMENT PRIMARY KEY, picking_up VARCHAR(255), dropping_off VARCHAR(255), pick_up_date VARCHAR(20), pick_up_time VARCHAR(20), drop_off_date VARCHAR(20), drop_off_time VARCHAR(20))
-CREATE TABLE IF NOT EXISTS `pdfuzz_results_cars` (id BIGINT AUTO_INCREMENT PRIMARY KEY, provider_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, company_name VARCHAR(255) CHARACTER SET utf8, car_class VARCHAR(255) CHARACTER SET utf8, car_model VARCHAR(255) CHARACTER SET utf8, transmission VARCHAR(255) CHARACTER SET utf8, price_daily DOUBLE, price_norm_daily DOUBLE, price_total DOUBLE, price_norm_total DOUBLE, currency VARCHAR(20) CHARACTER SET utf8, fp_id BIGINT, fp_table_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, search_param_id BIGINT, request_country VARCHAR(100) CHARACTER SET utf8 NOT NULL, request_timezone_offset INT, proxy_address VARCHAR(80), access_time VARCHAR(50) NOT NULL)
-ALTER TABLE `pdfuzz_results_cars` ADD INDEX (`provider_name`, `car_model`);
\ No newline at end of file
+CREATE TABLE IF NOT EXISTS `dim_run` (id INT AUTO_INCREMENT PRIMARY KEY, name VARCHAR(255) CHARACTER SET utf8 NOT NULL, website_type VARCHAR(50) NOT NULL, fp_table_name VARCHAR(255) CHARACTER SET utf8 NOT NULL, created_at DATETIME NOT NULL, UNIQUE KEY `name` (name))
+CREATE TABLE IF NOT EXISTS `dim_provider` (id INT AUTO_INCREMENT PRIMARY KEY, key_hash CHAR(32) NOT NULL, name VARCHAR(255) CHARACTER SET utf8 NOT NULL, UNIQUE KEY `key_hash` (key_hash))
+CREATE TABLE IF NOT EXISTS `dim_country` (id INT AUTO_INCREMENT PRIMARY KEY, key_hash CHAR(32) NOT NULL, name VARCHAR(100) CHARACTER SET utf8 NOT NULL, UNIQUE KEY `key_hash` (key_hash))
+CREATE TABLE IF NOT EXISTS `dim_proxy` (id INT AUTO_INCREMENT PRIMARY KEY, key_hash CHAR(32) NOT NULL, address VARCHAR(80) NOT NULL, UNIQUE KEY `key_hash` (key_hash))
+CREATE TABLE IF NOT EXISTS `dim_product_hotels` (id INT AUTO_INCREMENT PRIMARY KEY, key_hash CHAR(32) NOT NULL, provider_id INT NOT NULL, name VARCHAR(255) CHARACTER SET utf8 NOT NULL, location VARCHAR(255) CHARACTER SET utf8, UNIQUE KEY `key_hash` (key_hash), KEY `provider_name` (provider_id, name))
+CREATE TABLE IF NOT EXISTS `dim_product_cars` (id INT AUTO_INCREMENT PRIMARY KEY, key_hash CHAR(32) NOT NULL, provider_id INT NOT NULL, company_name VARCHAR(255) CHARACTER SET utf8, car_class VARCHAR(255) CHARACTER SET utf8, car_model VARCHAR(255) CHARACTER SET utf8, transmission VARCHAR(255) CHARACTER SET utf8, UNIQUE KEY `key_hash` (key_hash), KEY `provider_model` (provider_id, car_model))
+CREATE TABLE IF NOT EXISTS `pdfuzz_results_hotels` (id BIGINT AUTO_INCREMENT NOT NULL, run_id INT NOT NULL, provider_id INT NOT NULL, product_id INT NOT NULL, country_id INT NOT NULL, proxy_id INT, room_type VARCHAR(255) CHARACTER SET utf8, price DOUBLE, currency VARCHAR(20) CHARACTER SET utf8, price_euro DOUBLE, nights INT, rating_value FLOAT, rating_unit VARCHAR(50), fp_id BIGINT, search_param_id BIGINT, request_timezone_offset INT, access_time DATETIME NOT NULL, KEY `product_country_fp` (product_id, country_id, fp_id), KEY `fp_time` (fp_id, access_time), KEY `provider_time` (provider_id, access_time), KEY `access_time` (access_time), PRIMARY KEY (id, run_id)) PARTITION BY LIST (run_id) (PARTITION r0 VALUES IN (0))
+CREATE TABLE IF NOT EXISTS `pdfuzz_results_cars` (id BIGINT AUTO_INCREMENT NOT NULL, run_id INT NOT NULL, provider_id INT NOT NULL, product_id INT NOT NULL, country_id INT NOT NULL, proxy_id INT, price_daily DOUBLE, price_norm_daily DOUBLE, price_total DOUBLE, price_norm_total DOUBLE, currency VARCHAR(20) CHARACTER SET utf8, fp_id BIGINT, search_param_id BIGINT, request_timezone_offset INT, access_time DATETIME NOT NULL, KEY `product_country_fp` (product_id, country_id, fp_id), KEY `fp_time` (fp_id, access_time), KEY `provider_time` (provider_id, access_time), KEY `access_time` (access_time), PRIMARY KEY (id, run_id)) PARTITION BY LIST (run_id) (PARTITION r0 VALUES IN (0))
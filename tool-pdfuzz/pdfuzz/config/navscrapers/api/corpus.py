@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module collects the corpus of saved result pages for the scraping
+#   benchmark (see benchmarks/scraping_benchmark.py). The scraping routines of
+#   the NavScrapers are marked with the decorator scraping_routine(). If a
+#   dump directory is set, every page that a routine receives is saved with
+#   the state of the NavScraper (the search parameters of the navigation):
+#
+#   <dump dir>/<navscraper>/<routine>/<timestamp>_<pid>_<n>.html
+#   <dump dir>/<navscraper>/<routine>/<timestamp>_<pid>_<n>.json
+#
+#   @date   18.10.2026
+#
+
+import os
+import json
+import time
+import logging
+import functools
+import itertools
+
+
+# Directory the pages are saved to. None turns the dump off.
+DUMP_DIR = None
+
+# Numbers the pages of a process.
+_page_counter = itertools.count(1)
+
+
+def set_dump_dir(dump_dir):
+    ##
+    #   Sets the directory the pages are saved to.
+    #
+    #   @param {string} dump_dir - Directory of the corpus or None to turn
+    #   the dump off.
+    #
+
+    global DUMP_DIR
+
+    DUMP_DIR = dump_dir
+
+
+def get_navscraper_name(navscraper):
+    ##
+    #   Returns the name of the NavScraper module without the suffix.
+    #
+    #   @param {NavScraper} navscraper
+    #
+    #   @return {string} Example: 'booking'
+    #
+
+    module_name = navscraper.__class__.__module__.rsplit(".", 1)[-1]
+
+    if module_name.endswith("_navscraper"):
+        module_name = module_name[:-len("_navscraper")]
+
+    return module_name
+
+
+def get_navscraper_state(navscraper):
+    ##
+    #   Returns the attributes of a NavScraper that can be stored as JSON,
+    #   e.g. the search parameters that the scraping routines compare with.
+    #
+    #   @param {NavScraper} navscraper
+    #
+    #   @return {dict}
+    #
+
+    return dict(
+        (name, value) for name, value in vars(navscraper).items()
+        if isinstance(value, (basestring, int, long, float, bool, type(None)))
+    )
+
+
+def dump_page(navscraper, routine_name, page_source):
+    ##
+    #   Saves a page and the state of the NavScraper into the corpus. Errors
+    #   are logged and never abort a scan.
+    #
+    #   @param {NavScraper} navscraper - NavScraper that scrapes the page.
+    #   @param {string} routine_name - Name of the scraping routine.
+    #   @param {string} page_source - HTML source of the page.
+    #
+
+    if DUMP_DIR is None:
+        return
+
+    try:
+        routine_dir = os.path.join(DUMP_DIR, get_navscraper_name(navscraper), routine_name)
+
+        if not os.path.isdir(routine_dir):
+            try:
+                os.makedirs(routine_dir)
+            except OSError:
+                # Created by another worker.
+                pass
+
+        page_name = "{timestamp}_{pid}_{number}".format(
+            timestamp=time.strftime("%Y%m%d%H%M%S", time.gmtime()),
+            pid=os.getpid(),
+            number=next(_page_counter)
+        )
+
+        if isinstance(page_source, unicode):
+            page_source = page_source.encode("utf-8")
+
+        with open(os.path.join(routine_dir, page_name + ".html"), "w") as page_file:
+            page_file.write(page_source)
+
+        with open(os.path.join(routine_dir, page_name + ".json"), "w") as state_file:
+            json.dump(get_navscraper_state(navscraper), state_file,
+                      indent=1, sort_keys=True, separators=(",", ": "))
+
+    except:
+        logging.exception("Page of '{0}' could not be dumped.".format(routine_name))
+
+
+def scraping_routine(routine):
+    ##
+    #   Decorator for the scraping routines of the NavScrapers. Dumps the
+    #   page source into the corpus and marks the routine for the benchmark.
+    #
+    #   @param {function} routine - Method with the parameter page_source.
+    #
+    #   @return {function}
+    #
+
+    @functools.wraps(routine)
+    def wrapper(self, page_source):
+        dump_page(self, routine.__name__, page_source)
+        return routine(self, page_source=page_source)
+
+    wrapper.is_scraping_routine = True
+
+    return wrapper
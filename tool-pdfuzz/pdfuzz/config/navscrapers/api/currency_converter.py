@@ -9,7 +9,12 @@
 #
 
 
+import os
 import re
+import time
+import json
+import logging
+import tempfile
 import urllib2
 import csv
 import requests
@@ -17,6 +22,20 @@ import requests
 EXCHANGE_RATES = {}
 REGEX_PRICE = re.compile("([0-9]+[.])*[0-9]+")
 
+# Timeout in seconds for requests to the exchange rate APIs.
+REQUEST_TIMEOUT = 10
+
+# Settings of the exchange rate cache. They are set by init_exchange_rates().
+EXCHANGE_RATES_CACHE_FILE = None
+EXCHANGE_RATES_TTL = 12 * 3600
+EXCHANGE_RATES_OFFLINE = False
+
+# All currency codes that can be returned by get_currency_code_of_sign().
+CURRENCY_CODES = [
+    "BRL", "SGD", "ARS", "CLP", "HKD", "CAD", "USD", "GBP", "JPY", "INR",
+    "IDR", "RON", "ILS", "CZK", "PLN", "VND", "UAH", "KRW", "RUB",
+]
+
 
 
 def get_exchange_rate_yahoo(src_currency_code, dest_currency_code="EUR"):
@@ -33,9 +52,13 @@ def get_exchange_rate_yahoo(src_currency_code, dest_currency_code="EUR"):
     url = "http://download.finance.yahoo.com/d/quotes.csv?s={src_currency_code}{dest_currency_code}=X&f=l1".format(
         src_currency_code=src_currency_code, dest_currency_code=dest_currency_code)
 
-    response = urllib2.urlopen(url)
-    csv_reader = csv.reader(response)
-    exchange_rate = next(csv_reader)[0]
+    try:
+        response = urllib2.urlopen(url, timeout=REQUEST_TIMEOUT)
+        csv_reader = csv.reader(response)
+        exchange_rate = next(csv_reader)[0]
+
+    except:
+        exchange_rate = "N/A"
 
     # API returns N/A if the requested exchange rate can not be found.
     if exchange_rate == "N/A":
@@ -64,7 +87,7 @@ def get_exchange_rate_appspot(src_currency_code, dest_currency_code="EUR"):
         src_currency_code=src_currency_code, dest_currency_code=dest_currency_code)
 
     try:
-        response = requests.get(url)
+        response = requests.get(url, timeout=REQUEST_TIMEOUT)
         exchange_rate = response.json()["rate"]
 
     except:
@@ -98,6 +121,174 @@ def get_exchange_rate(src_currency_code, dest_currency_code="EUR"):
     return exchange_rate
 
 
+def init_exchange_rates(cache_filename, ttl=12 * 3600, offline_filename=None):
+    ##
+    #   Fills the EXCHANGE_RATES dictionary before the scraping starts. If an
+    #   offline file is given, its rates are used and the network is never
+    #   requested. Otherwise the rates of all known currency codes are read
+    #   from the cache file, and missing or expired rates are requested and
+    #   stored in the cache file. Processes that are forked afterwards
+    #   inherit the rates.
+    #
+    #   @param {string} cache_filename - Path to the JSON cache file.
+    #   @param {int} ttl - Seconds until a cached exchange rate expires.
+    #   @param {string} offline_filename - (optional) Path to a JSON file
+    #   with fixed exchange rates to EUR. Example: {"USD": 0.92}
+    #
+
+    global EXCHANGE_RATES_CACHE_FILE, EXCHANGE_RATES_TTL, EXCHANGE_RATES_OFFLINE
+
+    EXCHANGE_RATES_CACHE_FILE = cache_filename
+    EXCHANGE_RATES_TTL = ttl
+
+    if offline_filename is not None:
+        # Use the fixed exchange rates only.
+        EXCHANGE_RATES_OFFLINE = True
+        EXCHANGE_RATES.update(_read_exchange_rates_file(filename=offline_filename, ttl=None))
+        logging.info("Exchange rates loaded from '{0}'.".format(offline_filename))
+        return
+
+    EXCHANGE_RATES.update(_read_exchange_rates_file(filename=cache_filename, ttl=ttl))
+
+    missing_currency_codes = [
+        currency_code for currency_code in CURRENCY_CODES
+        if currency_code not in EXCHANGE_RATES
+    ]
+
+    for currency_code in missing_currency_codes:
+        EXCHANGE_RATES[currency_code] = \
+            get_exchange_rate(src_currency_code=currency_code)
+
+    if len(missing_currency_codes) > 0:
+        _write_exchange_rates_file(
+            filename=cache_filename,
+            exchange_rates=dict(
+                (currency_code, EXCHANGE_RATES[currency_code])
+                for currency_code in missing_currency_codes
+            )
+        )
+
+    logging.info("Exchange rates prefetched ({0} requested).".format(
+        len(missing_currency_codes)))
+
+
+def get_cached_exchange_rate(currency_code):
+    ##
+    #   Returns the exchange rate of the currency to euro. The rate is taken
+    #   from the EXCHANGE_RATES dictionary. A rate that is unknown, is looked
+    #   up in the cache file first, before it is requested.
+    #
+    #   @param {string} currency_code - Code (i.e. USD) of the currency.
+    #
+    #   @return {float} exchange_rate
+    #
+
+    if currency_code in EXCHANGE_RATES:
+        return EXCHANGE_RATES[currency_code]
+
+    if EXCHANGE_RATES_OFFLINE:
+        # Never request the network in offline mode.
+        EXCHANGE_RATES[currency_code] = None
+        return None
+
+    if EXCHANGE_RATES_CACHE_FILE is not None:
+        # Another process may have stored the rate in the meantime.
+        EXCHANGE_RATES.update(_read_exchange_rates_file(
+            filename=EXCHANGE_RATES_CACHE_FILE, ttl=EXCHANGE_RATES_TTL))
+
+    if currency_code not in EXCHANGE_RATES:
+        # Determine exchange rate for current currency to euro.
+        EXCHANGE_RATES[currency_code] = \
+            get_exchange_rate(src_currency_code=currency_code)
+
+        if EXCHANGE_RATES_CACHE_FILE is not None:
+            _write_exchange_rates_file(
+                filename=EXCHANGE_RATES_CACHE_FILE,
+                exchange_rates={currency_code: EXCHANGE_RATES[currency_code]}
+            )
+
+    return EXCHANGE_RATES[currency_code]
+
+
+def _read_exchange_rates_file(filename, ttl):
+    ##
+    #   Reads exchange rates from a JSON file. Two formats are accepted:
+    #   {"USD": 0.92} for fixed rates and {"USD": {"rate": 0.92, "time": ..}}
+    #   for cached rates. Cached rates that are older than ttl are ignored.
+    #
+    #   @param {string} filename - Path to the JSON file.
+    #   @param {int} ttl - Seconds until a cached rate expires. None to accept
+    #   all rates.
+    #
+    #   @return {dict} Exchange rates by currency code.
+    #
+
+    exchange_rates = {}
+
+    try:
+        with open(filename, "r") as rates_file:
+            file_content = json.load(rates_file)
+
+    except (IOError, ValueError):
+        return exchange_rates
+
+    now = time.time()
+
+    for currency_code, entry in file_content.items():
+
+        if isinstance(entry, dict):
+            if ttl is not None and now - entry.get("time", 0) > ttl:
+                # Cached rate is expired.
+                continue
+            exchange_rate = entry.get("rate", None)
+
+        else:
+            exchange_rate = entry
+
+        exchange_rates[currency_code.encode("utf-8")] = exchange_rate
+
+    return exchange_rates
+
+
+def _write_exchange_rates_file(filename, exchange_rates):
+    ##
+    #   Adds the exchange rates to the JSON cache file. The file is replaced
+    #   atomically, so that other processes never read a partial file.
+    #
+    #   @param {string} filename - Path to the JSON cache file.
+    #   @param {dict} exchange_rates - Exchange rates by currency code.
+    #
+
+    try:
+        with open(filename, "r") as rates_file:
+            file_content = json.load(rates_file)
+
+    except (IOError, ValueError):
+        file_content = {}
+
+    now = time.time()
+
+    for currency_code, exchange_rate in exchange_rates.items():
+
+        # Unavailable rates are requested again by the next run.
+        if exchange_rate is None:
+            continue
+
+        file_content[currency_code] = {"rate": exchange_rate, "time": now}
+
+    try:
+        file_descriptor, tmp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(filename)))
+
+        with os.fdopen(file_descriptor, "w") as tmp_file:
+            json.dump(file_content, tmp_file)
+
+        os.rename(tmp_filename, filename)
+
+    except (IOError, OSError):
+        logging.exception("Unable to store exchange rates in '{0}'.".format(filename))
+
+
 def get_currency_code_of_sign(currency_sign="€"):
     ##
     #   Determine the corresponding currency code for the input sign of the currency.
@@ -172,20 +363,15 @@ def get_normalized_price(price, currency_code):
 
     if currency_code != "EUR":
         # If currency is not euro, it needs to be normalized.
-        if not currency_code in EXCHANGE_RATES:
-            # Determine exchange rate for current currency to euro.
-            # Save the rate in the EXCHANGE_RATES dictionary to
-            # improve the performance.
-            EXCHANGE_RATES[currency_code] = \
-                get_exchange_rate(src_currency_code=currency_code)
+        exchange_rate = get_cached_exchange_rate(currency_code=currency_code)
 
         # Check if exchange rate is None
-        if EXCHANGE_RATES[currency_code] is None:
+        if exchange_rate is None:
             price_norm = None
 
         else:
             # Calculate the euro value.
-            price_norm = round(price * EXCHANGE_RATES[currency_code], 2)
+            price_norm = round(price * exchange_rate, 2)
 
     else:
         # If currency is euro then use the price as the normalized one.
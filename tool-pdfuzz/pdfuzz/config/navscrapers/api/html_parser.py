@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module offers the HTML parser for the scraping routines of the
+#   NavScrapers. If lxml and cssselect are installed, the pages are parsed by
+#   lxml and the CSS selectors are compiled once. Otherwise BeautifulSoup is
+#   used. The lxml nodes offer the subset of the BeautifulSoup interface that
+#   is used by the NavScrapers (select, find_all, get, string, strings and
+#   contents), so the scraping routines work with both backends.
+#
+#   @date   18.10.2026
+#
+
+import bs4
+
+import pdfuzz.config.navscrapers.api.timing as Timing
+
+try:
+    import lxml.etree
+    import lxml.html
+    import lxml.cssselect
+    LXML_AVAILABLE = True
+
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+# Backend that is used by parse_html(). Possible values are "lxml" and "bs4".
+BACKEND = "lxml" if LXML_AVAILABLE else "bs4"
+
+# Compiled CSS selectors, stored by the selector string.
+_SELECTOR_CACHE = {}
+
+
+def set_backend(backend):
+    ##
+    #   Changes the backend of the parser.
+    #
+    #   @param {string} backend - "lxml" or "bs4".
+    #
+
+    global BACKEND
+
+    if backend not in ["lxml", "bs4"]:
+        raise ValueError("Unknown parser backend: '{0}'".format(backend))
+
+    if backend == "lxml" and not LXML_AVAILABLE:
+        raise ValueError("The lxml backend requires the packages lxml and cssselect.")
+
+    BACKEND = backend
+
+
+def parse_html(page_source):
+    ##
+    #   Parses the page source with the current backend.
+    #
+    #   @param {string} page_source - HTML source of the page.
+    #
+    #   @return {bs4.BeautifulSoup or LxmlNode} root of the document.
+    #
+
+    with Timing.span("parse"):
+        return _parse_html(page_source)
+
+
+def _parse_html(page_source):
+
+    if BACKEND == "bs4":
+        return bs4.BeautifulSoup(page_source, 'html.parser')
+
+    if isinstance(page_source, unicode):
+        page_source = page_source.encode("utf-8")
+
+    parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    try:
+        root = lxml.html.document_fromstring(page_source, parser=parser)
+
+    except lxml.etree.ParserError:
+        # Empty documents can not be parsed.
+        root = lxml.html.document_fromstring("<html></html>", parser=parser)
+
+    return LxmlNode(root)
+
+
+def _get_selector(css_selector):
+    ##
+    #   Returns the compiled version of the CSS selector.
+    #
+    #   @param {string} css_selector
+    #
+    #   @return {lxml.cssselect.CSSSelector}
+    #
+
+    if css_selector not in _SELECTOR_CACHE:
+        _SELECTOR_CACHE[css_selector] = lxml.cssselect.CSSSelector(css_selector)
+
+    return _SELECTOR_CACHE[css_selector]
+
+
+def _is_element(node):
+    # Comments and processing instructions do not have a string tag.
+    return isinstance(node.tag, basestring)
+
+
+def _is_comment(node):
+    return node.tag is lxml.etree.Comment
+
+
+class TextNode(unicode):
+    ##
+    #   Text of the document. Like the NavigableString of BeautifulSoup, the
+    #   string attribute of a text is the text itself.
+    #
+
+    @property
+    def string(self):
+        return self
+
+
+class CommentNode(TextNode):
+    ##
+    #   Comment of the document. Like the Comment of BeautifulSoup, it is a
+    #   child in the contents, but not part of the strings of an element.
+    #
+
+    pass
+
+
+class LxmlNode(object):
+    ##
+    #   Wrapper around an lxml element that behaves like a bs4.element.Tag
+    #   for the methods that are used by the NavScrapers.
+    #
+
+    __slots__ = ["element"]
+
+    def __init__(self, element):
+        ##
+        #
+        #   @param {lxml.html.HtmlElement} element
+        #
+
+        self.element = element
+
+    def select(self, css_selector):
+        ##
+        #   Returns all descendants that match the CSS selector.
+        #
+        #   @param {string} css_selector
+        #
+        #   @return {list}
+        #
+
+        element = self.element
+
+        return [
+            LxmlNode(match) for match in _get_selector(css_selector)(element)
+            if match is not element
+        ]
+
+    def find_all(self, name=None, attrs={}):
+        ##
+        #   Returns all descendants with the tag name and the attributes. The
+        #   class attribute matches, if the element has the given class.
+        #
+        #   @param {string} name - (optional) Tag name.
+        #   @param {dict} attrs - (optional) Attribute values.
+        #
+        #   @return {list}
+        #
+
+        matches = []
+
+        for element in self.element.iterdescendants(name):
+
+            if not _is_element(element):
+                continue
+
+            for key, value in attrs.items():
+                if key == "class":
+                    if value not in element.get("class", "").split():
+                        break
+                elif element.get(key) != value:
+                    break
+
+            else:
+                matches.append(LxmlNode(element))
+
+        return matches
+
+    def get(self, key, default=None):
+        ##
+        #   Returns the value of the attribute. The class attribute is
+        #   returned as a list of classes.
+        #
+        #   @param {string} key - Name of the attribute.
+        #   @param {} default - (optional) Value if the attribute is missing.
+        #
+
+        value = self.element.get(key)
+
+        if value is None:
+            return default
+
+        if key == "class":
+            return value.split()
+
+        return value
+
+    def __getitem__(self, key):
+
+        value = self.get(key)
+
+        if value is None:
+            raise KeyError(key)
+
+        return value
+
+    @property
+    def contents(self):
+        ##
+        #   List of the child elements, texts and comments. Like with
+        #   BeautifulSoup, the comments are counted as children, e.g. by the
+        #   index of a child and by the string attribute.
+        #
+
+        contents = []
+
+        if self.element.text:
+            contents.append(TextNode(self.element.text))
+
+        for child in self.element:
+
+            if _is_element(child):
+                contents.append(LxmlNode(child))
+
+            elif _is_comment(child):
+                contents.append(CommentNode(child.text or u""))
+
+            if child.tail:
+                contents.append(TextNode(child.tail))
+
+        return contents
+
+    @property
+    def string(self):
+        ##
+        #   Text of the element, if it has a single child. Otherwise None.
+        #
+
+        contents = self.contents
+
+        if len(contents) != 1:
+            return None
+
+        return contents[0].string
+
+    @property
+    def strings(self):
+        ##
+        #   Generator over all texts within the element.
+        #
+
+        if self.element.text:
+            yield TextNode(self.element.text)
+
+        for child in self.element:
+
+            if _is_element(child):
+                for text in LxmlNode(child).strings:
+                    yield text
+
+            if child.tail:
+                yield TextNode(child.tail)
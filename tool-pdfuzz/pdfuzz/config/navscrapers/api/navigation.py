@@ -17,9 +17,17 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from pdfuzz.selenium_extension import expected_conditions as MyEC
+import pdfuzz.config.navscrapers.api.timing as Timing
 
 
-def set_date_in_basic_datepicker(driver, date_css_selector, next_month_css_selector, delay_before_date_click=2.5):
+# Interval in seconds to check the conditions of the waits.
+POLL_FREQUENCY = 0.25
+
+# Maximal number of months to go forward in a datepicker.
+DATEPICKER_MONTHS_LIMIT = 24
+
+
+def set_date_in_basic_datepicker(driver, date_css_selector, next_month_css_selector, timeout=10):
     ##
     #   Set up the date for checkin or checkout and passes back the state
     #   of success of failure.
@@ -30,47 +38,187 @@ def set_date_in_basic_datepicker(driver, date_css_selector, next_month_css_selec
     #   @param {string} next_month_css_selector - CSS selector to go to the
     #   next month, if the date is not visible in the current view of the
     #   datepicker.
-    #   @param {float} delay_before_date_click - Delay in seconds to wait before
-    #   trying to select the date. Default: 2.5sec
+    #   @param {float} timeout - Maximal number of seconds to wait for the
+    #   datepicker to appear. Default: 10sec
     #
     #   @return {bool} status
     #
 
     status = False
+    month_counter = 0
 
-    while True:
-        # Delay for datepicker to appear.
-        time.sleep(delay_before_date_click)
-        try:
-            date_element = driver.find_element_by_css_selector(date_css_selector)
-            date_element.click()
+    with Timing.span("datepicker"):
+        while True:
+            try:
+                # Wait for the datepicker to appear.
+                wait_for_datepicker(
+                    driver=driver,
+                    date_css_selector=date_css_selector,
+                    next_month_css_selector=next_month_css_selector,
+                    timeout=timeout
+                )
 
-            status = True
-            break
+                date_element = driver.find_element_by_css_selector(date_css_selector)
+                date_element.click()
 
-        except (selenium.common.exceptions.NoSuchElementException, \
-            selenium.common.exceptions.ElementNotVisibleException):
+                status = True
+                break
 
-            try:
+            except (selenium.common.exceptions.NoSuchElementException, \
+                selenium.common.exceptions.ElementNotVisibleException, \
+                selenium.common.exceptions.TimeoutException):
 
-                if next_month_css_selector is None:
-                    raise
+                try:
 
-                next_month_element = driver.find_element_by_css_selector(next_month_css_selector)
-                next_month_element.click()
-                continue
+                    if next_month_css_selector is None or month_counter >= DATEPICKER_MONTHS_LIMIT:
+                        raise
 
-            except:
+                    next_month_element = driver.find_element_by_css_selector(next_month_css_selector)
+                    next_month_element.click()
+                    month_counter += 1
 
-                print("[DEBUG] Date not found.")
-                logging.exception("Date not found in datepicker: '{0}'".format(date_css_selector))
+                    # Wait for the next month to be rendered.
+                    wait_for_page_to_settle(driver=driver, timeout=timeout, quiet_time=0.25)
+                    continue
 
-                status = False
-                break
+                except:
+
+                    print("[DEBUG] Date not found.")
+                    logging.exception("Date not found in datepicker: '{0}'".format(date_css_selector))
+
+                    status = False
+                    break
 
     return status
 
 
+def wait_for_datepicker(driver, date_css_selector, next_month_css_selector, timeout=10):
+    ##
+    #   Wait for a datepicker to be visible. The datepicker is visible, if
+    #   the date or the button to go to the next month is visible.
+    #
+    #   @param {selenium.webdriver} driver - Webdriver instance.
+    #   @param {string} date_css_selector - CSS selector for the date within
+    #   the datepicker.
+    #   @param {string} next_month_css_selector - CSS selector for the
+    #   next-month button. Can be None.
+    #   @param {int} timeout - Timeout for the waiting process.
+    #
+    #   @return {element} First visible element.
+    #
+    #   @raise selenium.common.exceptions.TimeoutException
+    #
+
+    locators = [(By.CSS_SELECTOR, date_css_selector)]
+
+    if next_month_css_selector is not None:
+        locators.append((By.CSS_SELECTOR, next_month_css_selector))
+
+    element = WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+        MyEC.visibility_of_any_element_located(locators)
+    )
+
+    return element
+
+
+def wait_for_network_idle(driver, timeout=10, idle_time=0.5):
+    ##
+    #   Wait for the page to be loaded and for all XMLHttpRequests to be
+    #   finished. The requests are monitored from the start of the page by
+    #   the injection code (see MyEC.NETWORK_MONITOR_INSTALL_SCRIPT).
+    #
+    #   @param {selenium.webdriver} driver - Webdriver instance.
+    #   @param {int} timeout - Timeout for the waiting process.
+    #   @param {float} idle_time - Number of seconds without any request.
+    #
+    #   @raise selenium.common.exceptions.TimeoutException
+    #
+
+    WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+        MyEC.network_to_be_idle(idle_time)
+    )
+
+
+def wait_for_dom_to_settle(driver, timeout=10, quiet_time=0.5):
+    ##
+    #   Wait for the DOM tree to be unchanged for a given time, e.g. until
+    #   an animation or the rendering of new results has finished.
+    #
+    #   @param {selenium.webdriver} driver - Webdriver instance.
+    #   @param {int} timeout - Timeout for the waiting process.
+    #   @param {float} quiet_time - Number of seconds without any change.
+    #
+    #   @raise selenium.common.exceptions.TimeoutException
+    #
+
+    WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+        MyEC.dom_to_be_settled(quiet_time)
+    )
+
+
+def wait_for_page_to_settle(driver, timeout=10, quiet_time=0.5):
+    ##
+    #   Wait until the network is idle and the DOM tree has settled. This
+    #   replaces fixed delays after an interaction with the page. If the page
+    #   does not settle within the timeout, the navigation goes on.
+    #
+    #   @param {selenium.webdriver} driver - Webdriver instance.
+    #   @param {float} timeout - Maximal number of seconds to wait.
+    #   @param {float} quiet_time - Number of seconds without any request or
+    #   change of the DOM tree.
+    #
+    #   @return {bool} True, if the page has settled within the timeout.
+    #
+
+    start = time.time()
+
+    try:
+        wait_for_network_idle(driver=driver, timeout=timeout, idle_time=quiet_time)
+        wait_for_dom_to_settle(
+            driver=driver,
+            timeout=max(timeout - (time.time() - start), POLL_FREQUENCY),
+            quiet_time=quiet_time
+        )
+
+    except selenium.common.exceptions.TimeoutException:
+        logging.debug("Page did not settle within {0} sec.".format(timeout))
+        return False
+
+    except selenium.common.exceptions.WebDriverException:
+        # The monitor scripts could not be executed, e.g. while the page is
+        # reloaded. Fall back to the remaining time as fixed delay.
+        time.sleep(max(timeout - (time.time() - start), 0))
+        return False
+
+    return True
+
+
+def wait_for_number_of_elements_to_increase(driver, element_css_selector, number_of_known_elements, timeout=30):
+    ##
+    #   Wait for more elements, which are specified by a CSS selector, than
+    #   the already known elements. E.g. for results that are appended by
+    #   scrolling down.
+    #
+    #   @param {selenium.webdriver} driver - Webdriver instance.
+    #   @param {string} element_css_selector - CSS selector for the elements
+    #   of interest.
+    #   @param {int} number_of_known_elements - Number of elements that were
+    #   already present.
+    #   @param {int} timeout - Timeout for the waiting process.
+    #
+    #   @return {list} All elements.
+    #
+    #   @raise selenium.common.exceptions.TimeoutException
+    #
+
+    elements = WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+        MyEC.number_of_elements_to_be_more_than(
+            (By.CSS_SELECTOR, element_css_selector), number_of_known_elements)
+    )
+
+    return elements
+
+
 def wait_for_text_to_be_not_present_in_element(driver, element_css_selector, old_text, timeout=30):
     ##
     #   Wait for a new text in an element which is spcified by a CSS selector.
@@ -112,3 +260,31 @@ def wait_for_the_presence_of_element(driver, element_css_selector, timeout=30):
     )
 
     return element
+
+
+def get_appended_elements_html(driver, element_css_selector, number_of_known_elements):
+    ##
+    #   Returns the HTML code of the elements which are specified by a CSS
+    #   selector and come after the already known elements. This is used to
+    #   scrape only the results that were appended to an extending result
+    #   list, instead of the full page source.
+    #
+    #   @param {selenium.webdriver} driver - Webdriver instance.
+    #   @param {string} element_css_selector - CSS selector for the elements
+    #   of interest.
+    #   @param {int} number_of_known_elements - Number of elements that were
+    #   already scraped.
+    #
+    #   @return {list} Outer HTML of the new elements.
+    #
+
+    return driver.execute_script('''
+        var elements = document.querySelectorAll(arguments[0]);
+        var elements_html = [];
+
+        for (var i = arguments[1]; i < elements.length; i++) {
+            elements_html.push(elements[i].outerHTML);
+        }
+
+        return elements_html;
+    ''', element_css_selector, number_of_known_elements)
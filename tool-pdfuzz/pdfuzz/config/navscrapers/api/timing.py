@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module measures where the time of a scan goes. The fuzzing engine
+#   opens a scan for every attempt with a fingerprint, and the stages of the
+#   scan and the steps of the NavScrapers are measured as named spans:
+#
+#   with Timing.span("datepicker"):
+#       ...
+#
+#   Nested spans are named by their path, e.g. "navigation/datepicker". At
+#   the end of the scan, every span is appended as a JSON line with the tags
+#   of the scan (worker, country, site, fingerprint) to the timing log. Spans
+#   outside of a scan or without a timing log are not recorded.
+#
+#   @date   18.10.2026
+#
+
+import os
+import math
+import time
+import json
+import threading
+import contextlib
+
+
+# JSON lines file the spans are appended to. None turns the timing off.
+TIMING_LOG_FILENAME = None
+
+# The scans of the workers. Every thread has its own scan.
+_scan = threading.local()
+
+
+def set_log_file(filename):
+    ##
+    #   Sets the file the spans are appended to.
+    #
+    #   @param {string} filename - Path of the JSON lines file or None to
+    #   turn the timing off.
+    #
+
+    global TIMING_LOG_FILENAME
+
+    TIMING_LOG_FILENAME = filename
+
+
+def start_scan(**tags):
+    ##
+    #   Opens the scan of the current thread.
+    #
+    #   @param {dict} tags - Tags that are stored with every span, e.g.
+    #   worker, country, site and fp_id.
+    #
+
+    if TIMING_LOG_FILENAME is None:
+        return
+
+    _scan.tags = tags
+    _scan.spans = []
+    _scan.path = []
+    _scan.start = time.time()
+
+
+def is_scan_active():
+
+    return getattr(_scan, "spans", None) is not None
+
+
+@contextlib.contextmanager
+def span(name):
+    ##
+    #   Measures the duration of the enclosed block.
+    #
+    #   @param {string} name - Name of the stage or step.
+    #
+
+    if not is_scan_active():
+        yield
+        return
+
+    _scan.path.append(name)
+    stage = "/".join(_scan.path)
+    start = time.time()
+
+    try:
+        yield
+
+    finally:
+        _scan.spans.append((stage, start, time.time() - start))
+        _scan.path.pop()
+
+
+def finish_scan(status):
+    ##
+    #   Closes the scan of the current thread and appends its spans and the
+    #   total duration as "scan" to the timing log.
+    #
+    #   @param {string} status - Result of the scan, e.g. "completed".
+    #
+
+    if not is_scan_active():
+        return
+
+    spans = _scan.spans
+    spans.append(("scan", _scan.start, time.time() - _scan.start))
+
+    lines = []
+    for stage, start, duration in spans:
+        record = dict(_scan.tags)
+        record.update({
+            "stage": stage,
+            "start": round(start, 3),
+            "duration": round(duration, 4),
+            "status": status,
+        })
+        lines.append(json.dumps(record) + "\n")
+
+    _scan.spans = None
+
+    # A single write per scan keeps the lines of the workers apart.
+    log_file = os.open(TIMING_LOG_FILENAME, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0644)
+    try:
+        os.write(log_file, "".join(lines))
+    finally:
+        os.close(log_file)
+
+
+def read_records(filename):
+    ##
+    #   Reads the spans of a timing log.
+    #
+    #   @param {string} filename - Path of the JSON lines file.
+    #
+    #   @return {generator} dictionaries of the spans.
+    #
+
+    with open(filename, "r") as log_file:
+        for line in log_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def percentile(sorted_values, fraction):
+    ##
+    #   Returns the percentile of a sorted list by the nearest-rank method.
+    #
+    #   @param {list} sorted_values - Sorted list of numbers.
+    #   @param {float} fraction - Percentile as fraction, e.g. 0.95.
+    #
+    #   @return {float}
+    #
+
+    rank = int(math.ceil(fraction * len(sorted_values))) - 1
+
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+def create_report(records):
+    ##
+    #   Aggregates the durations of the spans per site and stage.
+    #
+    #   @param {iterable} records - Spans of a timing log.
+    #
+    #   @return {list} Tuples (site, stage, count, p50, p95, total) sorted by
+    #   site and stage.
+    #
+
+    durations = {}
+
+    for record in records:
+        key = (record.get("site"), record["stage"])
+        durations.setdefault(key, []).append(record["duration"])
+
+    report = []
+
+    for (site, stage), values in sorted(durations.items()):
+        values.sort()
+        report.append((
+            site,
+            stage,
+            len(values),
+            percentile(values, 0.5),
+            percentile(values, 0.95),
+            sum(values),
+        ))
+
+    return report
+
+
+def print_report(filename):
+    ##
+    #   Prints the p50 and p95 durations of every stage per site.
+    #
+    #   @param {string} filename - Path of the JSON lines file.
+    #
+
+    print("{site:35} {stage:35} {count:>7} {p50:>9} {p95:>9} {total:>10}".format(
+        site="site", stage="stage", count="count", p50="p50 [s]", p95="p95 [s]", total="total [s]"))
+
+    for site, stage, count, p50, p95, total in create_report(read_records(filename)):
+        print("{site:35} {stage:35} {count:7} {p50:9.2f} {p95:9.2f} {total:10.1f}".format(
+            site=site, stage=stage, count=count, p50=p50, p95=p95, total=total))
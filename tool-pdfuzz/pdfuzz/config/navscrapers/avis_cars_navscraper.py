@@ -15,7 +15,6 @@ import logging
 import re
 import time
 from datetime import datetime
-import bs4
 
 from pprint import pprint
 
@@ -29,6 +28,8 @@ from selenium.webdriver.common.keys import Keys
 
 import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
 import pdfuzz.config.navscrapers.api.navigation as Navigation
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.corpus as Corpus
 import pdfuzz.common.exceptions as PDFuzzExceptions
 
 
@@ -137,14 +138,14 @@ class NavScraper:
 
         pickup_location_field = driver.find_element_by_css_selector("#location")
         pickup_location_field.click()
-        time.sleep(1)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
         pickup_location_field.send_keys(self.picking_up_location)
         logging.debug("[AVIS CARS] Pickup location entered")
-        time.sleep(1)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
 
         pickup_date_field = driver.find_element_by_css_selector("#from")
         pickup_date_field.click()
-        time.sleep(1)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
         pick_up_date_string = "{month:02d}/{day:02d}/{year}".format(
             day=self.pick_up_day,
             month=self.pick_up_month,
@@ -153,7 +154,7 @@ class NavScraper:
         pickup_date_field.send_keys(pick_up_date_string)
         pickup_date_field.send_keys(Keys.RETURN)
         logging.debug("[AVIS CARS] Pickup date entered")
-        time.sleep(3)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=3)
 
 
         drop_off_date_field = driver.find_element_by_css_selector("#to")
@@ -166,7 +167,7 @@ class NavScraper:
         drop_off_date_field.send_keys(drop_off_date_string)
         drop_off_date_field.send_keys(Keys.RETURN)
         logging.debug("[AVIS CARS] Dropoff date entered")
-        time.sleep(3)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=3)
 
         # Convert pick up time to 12h format.
         d = datetime.strptime(self.pick_up_time, "%H:%M")
@@ -273,7 +274,7 @@ class NavScraper:
 
     def _scrape_mobile_results(self, driver):
 
-        time.sleep(2)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
         # driver.get_screenshot_as_file("{0}_avis_cars_SECTIONS_CLOSED_navscraper.png".format(time.time()))
         # Open all car sections.
         car_section_elements = driver.find_elements_by_css_selector(".car-selector > section > h3 > span:nth-of-type(1)")
@@ -289,11 +290,12 @@ class NavScraper:
         return car_results
 
 
+    @Corpus.scraping_routine
     def _mobile_scraping_routine(self, page_source):
 
         car_results = []
 
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         car_sections = soup.select(".car-selector > section")
 
@@ -372,11 +374,12 @@ class NavScraper:
         return car_results
 
 
+    @Corpus.scraping_routine
     def _default_scraping_routine(self, page_source):
 
         car_results = []
 
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         car_items = soup.select("#vehPresentation .listOfVehicles .carView")
 
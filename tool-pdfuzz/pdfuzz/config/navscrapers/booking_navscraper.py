@@ -14,7 +14,6 @@ import logging
 import re
 import time
 import datetime
-import bs4
 # import json
 
 from selenium.webdriver.support.ui import Select
@@ -22,6 +21,8 @@ import selenium
 
 import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
 import pdfuzz.config.navscrapers.api.navigation as Navigation
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.corpus as Corpus
 import pdfuzz.common.exceptions as PDFuzzExceptions
 # import pdfuzz.config.config as cfg
 
@@ -190,7 +191,7 @@ class NavScraper:
 
             # Some extra time to load the results.
             # print("## Sleep 5 sec")
-            time.sleep(2.5)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2.5)
 
         except selenium.common.exceptions.TimeoutException:
 
@@ -383,7 +384,7 @@ class NavScraper:
                 target.html(manipulated_html);
             ''', check_out_day, check_out_monthyear)
 
-            time.sleep(2)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
             logging.debug("Datepicker via injection of hidden input fields automated!")
 
@@ -423,8 +424,7 @@ class NavScraper:
             status = Navigation.set_date_in_basic_datepicker(
                 driver=driver,
                 date_css_selector=cin_date_css_selector,
-                next_month_css_selector=cin_next_month_css_selector,
-                delay_before_date_click=2.5
+                next_month_css_selector=cin_next_month_css_selector
             )
 
             if not status:
@@ -432,7 +432,7 @@ class NavScraper:
                     cin_date_css_selector
                 ))
 
-            time.sleep(2.5)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2.5)
 
             # open checkout datepicker
             check_out_div.click()
@@ -440,8 +440,7 @@ class NavScraper:
             status = Navigation.set_date_in_basic_datepicker(
                 driver=driver,
                 date_css_selector=cout_date_css_selector,
-                next_month_css_selector=cout_next_month_css_selector,
-                delay_before_date_click=2.5
+                next_month_css_selector=cout_next_month_css_selector
             )
 
             if not status:
@@ -487,8 +486,7 @@ class NavScraper:
             status = Navigation.set_date_in_basic_datepicker(
                 driver=driver,
                 date_css_selector=cin_date_css_selector,
-                next_month_css_selector=cin_next_month_css_selector,
-                delay_before_date_click=2.5
+                next_month_css_selector=cin_next_month_css_selector
             )
 
             if not status:
@@ -496,7 +494,7 @@ class NavScraper:
                     cin_date_css_selector
                 ))
 
-            time.sleep(2.5)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2.5)
 
             # open checkout datepicker
             check_out_div.click()
@@ -504,8 +502,7 @@ class NavScraper:
             status = Navigation.set_date_in_basic_datepicker(
                 driver=driver,
                 date_css_selector=cout_date_css_selector,
-                next_month_css_selector=cout_next_month_css_selector,
-                delay_before_date_click=2.5
+                next_month_css_selector=cout_next_month_css_selector
             )
 
             if not status:
@@ -547,8 +544,7 @@ class NavScraper:
             status = Navigation.set_date_in_basic_datepicker(
                 driver=driver,
                 date_css_selector=cin_date_css_selector,
-                next_month_css_selector=cin_next_month_css_selector,
-                delay_before_date_click=2.5
+                next_month_css_selector=cin_next_month_css_selector
             )
 
             if not status:
@@ -556,7 +552,7 @@ class NavScraper:
                     cin_date_css_selector
                 ))
 
-            time.sleep(2.5)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2.5)
 
             # open checkout datepicker
             check_out_div.click()
@@ -564,8 +560,7 @@ class NavScraper:
             status = Navigation.set_date_in_basic_datepicker(
                 driver=driver,
                 date_css_selector=cout_date_css_selector,
-                next_month_css_selector=cout_next_month_css_selector,
-                delay_before_date_click=2.5
+                next_month_css_selector=cout_next_month_css_selector
             )
 
             if not status:
@@ -715,7 +710,7 @@ class NavScraper:
         while True:
 
             driver.execute_script("window.scrollTo(0,document.body.scrollHeight);")
-            time.sleep(2)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
             page_counter += 1
             logging.debug("Scraping page {0}".format(page_counter))
@@ -723,8 +718,6 @@ class NavScraper:
             # driver.get_screenshot_as_file("booking_RESULTS_PAGE_{0}_navscraper.png".format(page_counter))
 
             html_source = driver.page_source
-            with open("booking_dump_page_{}.html".format(page_counter), "w") as f:
-                f.write(html_source.encode("utf-8"))
 
             hotel_results_part = self._default_scraping_routine(page_source=html_source)
             hotel_results.extend(hotel_results_part)
@@ -781,6 +774,7 @@ class NavScraper:
 
         return hotel_results
 
+    @Corpus.scraping_routine
     def _default_scraping_routine(self, page_source):
         ##
         #   ...
@@ -793,7 +787,7 @@ class NavScraper:
         # regex_price = re.compile("([0-9]+[ .])*[0-9]+")
 
         hotel_results = []
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         # Get search information for debug output.
         search_info = number_of_nights = None
@@ -1000,6 +994,7 @@ class NavScraper:
 
         return hotel_results
 
+    @Corpus.scraping_routine
     def _alternative_default_scraping_routine(self, page_source):
         ##
         #   ...
@@ -1013,7 +1008,7 @@ class NavScraper:
         # regex_price = re.compile("([0-9]+[ .])*[0-9]+")
 
         hotel_results = []
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         # Get search information for debug output.
         search_info = number_of_nights = None
@@ -1225,6 +1220,7 @@ class NavScraper:
         return hotel_results
 
 
+    @Corpus.scraping_routine
     def _mobile_scraping_routine(self, page_source):
         ##
         #   ...
@@ -1235,7 +1231,7 @@ class NavScraper:
         #
 
         hotel_results = []
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         # Get search information for debug output.
         search_info = number_of_nights = None
@@ -13,13 +13,15 @@ import sys
 import logging
 import re
 import time
-import bs4
 
 from selenium.webdriver.support.ui import Select
 import selenium
 
 import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
 import pdfuzz.config.navscrapers.api.navigation as Navigation
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.corpus as Corpus
+import pdfuzz.config.navscrapers.api.timing as Timing
 # import pdfuzz.config.config as cfg
 
 
@@ -137,7 +139,7 @@ class NavScraper:
             # Close overlay
             element.click()
             logging.debug("## Overlay closed")
-            time.sleep(2)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
             # driver.get_screenshot_as_file("hotels_OVERLAY_CLOSED_navscraper.png".format(time.time()))
 
         # except selenium.common.exceptions.NoSuchElementException:
@@ -160,7 +162,7 @@ class NavScraper:
             # Close overlay
             element.click()
             logging.debug("## Download App Overlay Closed")
-            time.sleep(2)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
             # driver.get_screenshot_as_file("hotels_OVERLAY_CLOSED_navscraper.png".format(time.time()))
 
         # except selenium.common.exceptions.NoSuchElementException:
@@ -174,7 +176,7 @@ class NavScraper:
         travel_end_element   = driver.find_element_by_id("qf-0q-localised-check-out")
 
         # Little delay for the input form.
-        time.sleep(2)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
         cin_date_css_selector, cin_next_month_css_selector = \
             self._get_datepicker_css_selectors(
@@ -212,7 +214,7 @@ class NavScraper:
             ))
 
         # Little delay for the input form.
-        time.sleep(2)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
         # driver.get_screenshot_as_file("{0}_CHECK_IN_DATE_SELECTED_hotels_navscraper.png".format(time.time()))
 
@@ -234,7 +236,7 @@ class NavScraper:
             ))
 
         # Little delay for the input form.
-        time.sleep(2)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
 
     def _set_rooms_and_adults_number(self, driver):
@@ -296,43 +298,75 @@ class NavScraper:
 
 
     def _scrape_results_scrolling(self, driver):
+        ##
+        #   Scrapes the result list, which is extended by scrolling down. The
+        #   full page is parsed only once. After every scroll only the hotel
+        #   cards that were appended to the list are fetched and parsed by
+        #   _appended_items_scraping_routine(). Both are saved into the corpus
+        #   of the scraping benchmark.
+        #
+        #   @param {selenium.webdriver} driver - Webdriver instance.
+        #
+        #   @return {list}
+        #
 
-        hotel_results = []
-        page_counter = 0
+        hotel_item_selector = "div#listings > ol.listings > li.hotel"
+        page_counter = 1
         result_pages_limit = 20
 
-        last_page_length = 0
+        # The first page is parsed like by _scraping_routine(), but the
+        # number of hotel cards is needed as well.
+        html_source = driver.page_source
+        Corpus.dump_page(self, "_scraping_routine", html_source)
 
-        while True:
+        soup = Parser.parse_html(html_source)
+        self.search_info = self._get_search_info(soup)
 
-            page_counter += 1
+        hotellist_items = soup.select(hotel_item_selector)
+        number_of_items = len(hotellist_items)
+        hotel_results = self._scrape_hotel_items(hotellist_items, self.search_info)
 
-            html_source = driver.page_source
-            hotel_results_part = self._scraping_routine(page_source=html_source)
+        while page_counter < result_pages_limit:
 
-            # Take full page as final result, because if new results are loaded
-            # by scrolling down, the site is extended by scrolling down.
-            hotel_results = list(hotel_results_part)
+            page_counter += 1
 
             try:
-                # Scroll down.
-                logging.debug("[DEBUG] Scroll down")
-                driver.execute_script("window.scrollTo(0,document.body.scrollHeight);")
-                time.sleep(5)
+                with Timing.span("page"):
+                    # Scroll down.
+                    logging.debug("[DEBUG] Scroll down")
+                    driver.execute_script("window.scrollTo(0,document.body.scrollHeight);")
+
+                    # Wait for new hotel cards and for their rendering.
+                    Navigation.wait_for_number_of_elements_to_increase(
+                        driver=driver,
+                        element_css_selector=hotel_item_selector,
+                        number_of_known_elements=number_of_items,
+                        timeout=5
+                    )
+                    Navigation.wait_for_page_to_settle(driver=driver, timeout=5)
+
+                    new_items_html = Navigation.get_appended_elements_html(
+                        driver=driver,
+                        element_css_selector=hotel_item_selector,
+                        number_of_known_elements=number_of_items
+                    )
+
+            except selenium.common.exceptions.TimeoutException:
+                # No more results were loaded.
+                # End loop and return the current results.
+                break
 
             except:
                 # log unexpected errors while scraping
                 logging.exception("Unexpected error:")
-
-
-            if page_counter >= result_pages_limit or len(hotel_results) <= last_page_length:
-                # If the limit is reached.
-                # End loop and return the current results.
                 break
 
-            else:
-                # update the length of the last page.
-                last_page_length = len(hotel_results)
+            number_of_items += len(new_items_html)
+
+            # Parse only the new hotel cards.
+            hotel_results.extend(self._appended_items_scraping_routine(
+                page_source=u"<div id=\"listings\"><ol class=\"listings\">{0}</ol></div>".format(u"".join(new_items_html))
+            ))
 
         return hotel_results
 
@@ -442,6 +476,7 @@ class NavScraper:
         return hotel_results
 
 
+    @Corpus.scraping_routine
     def _scraping_routine(self, page_source):
         ##
         #   ...
@@ -451,12 +486,44 @@ class NavScraper:
         #   @return {list}
         #
 
-        regex_price_per_nights = re.compile("[0-9]+")
+        soup = Parser.parse_html(page_source)
 
-        hotel_results = []
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        search_info = self._get_search_info(soup)
+
+        # Start with the extraction of hotel information.
+        hotellist_items = soup.select("div#listings > ol.listings > li.hotel")
+
+        return self._scrape_hotel_items(hotellist_items, search_info)
+
+
+    @Corpus.scraping_routine
+    def _appended_items_scraping_routine(self, page_source):
+        ##
+        #   Scrapes the hotel cards that were appended to the result list by
+        #   scrolling (see _scrape_results_scrolling()). The search info is
+        #   taken from the first page.
+        #
+        #   @param {string} page_source - Result list with the new cards.
+        #
+        #   @return {list}
+        #
+
+        soup = Parser.parse_html(page_source)
+
+        hotellist_items = soup.select("div#listings > ol.listings > li.hotel")
+
+        return self._scrape_hotel_items(hotellist_items, self.search_info)
+
+
+    def _get_search_info(self, soup):
+        ##
+        #   Extracts the info about the search values. For debug.
+        #
+        #   @param {bs4.BeautifulSoup} soup - Parsed result page.
+        #
+        #   @return {string}
+        #
 
-        # Extract info about the search values. For debug.
         div_search_info = soup.select(".dates-occupancy")
 
         search_dates = div_search_info[0].select(".search-dates")[0].string.encode("utf-8").strip()
@@ -466,9 +533,22 @@ class NavScraper:
         search_info = "{dates}, {nights}, {rooms}".format(
             dates=search_dates, nights=search_nights, rooms=search_rooms)
 
+        return search_info
 
-        # Start with the extraction of hotel information.
-        hotellist_items = soup.select("div#listings > ol.listings > li.hotel")
+
+    def _scrape_hotel_items(self, hotellist_items, search_info):
+        ##
+        #   Extracts the hotel information of the given result list items.
+        #
+        #   @param {list} hotellist_items - Parsed 'li.hotel' elements.
+        #   @param {string} search_info - Info about the search values.
+        #
+        #   @return {list}
+        #
+
+        regex_price_per_nights = re.compile("[0-9]+")
+
+        hotel_results = []
 
         for div in hotellist_items:
             hotelname = price = price_text = number_of_nights = \
@@ -12,7 +12,6 @@
 import sys
 import logging
 import time
-import bs4
 import re
 
 from selenium.webdriver.support.ui import Select
@@ -21,6 +20,9 @@ import selenium
 
 import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
 import pdfuzz.config.navscrapers.api.navigation as Navigation
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.corpus as Corpus
+import pdfuzz.config.navscrapers.api.timing as Timing
 import pdfuzz.common.exceptions as PDFuzzExceptions
 # import pdfuzz.config.config as cfg
 
@@ -163,8 +165,8 @@ class NavScraper:
         logging.debug("## Element found - HRS")
 
         # Some extra time to load the results.
-        logging.debug("## Sleep 5 sec")
-        time.sleep(5)
+        logging.debug("## Wait up to 5 sec for the results to settle")
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=5)
 
         return True
 
@@ -246,7 +248,7 @@ class NavScraper:
 
         logging.debug("[HRS] Checkin date selected.")
 
-        time.sleep(2)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
         travel_end_element.click()
         datepicker_status = Navigation.set_date_in_basic_datepicker(
@@ -397,7 +399,7 @@ class NavScraper:
         open_datepicker_element = driver.find_element_by_css_selector("#cal_trigger")
         open_datepicker_element.click()
 
-        time.sleep(3)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=3)
 
         cin_date_css_selector, cin_next_month_css_selector = \
             self._get_touch_datepicker_css_selectors(
@@ -429,7 +431,7 @@ class NavScraper:
 
             logging.debug("[HRS] Checkin date selected.")
 
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
 
             # Select check-out date.
             datepicker_status = Navigation.set_date_in_basic_datepicker(
@@ -449,7 +451,7 @@ class NavScraper:
             datepicker_ok_element = driver.find_element_by_id("calOK")
             datepicker_ok_element.click()
 
-            time.sleep(2)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
         except PDFuzzExceptions.DateNotFoundException:
             # If the datepicker fails. Try to manipulate the hidden input fields
@@ -467,17 +469,17 @@ class NavScraper:
 
         # Delete default single rooms.
         single_room_minus_element.click()
-        time.sleep(1)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
 
         # Set the number of single rooms via plus button.
         for _ in range(int(self.number_of_single_rooms)):
             single_room_plus_element.click()
-            time.sleep(0.6)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=0.6)
 
         # Set the number of double rooms via plus button.
         for _ in range(int(self.number_of_double_rooms)):
             double_room_plus_element.click()
-            time.sleep(0.6)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=0.6)
 
 
     def scrape_results(self, driver):
@@ -507,7 +509,7 @@ class NavScraper:
 
         # Calculate waiting time. Wait for complete result list.
         waiting_seconds = 5 + self.results_waiting_time
-        time.sleep(waiting_seconds)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=waiting_seconds)
 
         logging.debug("Wait {seconds} sec for complete result list.".format(
             seconds=waiting_seconds
@@ -519,11 +521,12 @@ class NavScraper:
         return self._scraping_routine(page_source=html_source)
 
 
+    @Corpus.scraping_routine
     def _scraping_routine(self, page_source):
 
         hotel_results = []
 
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         hotellist_items = soup.select("div#containerAllHotels > .hotelTeaserContainer")
 
@@ -602,6 +605,9 @@ class NavScraper:
         page_counter    = 0
         page_limit      = 20
 
+        hotel_item_selector = "#resultList .listItem"
+        number_of_items = 0
+
         # driver.get_screenshot_as_file("{0}_TOUCH_RESULTS_hrs_navscraper.png".format(time.time()))
 
         waiting_seconds = float(2.0 + self.results_waiting_time)
@@ -616,35 +622,70 @@ class NavScraper:
             ''')
 
 
-            time.sleep(waiting_seconds)
-            logging.debug("Waited {seconds} sec for more results.".format(
-                seconds=waiting_seconds
-            ))
+            try:
+                with Timing.span("page"):
+                    # Wait for new result items and for their rendering.
+                    Navigation.wait_for_number_of_elements_to_increase(
+                        driver=driver,
+                        element_css_selector=hotel_item_selector,
+                        number_of_known_elements=number_of_items,
+                        timeout=waiting_seconds
+                    )
+                    Navigation.wait_for_page_to_settle(driver=driver, timeout=waiting_seconds)
+
+            except selenium.common.exceptions.TimeoutException:
+                logging.debug("No more results after {seconds} sec.".format(
+                    seconds=waiting_seconds
+                ))
+                break
 
-            html_source = driver.page_source
-            hotel_results_tmp = self._touch_scraping_routine(page_source=html_source)
+            # Fetch only the result items that were appended since the last
+            # scroll, instead of parsing the whole page again.
+            new_items_html = Navigation.get_appended_elements_html(
+                driver=driver,
+                element_css_selector=hotel_item_selector,
+                number_of_known_elements=number_of_items
+            )
 
-            if len(hotel_results_tmp) > len(hotel_results):
-                # Make a full copy of the new list and save it as the result list.
-                hotel_results = list(hotel_results_tmp)
+            if len(new_items_html) == 0:
+                break
 
-                if page_counter >= page_limit:
-                    break
+            number_of_items += len(new_items_html)
 
-            else:
+            # Parse only the new items with the scraping routine, so that
+            # they are saved into the corpus of the scraping benchmark.
+            hotel_results.extend(self._touch_scraping_routine(
+                page_source=u"<div id=\"resultList\">{0}</div>".format(u"".join(new_items_html))
+            ))
+
+            if page_counter >= page_limit:
                 break
 
         return hotel_results
 
 
+    @Corpus.scraping_routine
     def _touch_scraping_routine(self, page_source):
 
-        hotel_results = []
-
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         hotellist_items = soup.select("#resultList .listItem")
 
+        return self._scrape_touch_items(hotellist_items)
+
+
+    def _scrape_touch_items(self, hotellist_items):
+        ##
+        #   Extracts the hotel information of the given result list items of
+        #   the touch version.
+        #
+        #   @param {list} hotellist_items - Parsed '.listItem' elements.
+        #
+        #   @return {list}
+        #
+
+        hotel_results = []
+
         for div in hotellist_items:
             hotelname = price = currency_code = price_norm = None
 
@@ -13,7 +13,6 @@ import sys
 import logging
 import re
 import time
-import bs4
 
 from selenium.webdriver.support.ui import Select
 import selenium
@@ -25,6 +24,8 @@ from selenium.webdriver.common.keys import Keys
 
 import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
 import pdfuzz.config.navscrapers.api.navigation as Navigation
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.corpus as Corpus
 import pdfuzz.common.exceptions as PDFuzzExceptions
 
 
@@ -73,7 +74,7 @@ class NavScraper:
             pick_up_day_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "car-pickup-date")))
             #pick_up_day_field.clear()
             pick_up_day_field.click()
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             # pick_up_date_string = "{month:02d}/{day:02d}/{year}".format(
                 # day=pick_up_day,
                 # month=pick_up_month,
@@ -102,7 +103,7 @@ class NavScraper:
 
             logging.debug("[ORBITZ CARS] Pickup date selected.")
 
-            time.sleep(2)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
             #
             # Set dropoff date
@@ -111,7 +112,7 @@ class NavScraper:
             drop_off_day_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "car-dropoff-date")))
             #drop_off_day_field.clear()
             drop_off_day_field.click()
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             # drop_off_date_string = "{month:02d}/{day:02d}/{year}".format(
                 # day=drop_off_day,
                 # month=drop_off_month,
@@ -136,7 +137,7 @@ class NavScraper:
                 raise PDFuzzExceptions.DateNotFoundException("Unable to find the given date: '{}'".format(
                 drop_off_date_css_selector
                 ))
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             logging.debug("[ORBITZ CARS] Dropoff date selected.")
 
             # #########
@@ -146,17 +147,17 @@ class NavScraper:
             picking_up_field.click()
             #picking_up_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH,"id('tab-car-tab')/x:span[1]")))
             #picking_up_field.clear()
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             picking_up_field.send_keys(picking_up_location)
             picking_up_field.send_keys(Keys.TAB)
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             logging.debug("[ORBITZ CARS] Pickup location entered.")
 
 
             dropping_off_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "car-dropoff")))
             dropping_off_field.click()
             #dropping_off_field.clear()
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             dropping_off_field.send_keys(dropping_off_location)
             logging.debug("[ORBITZ CARS] Dropoff location entered.")
 
@@ -273,11 +274,12 @@ class NavScraper:
         return orbitz_car_results
 
 
+    @Corpus.scraping_routine
     def _scraping_routine(self, page_source):
 
         orbitz_car_results = []
 
-        bsObj = bs4.BeautifulSoup(page_source, 'html.parser')
+        bsObj = Parser.parse_html(page_source)
 
         hotellist_items = bsObj.select("#search-results .listing-wrapper")
 
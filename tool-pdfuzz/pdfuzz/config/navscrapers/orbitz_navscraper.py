@@ -13,7 +13,6 @@ import sys
 import logging
 import re
 import time
-import bs4
 
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.keys import Keys
@@ -21,6 +20,8 @@ import selenium
 
 import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
 import pdfuzz.config.navscrapers.api.navigation as Navigation
+import pdfuzz.config.navscrapers.api.html_parser as Parser
+import pdfuzz.config.navscrapers.api.corpus as Corpus
 import pdfuzz.common.exceptions as PDFuzzExceptions
 # import pdfuzz.config.config as cfg
 
@@ -100,7 +101,7 @@ class NavScraper:
             logging.debug("Set travel dates.")
 
             # Timeout for waiting that the input field is editable.
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             travel_target_element = driver.find_element_by_id("hotel-destination")
             travel_target_element.clear()
             travel_target_element.click()
@@ -323,10 +324,10 @@ class NavScraper:
 
         # Try to click the prev button (For Bugfixing)
         try:
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
             datepicker_prev = driver.find_element_by_css_selector(".datepicker-prev")
             datepicker_prev.click()
-            time.sleep(1)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
         except selenium.common.exceptions.ElementNotVisibleException, e:
             logging.debug("datepicker prev button not found - MOVE ON")
 
@@ -347,7 +348,7 @@ class NavScraper:
 
         # Select check-out date.
         travel_checkout_element.click()
-        time.sleep(1)
+        Navigation.wait_for_page_to_settle(driver=driver, timeout=1)
 
         datepicker_status = Navigation.set_date_in_basic_datepicker(
             driver=driver,
@@ -454,7 +455,7 @@ class NavScraper:
 
                     logging.debug("[SCROLL] Scroll down for more results.")
                     driver.execute_script("window.scrollTo(0,document.body.scrollHeight);")
-                    time.sleep(2.5)
+                    Navigation.wait_for_page_to_settle(driver=driver, timeout=2.5)
                     scrolled_down = True
 
                     continue
@@ -476,6 +477,7 @@ class NavScraper:
         return hotel_results
 
 
+    @Corpus.scraping_routine
     def _alternative_scraping_routine(self, page_source):
         ##
         #   ...
@@ -488,7 +490,7 @@ class NavScraper:
         regex_price = re.compile("([0-9]+[ .])*[0-9]+")
 
         hotel_results = []
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         # search_info_span = soup.select("#breadcrumb div:nth-of-type(5) span")
         # search_target_adults = search_info_span[0].contents[1].string.encode("utf-8").strip()
@@ -616,6 +618,7 @@ class NavScraper:
         return hotel_results
 
 
+    @Corpus.scraping_routine
     def _default_scraping_routine(self, page_source):
         ##
         #   ...
@@ -626,7 +629,7 @@ class NavScraper:
         #
 
         hotel_results = []
-        soup = bs4.BeautifulSoup(page_source, 'html.parser')
+        soup = Parser.parse_html(page_source)
 
         # search_info_span = soup.select("#breadcrumb div:nth-of-type(5) span")
         # search_target_adults = search_info_span[0].contents[1].string.encode("utf-8").strip()
@@ -763,7 +766,7 @@ class NavScraper:
                 if room_counter[0] > 0:
                     # Add a new room if more than one room is needed.
                     add_room_link.click()
-                    time.sleep(1.5)
+                    Navigation.wait_for_page_to_settle(driver=driver, timeout=1.5)
 
                 # Setup a single room.
                 set_room_function(
@@ -69,7 +69,7 @@ class NavScraper:
             more_results = driver.find_element_by_id("showFingerprintLink2")
             more_results.click()
 
-            time.sleep(2)
+            Navigation.wait_for_page_to_settle(driver=driver, timeout=2)
 
             print("## Element found - panopticlick")
 
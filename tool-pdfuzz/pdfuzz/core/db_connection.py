@@ -9,14 +9,68 @@
 #   @author Nicolai Wilkop
 #
 
+import os
 import time
+import json
+import hashlib
 import logging
+import datetime
+import tempfile
+import threading
+import Queue
 
 from contextlib import closing
 import MySQLdb
 import MySQLdb.cursors
 
 import pdfuzz.config.config as cfg
+import pdfuzz.core.spool as Spool
+
+
+# States of a task in the scan ledger. Tasks without an entry are pending.
+TASK_STATUS_COMPLETED = "completed"
+TASK_STATUS_FAILED = "failed"
+
+# Dimension tables of the results tables and the columns that identify an
+# entry. The products have a table per website type. The entries are found by
+# the MD5 hash of their columns in the key_hash column.
+DIMENSION_TABLES = {
+    "provider": ("dim_provider", ["name"]),
+    "country": ("dim_country", ["name"]),
+    "proxy": ("dim_proxy", ["address"]),
+    cfg.PAGE_TYPES.HOTELS: ("dim_product_hotels", ["provider_id", "name", "location"]),
+    cfg.PAGE_TYPES.CARS: ("dim_product_cars", ["provider_id", "company_name", "car_class", "car_model", "transmission"]),
+}
+
+# Columns of the results tables in the order of the row tuples.
+RESULT_COLUMNS = {
+    cfg.PAGE_TYPES.HOTELS: [
+        "run_id", "provider_id", "product_id", "country_id", "proxy_id", "room_type", "price",
+        "currency", "price_euro", "nights", "rating_value", "rating_unit", "fp_id",
+        "search_param_id", "request_timezone_offset", "access_time"
+    ],
+    cfg.PAGE_TYPES.CARS: [
+        "run_id", "provider_id", "product_id", "country_id", "proxy_id", "price_daily",
+        "price_norm_daily", "price_total", "price_norm_total", "currency", "fp_id",
+        "search_param_id", "request_timezone_offset", "access_time"
+    ],
+}
+
+# Format of the access time of the NavScraper results.
+ACCESS_TIME_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+# Error codes of MySQL clients, after which a query is repeated on a new
+# connection: 2003 (can't connect), 2006 (server has gone away), 2013 (lost
+# connection during query) and 2055 (lost connection, system error).
+TRANSIENT_ERRORS = (2003, 2006, 2013, 2055)
+
+# Connection pools of the current process by their settings.
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+# Pools that were inherited from the parent process.
+_inherited_pools = []
 
 
 class DBManager:
@@ -25,114 +79,160 @@ class DBManager:
     #   database.
     #
 
-    def __init__(self, settings, website_type, mode="fuzzing", result_table_name="pdfuzz_results"):
+    def __init__(self, settings, website_type, mode="fuzzing", run_name=None):
         ##
         #   Constructor for the DBManager.
         #
         #   @param {dict} settings - Dictionary with the connection settings.
         #   @param {string} website_type - Type of the website. Example: 'hotels'.
         #   @param {string} mode - String to setup the mode of the instance.
-        #   The possible settings are 'init' and 'fuzzing'.
-        #   @param {string} result_table_name - The name of the table which
-        #   holds the results.
+        #   The possible settings are 'init', 'fuzzing', 'fuzzing_read',
+        #   'fuzzing_write', 'analysis' (read-only, for the results of a
+        #   run) and 'ingest' (loads the spool segments of a run).
+        #   @param {string} run_name - Name of the run in the run catalog. In
+        #   the 'analysis' mode, the website type is taken from the run.
+        #
+        #   The queries of all modes use the connections of the pool of the
+        #   process (see get_pool()). A connection is only held while a query
+        #   runs.
         #
 
         self.connection_mode = mode
-        self.result_table_name = result_table_name
+        self.run_name = run_name
         self.website_type = website_type
+        self.result_table_name = get_results_table_name(website_type)
         self.fingerprint_table_name = cfg.FINGERPRINT_TABLE_NAME
+        self.fingerprint_min_id = cfg.FINGERPRINT_MIN_ID
+        self.fingerprint_max_id = cfg.FINGERPRINT_MAX_ID
+        self.fingerprint_sample_rate = cfg.FINGERPRINT_SAMPLE_RATE
         self.connection_settings = settings
+        self.pool = get_pool(settings)
+        self.result_writer = None
 
-        if self.connection_mode == "fuzzing":
+        # Result rows of the current task. They are handed to the background
+        # writer together with the state of the task.
+        self.pending_rows = []
 
-            # init database connection
-            self.connect_read()
-            self.connect_write()
+        # Ids of the run and of the dimension entries, which are resolved by
+        # the background writer.
+        self.run_id = None
+        self.dimension_ids = {}
 
-        elif self.connection_mode == "init":
+        if self.connection_mode in ["fuzzing", "fuzzing_write"]:
 
-            # init database connection
-            self.db = MySQLdb.connect(
-                host=settings["host"],
-                port=settings["port"],
-                user=settings["user"],
-                passwd=settings["pass"],
-                db=settings["db"],
-                cursorclass=MySQLdb.cursors.DictCursor,
-                charset="utf8"
-            )
+            # Start the background writer for the results.
+            self.start_result_writer()
 
-        elif self.connection_mode == "fuzzing_read":
+        elif self.connection_mode in ["analysis", "ingest"]:
 
-            # init database connection
-            self.connect_read()
+            run = self.get_run(run_name)
 
-        elif self.connection_mode == "fuzzing_write":
+            if run is None:
+                raise ValueError("Unknown run: '{0}'".format(run_name))
 
-            # init database connection
-            self.connect_write()
+            self.run_id = run["id"]
+            self.website_type = run["website_type"]
+            self.result_table_name = get_results_table_name(run["website_type"])
 
 
-    def connect_read(self):
+    def _fetch_all(self, sql_query, query_params=None):
+        ##
+        #   Runs a query with a connection of the pool.
+        #
+        #   @param {string} sql_query - The SELECT query.
+        #   @param {tuple} query_params - (optional) Parameters of the query.
+        #
+        #   @return {tuple} All rows as dictionaries.
+        #
 
-        # init database connection
-        self.db_read = MySQLdb.connect(
-            host=self.connection_settings["host"],
-            port=self.connection_settings["port"],
-            user=self.connection_settings["user"],
-            passwd=self.connection_settings["pass"],
-            db=self.connection_settings["db"],
-            cursorclass=MySQLdb.cursors.DictCursor,
-            charset="utf8"
-        )
+        def operation(connection):
+            with closing(connection.cursor()) as cursor:
+                cursor.execute(sql_query, query_params)
+                return cursor.fetchall()
 
-        # prepare a cursor object
-        self.cursor_read = self.db_read.cursor()
+        return self.pool.run(operation)
 
 
-    def connect_write(self):
+    def _fetch_one(self, sql_query, query_params=None):
+        ##
+        #   Runs a query with a connection of the pool.
+        #
+        #   @return {dict} The first row or None.
+        #
 
-        # init database connection
-        self.db_write = MySQLdb.connect(
-            host=self.connection_settings["host"],
-            port=self.connection_settings["port"],
-            user=self.connection_settings["user"],
-            passwd=self.connection_settings["pass"],
-            db=self.connection_settings["db"],
-            cursorclass=MySQLdb.cursors.DictCursor,
-            charset="utf8"
-        )
+        rows = self._fetch_all(sql_query, query_params)
 
-        # prepare a cursor object
-        self.cursor_write = self.db_write.cursor()
+        if len(rows) > 0:
+            return rows[0]
+        else:
+            return None
 
 
-    def close(self):
+    def _execute_commit(self, sql_query, query_params=None):
         ##
-        #   Closes the connection to the database.
+        #   Runs a modifying query with a connection of the pool and commits
+        #   it.
         #
+        #   @param {string} sql_query - The query.
+        #   @param {tuple} query_params - (optional) Parameters of the query.
+        #
+        #   @return {int} Id of the inserted row.
+        #
+
+        def operation(connection):
+            with closing(connection.cursor()) as cursor:
+                cursor.execute(sql_query, query_params)
+                connection.commit()
+                return cursor.lastrowid
+
+        return self.pool.run(operation)
 
-        if self.connection_mode == "fuzzing":
 
-            self.cursor_read.close()
-            self.db_read.close()
+    def start_result_writer(self):
+        ##
+        #   Starts the background thread that writes the results. If
+        #   SPOOL_DIR is set, the results are written into the spool files of
+        #   the run instead.
+        #
+
+        if cfg.SPOOL_DIR is not None:
+            self.result_writer = Spool.SpoolWriter(
+                spool_dir=Spool.get_run_spool_dir(cfg.SPOOL_DIR, self.run_name),
+                fsync_rows=cfg.SPOOL_FSYNC_ROWS,
+                fsync_seconds=cfg.SPOOL_FSYNC_SECONDS,
+                segment_rows=cfg.SPOOL_SEGMENT_ROWS,
+                segment_seconds=cfg.SPOOL_SEGMENT_SECONDS
+            )
 
-            self.cursor_write.close()
-            self.db_write.close()
+        else:
+            self.result_writer = ResultWriter(
+                db_manager=self,
+                batch_size=cfg.RESULT_WRITER_BATCH_SIZE,
+                flush_interval=cfg.RESULT_WRITER_FLUSH_SECONDS,
+                fallback_spool_dir=Spool.get_run_spool_dir(cfg.RESULT_WRITER_FALLBACK_SPOOL_DIR, self.run_name)
+            )
 
-        elif self.connection_mode == "init":
+        self.result_writer.start()
 
-            self.db.close()
 
-        elif self.connection_mode == "fuzzing_read":
+    def close(self):
+        ##
+        #   Writes the buffered results and stops the background writer. The
+        #   connections stay in the pool for the next DBManager of the
+        #   process.
+        #
 
-            self.cursor_read.close()
-            self.db_read.close()
+        if self.result_writer is not None:
 
-        elif self.connection_mode == "fuzzing_write":
+            # Results of a task without state are discarded. The task is
+            # scanned again on resume, so writing them would duplicate them.
+            if len(self.pending_rows) > 0:
+                logging.warning("{num} results of an unfinished task discarded.".format(
+                    num=len(self.pending_rows)))
+                self.pending_rows = []
 
-            self.cursor_write.close()
-            self.db_write.close()
+            self.result_writer.stop()
+            self.result_writer = None
 
 
     def init_storage_tables(self, commands_filename):
@@ -147,15 +247,12 @@ class DBManager:
 
             with open(commands_filename, "r") as commands_file:
 
-                with closing(self.db.cursor()) as cursor:
-
-                    for line in commands_file:
+                for line in commands_file:
 
-                        # remove line-break from sql query.
-                        sql_query = line.strip()
-                        # execute the query and commit changes.
-                        cursor.execute(sql_query)
-                        self.db.commit()
+                    # remove line-break from sql query.
+                    sql_query = line.strip()
+                    # execute the query and commit changes.
+                    self._execute_commit(sql_query)
 
             logging.info("[*] Storage initialized!")
 
@@ -174,79 +271,73 @@ class DBManager:
 
         if self.connection_mode == "init":
 
-            with closing(self.db.cursor()) as cursor:
-
-                if self.website_type == cfg.PAGE_TYPES.HOTELS:
-                    # Handle the type of hotel-comparison websites.
-                    check_in_date = get_formatted_date(
-                        day=search_parameters["check_in_day"],
-                        month=search_parameters["check_in_month"],
-                        year=search_parameters["check_in_year"]
-                    )
-
-                    check_out_date = get_formatted_date(
-                        day=search_parameters["check_out_day"],
-                        month=search_parameters["check_out_month"],
-                        year=search_parameters["check_out_year"]
-                    )
-
-                    query = "SELECT id FROM search_parameters WHERE check_in=%s AND check_out=%s AND travel_target=%s AND number_of_adults=%s AND number_of_single_rooms=%s AND number_of_double_rooms=%s"
-
-                    cursor.execute(query, (
-                        check_in_date,
-                        check_out_date,
-                        search_parameters["travel_target"],
-                        int(search_parameters["number_of_adults"]),
-                        int(search_parameters["number_of_single_rooms"]),
-                        int(search_parameters["number_of_double_rooms"])
-                    ))
-
-                    results = cursor.fetchall()
-
-                    if len(results) > 0:
-                        return results[0]["id"]
-                    else:
-                        return None
-
-                elif self.website_type == cfg.PAGE_TYPES.CARS:
-
-                    # Lookup for current search parameters.
-                    pick_up_date = get_formatted_date(
-                        day=search_parameters["pick_up_day"],
-                        month=search_parameters["pick_up_month"],
-                        year=search_parameters["pick_up_year"]
-                    )
-
-                    drop_off_date = get_formatted_date(
-                        day=search_parameters["drop_off_day"],
-                        month=search_parameters["drop_off_month"],
-                        year=search_parameters["drop_off_year"]
-                    )
-
-                    # Create query to lookup the current search parameters in
-                    # the search parameters table of the cars category.
-                    query = "SELECT id FROM search_parameters_cars WHERE picking_up=%s AND dropping_off=%s AND pick_up_date=%s AND pick_up_time=%s AND drop_off_date=%s AND drop_off_time=%s"
-
-                    cursor.execute(query, (
-                        search_parameters["picking_up"],
-                        search_parameters["dropping_off"],
-                        pick_up_date,
-                        search_parameters["pick_up_time"],
-                        drop_off_date,
-                        search_parameters["drop_off_time"],
-                    ))
-
-                    results = cursor.fetchall()
-
-                    if len(results) > 0:
-                        return results[0]["id"]
-                    else:
-                        return None
+            if self.website_type == cfg.PAGE_TYPES.HOTELS:
+                # Handle the type of hotel-comparison websites.
+                check_in_date = get_formatted_date(
+                    day=search_parameters["check_in_day"],
+                    month=search_parameters["check_in_month"],
+                    year=search_parameters["check_in_year"]
+                )
+
+                check_out_date = get_formatted_date(
+                    day=search_parameters["check_out_day"],
+                    month=search_parameters["check_out_month"],
+                    year=search_parameters["check_out_year"]
+                )
+
+                query = "SELECT id FROM search_parameters WHERE check_in=%s AND check_out=%s AND travel_target=%s AND number_of_adults=%s AND number_of_single_rooms=%s AND number_of_double_rooms=%s"
+
+                results = self._fetch_all(query, (
+                    check_in_date,
+                    check_out_date,
+                    search_parameters["travel_target"],
+                    int(search_parameters["number_of_adults"]),
+                    int(search_parameters["number_of_single_rooms"]),
+                    int(search_parameters["number_of_double_rooms"])
+                ))
+
+                if len(results) > 0:
+                    return results[0]["id"]
+                else:
+                    return None
+
+            elif self.website_type == cfg.PAGE_TYPES.CARS:
+
+                # Lookup for current search parameters.
+                pick_up_date = get_formatted_date(
+                    day=search_parameters["pick_up_day"],
+                    month=search_parameters["pick_up_month"],
+                    year=search_parameters["pick_up_year"]
+                )
+
+                drop_off_date = get_formatted_date(
+                    day=search_parameters["drop_off_day"],
+                    month=search_parameters["drop_off_month"],
+                    year=search_parameters["drop_off_year"]
+                )
+
+                # Create query to lookup the current search parameters in
+                # the search parameters table of the cars category.
+                query = "SELECT id FROM search_parameters_cars WHERE picking_up=%s AND dropping_off=%s AND pick_up_date=%s AND pick_up_time=%s AND drop_off_date=%s AND drop_off_time=%s"
+
+                results = self._fetch_all(query, (
+                    search_parameters["picking_up"],
+                    search_parameters["dropping_off"],
+                    pick_up_date,
+                    search_parameters["pick_up_time"],
+                    drop_off_date,
+                    search_parameters["drop_off_time"],
+                ))
 
+                if len(results) > 0:
+                    return results[0]["id"]
                 else:
-                    # In case of an unknown website type.
                     return None
 
+            else:
+                # In case of an unknown website type.
+                return None
+
 
     def store_search_parameters(self, search_parameters):
         ##
@@ -259,145 +350,431 @@ class DBManager:
 
         if self.connection_mode == "init":
 
-            with closing(self.db.cursor()) as cursor:
+            if self.website_type == cfg.PAGE_TYPES.HOTELS:
+                # Handle the type of hotel-comparison websites.
 
-                if self.website_type == cfg.PAGE_TYPES.HOTELS:
-                    # Handle the type of hotel-comparison websites.
+                check_in_date = get_formatted_date(
+                    day=search_parameters["check_in_day"],
+                    month=search_parameters["check_in_month"],
+                    year=search_parameters["check_in_year"]
+                )
 
-                    check_in_date = get_formatted_date(
-                        day=search_parameters["check_in_day"],
-                        month=search_parameters["check_in_month"],
-                        year=search_parameters["check_in_year"]
-                    )
+                check_out_date = get_formatted_date(
+                    day=search_parameters["check_out_day"],
+                    month=search_parameters["check_out_month"],
+                    year=search_parameters["check_out_year"]
+                )
 
-                    check_out_date = get_formatted_date(
-                        day=search_parameters["check_out_day"],
-                        month=search_parameters["check_out_month"],
-                        year=search_parameters["check_out_year"]
-                    )
+                query = "INSERT INTO search_parameters (check_in, check_out, travel_target, number_of_adults, number_of_single_rooms, number_of_double_rooms) VALUES (%s,%s,%s,%s,%s,%s)"
 
-                    query = "INSERT INTO search_parameters (check_in, check_out, travel_target, number_of_adults, number_of_single_rooms, number_of_double_rooms) VALUES (%s,%s,%s,%s,%s,%s)"
+                return self._execute_commit(query, (
+                    check_in_date,
+                    check_out_date,
+                    search_parameters["travel_target"],
+                    int(search_parameters["number_of_adults"]),
+                    int(search_parameters["number_of_single_rooms"]),
+                    int(search_parameters["number_of_double_rooms"])
+                ))
 
-                    cursor.execute(query, (
-                        check_in_date,
-                        check_out_date,
-                        search_parameters["travel_target"],
-                        int(search_parameters["number_of_adults"]),
-                        int(search_parameters["number_of_single_rooms"]),
-                        int(search_parameters["number_of_double_rooms"])
-                    ))
+            elif self.website_type == cfg.PAGE_TYPES.CARS:
+                # Store current search parameters for key CARS.
 
-                    self.db.commit()
+                pick_up_date = get_formatted_date(
+                    day=search_parameters["pick_up_day"],
+                    month=search_parameters["pick_up_month"],
+                    year=search_parameters["pick_up_year"]
+                )
 
-                    return cursor.lastrowid
+                drop_off_date = get_formatted_date(
+                    day=search_parameters["drop_off_day"],
+                    month=search_parameters["drop_off_month"],
+                    year=search_parameters["drop_off_year"]
+                )
 
-                elif self.website_type == cfg.PAGE_TYPES.CARS:
-                    # Store current search parameters for key CARS.
+                query = "INSERT INTO search_parameters_cars (picking_up, dropping_off, pick_up_date, pick_up_time, drop_off_date, drop_off_time) VALUES (%s,%s,%s,%s,%s,%s)"
 
-                    pick_up_date = get_formatted_date(
-                        day=search_parameters["pick_up_day"],
-                        month=search_parameters["pick_up_month"],
-                        year=search_parameters["pick_up_year"]
-                    )
+                # Return ID of new entry.
+                return self._execute_commit(query, (
+                    search_parameters["picking_up"],
+                    search_parameters["dropping_off"],
+                    pick_up_date,
+                    search_parameters["pick_up_time"],
+                    drop_off_date,
+                    search_parameters["drop_off_time"],
+                ))
 
-                    drop_off_date = get_formatted_date(
-                        day=search_parameters["drop_off_day"],
-                        month=search_parameters["drop_off_month"],
-                        year=search_parameters["drop_off_year"]
-                    )
+            else:
+                # In case of an unknown website type.
+                return None
 
-                    query = "INSERT INTO search_parameters_cars (picking_up, dropping_off, pick_up_date, pick_up_time, drop_off_date, drop_off_time) VALUES (%s,%s,%s,%s,%s,%s)"
 
-                    cursor.execute(query, (
-                        search_parameters["picking_up"],
-                        search_parameters["dropping_off"],
-                        pick_up_date,
-                        search_parameters["pick_up_time"],
-                        drop_off_date,
-                        search_parameters["drop_off_time"],
-                    ))
+    def clear_scan_ledger(self, run_name):
+        ##
+        #   Deletes the task states of a run from the scan ledger.
+        #
+        #   @param {string} run_name - Name of the run.
+        #
 
-                    self.db.commit()
+        if self.connection_mode == "init":
 
-                    # Return ID of new entry.
-                    return cursor.lastrowid
+            self._execute_commit("DELETE FROM scan_ledger WHERE run_name=%s", (run_name,))
 
-                else:
-                    # In case of an unknown website type.
-                    return None
 
+    def get_run(self, run_name):
+        ##
+        #   Looks up a run in the run catalog.
+        #
+        #   @param {string} run_name - Name of the run.
+        #
+        #   @return {dict} id, website_type and fp_table_name of the run or
+        #   None if the run does not exist.
+        #
+
+        return self._fetch_one("SELECT id, website_type, fp_table_name FROM dim_run WHERE name=%s", (run_name,))
+
+
+    def register_run(self, run_name, fingerprint_table_name):
+        ##
+        #   Adds a run to the run catalog and creates the partition of the run
+        #   in the results table of its website type.
+        #
+        #   @param {string} run_name - Name of the run.
+        #   @param {string} fingerprint_table_name - Name of the fingerprint
+        #   table of the run.
+        #
+        #   @return {int} Id of the run.
+        #
+
+        if self.connection_mode == "init":
+
+            run_id = self._execute_commit(
+                "INSERT INTO dim_run (name, website_type, fp_table_name, created_at) VALUES (%s, %s, %s, %s)",
+                (run_name, self.website_type, fingerprint_table_name, datetime.datetime.utcnow())
+            )
+
+            # DDL statements are committed implicitly.
+            self._execute_commit("ALTER TABLE `{table_name}` ADD PARTITION (PARTITION {partition} VALUES IN ({run_id}))".format(
+                table_name=get_results_table_name(self.website_type),
+                partition=get_partition_name(run_id),
+                run_id=int(run_id)
+            ))
+
+            return run_id
 
-    def rename_table(self, old_name, new_name):
+
+    def drop_run(self, run_name):
         ##
-        #   Renames a table in the database.
+        #   Deletes a run: its partition of the results table, its entry in
+        #   the run catalog and its task states in the scan ledger.
+        #
+        #   @param {string} run_name - Name of the run.
         #
-        #   @param {string} old_name - Old name of the table to rename.
-        #   @param {string} new_name - The new name of the table.
+        #   @return {bool} False if the run does not exist.
         #
 
         if self.connection_mode == "init":
 
-            with closing(self.db.cursor()) as cursor:
+            run = self.get_run(run_name)
+
+            if run is None:
+                return False
+
+            self._execute_commit("ALTER TABLE `{table_name}` DROP PARTITION {partition}".format(
+                table_name=get_results_table_name(run["website_type"]),
+                partition=get_partition_name(run["id"])
+            ))
 
-                # Delete table with new name if exists
-                sql_query = "DROP TABLE IF EXISTS `{table_name}`".format(
-                        table_name=new_name
-                    )
-                # execute the query and commit changes.
-                cursor.execute(sql_query)
-                self.db.commit()
+            self._execute_commit("DELETE FROM dim_run WHERE id=%s", (run["id"],))
 
-                # create sql query to rename the table.
-                sql_query = "RENAME TABLE  `{old_table_name}` TO  `{new_table_name}`".format(
-                        old_table_name=old_name,
-                        new_table_name=new_name
-                    )
-                # execute the query and commit changes.
-                cursor.execute(sql_query)
-                self.db.commit()
+            self.clear_scan_ledger(run_name=run_name)
 
+            return True
 
 
-    def _result_iter(self, cursor, arraysize=100):
+    def get_completed_tasks(self, worker_country):
         ##
-        #   An iterator that uses fetchmany to keep memory usage down.
+        #   Queries the scan ledger for the tasks of the current run, which
+        #   were completed by workers of the given country.
         #
-        while True:
-            results = cursor.fetchmany(arraysize)
-            if not results:
-                break
-            for result in results:
-                yield result
+        #   @param {string} worker_country - Country of the workers.
+        #
+        #   @return {set} Set of (navscraper, fp_id) tuples. The NavScraper is
+        #   identified by its ENTRY_URI.
+        #
+
+        sql_get_completed_tasks = "SELECT navscraper, fp_id FROM scan_ledger WHERE run_name=%s AND worker_country=%s AND status=%s"
+        query_params = (self.run_name, worker_country, TASK_STATUS_COMPLETED)
+
+        return set(
+            (task["navscraper"], task["fp_id"])
+            for task in self._fetch_all(sql_get_completed_tasks, query_params)
+        )
+
+
+    def write_task_status(self, navscraper, fingerprint_id, worker_country, status, attempts):
+        ##
+        #   Records the state of a task in the scan ledger. The entry is
+        #   handed to the background writer as one item with the results of
+        #   the task (see write_results()), which are committed in the same
+        #   transaction. So a task is only marked as completed if its results
+        #   are stored.
+        #
+        #   @param {string} navscraper - ENTRY_URI of the NavScraper.
+        #   @param {int} fingerprint_id - Database id of the used fingerprint.
+        #   @param {string} worker_country - Country of the worker.
+        #   @param {string} status - TASK_STATUS_COMPLETED or
+        #   TASK_STATUS_FAILED.
+        #   @param {int} attempts - Number of scans of the task.
+        #
+
+        rows = self.pending_rows
+        self.pending_rows = []
+
+        self.result_writer.put(rows=rows, task_states=[(
+            self.run_name,
+            navscraper,
+            fingerprint_id,
+            worker_country,
+            status,
+            attempts,
+            datetime.datetime.utcnow()
+        )])
 
 
     def get_fingerprints(self):
         ##
         #   Queries the database, to receive all fingerprints. The fingerprints
-        #   are passed back with a generator to hold the memory usage low.
+        #   are read in pages of FINGERPRINT_PAGE_SIZE rows by their id, so
+        #   that the memory usage does not depend on the size of the table and
+        #   no connection is held while the fingerprints are consumed, e.g. by
+        #   the feeders of the task queues. Only the id and the feature columns
+        #   are selected. The id range and sample rate filters of the config
+        #   are applied by the server.
+        #
+        #   @return {generator} Fingerprint rows as dictionaries.
+        #
+
+        feature_columns = self.get_fingerprint_feature_columns()
+
+        sql_get_fingerprints = "SELECT {columns} FROM `{table_name}`".format(
+            columns=", ".join("`{0}`".format(column) for column in ["id"] + feature_columns),
+            table_name=self.fingerprint_table_name
+        )
+
+        conditions = []
+        query_params = []
+
+        if self.fingerprint_min_id is not None:
+            conditions.append("id >= %s")
+            query_params.append(self.fingerprint_min_id)
+
+        if self.fingerprint_max_id is not None:
+            conditions.append("id <= %s")
+            query_params.append(self.fingerprint_max_id)
+
+        if self.fingerprint_sample_rate is not None and self.fingerprint_sample_rate < 1.0:
+            # The hash of the id selects the same sample in every process.
+            conditions.append("MOD(CRC32(id), 1000000) < %s")
+            query_params.append(int(self.fingerprint_sample_rate * 1000000))
+
+        last_id = None
+
+        while True:
+
+            page_conditions = list(conditions)
+            page_params = list(query_params)
+
+            if last_id is not None:
+                page_conditions.append("id > %s")
+                page_params.append(last_id)
+
+            sql_get_page = sql_get_fingerprints
+            if len(page_conditions) > 0:
+                sql_get_page += " WHERE " + " AND ".join(page_conditions)
+
+            sql_get_page += " ORDER BY id LIMIT %s"
+            page_params.append(cfg.FINGERPRINT_PAGE_SIZE)
+
+            fingerprints = self._fetch_all(sql_get_page, tuple(page_params))
+
+            for fingerprint in fingerprints:
+                yield fingerprint
+
+            if len(fingerprints) < cfg.FINGERPRINT_PAGE_SIZE:
+                break
+
+            last_id = fingerprints[-1]["id"]
+
+
+    def get_fingerprint_feature_columns(self):
+        ##
+        #   Determines the columns of the fingerprint table that hold
+        #   fingerprint features.
+        #
+        #   @return {list} Column names.
+        #
+
+        sql_get_columns = "SHOW COLUMNS FROM `{table_name}`".format(
+            table_name=self.fingerprint_table_name
+        )
+
+        return [
+            column["Field"] for column in self._fetch_all(sql_get_columns)
+            if any(column["Field"].startswith(prefix) for prefix in cfg.FINGERPRINT_FEATURE_PREFIXES)
+        ]
+
+
+    def _stream_rows(self, sql_query, query_params, arraysize=100):
+        ##
+        #   Generator over the rows of a query, which holds a connection of
+        #   the pool with a server-side cursor. The rows are fetched in chunks
+        #   while iterating.
+        #
+        #   @param {string} sql_query - The SELECT query.
+        #   @param {list} query_params - Parameters of the query or None.
+        #   @param {int} arraysize - Number of rows per fetch.
+        #
+
+        for chunk in self._stream_chunks(sql_query, query_params, arraysize):
+            for row in chunk:
+                yield row
+
+
+    def _stream_chunks(self, sql_query, query_params, chunk_size, cursorclass=MySQLdb.cursors.SSDictCursor):
+        ##
+        #   Generator over the rows of a query in chunks, which holds a
+        #   connection of the pool with a server-side cursor. The connection
+        #   is returned to the pool when the generator is exhausted. A
+        #   generator that is closed before closes its connection, so that the
+        #   remaining rows are not transferred.
         #
+        #   @param {string} sql_query - The SELECT query.
+        #   @param {list} query_params - Parameters of the query or None.
+        #   @param {int} chunk_size - Number of rows per chunk.
+        #   @param {class} cursorclass - (optional) Server-side cursor class.
+        #   SSCursor returns the rows as tuples.
+        #
+
+        def open_cursor():
+            connection = self.pool.acquire()
+
+            try:
+                cursor = connection.cursor(cursorclass)
+                cursor.execute(sql_query, query_params)
+
+            except:
+                self.pool.release(connection, broken=True)
+                raise
+
+            return connection, cursor
+
+        # Only the query is repeated after a lost connection. Rows that were
+        # yielded can not be taken back.
+        connection, cursor = retry_on_lost_connection(open_cursor)
+        exhausted = False
 
         try:
-            sql_get_fingerprints = "SELECT * FROM `{table_name}`".format(
-                table_name=self.fingerprint_table_name
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    exhausted = True
+                    break
+                yield chunk
+
+        finally:
+            if exhausted:
+                cursor.close()
+
+            self.pool.release(connection, broken=not exhausted)
+
+
+    def get_max_result_id(self):
+        ##
+        #   Returns the id of the last row of the run.
+        #
+        #   @return {int} 0 if the run has no rows.
+        #
+
+        row = self._fetch_one("SELECT MAX(id) AS max_id FROM `{table_name}` WHERE run_id=%s".format(
+            table_name=self.result_table_name
+        ), (self.run_id,))
+
+        return row["max_id"] or 0
+
+
+    def get_product_labels(self, website_type):
+        ##
+        #   Returns the names of the products of a website type.
+        #
+        #   @param {string} website_type - Type of the website. Example: 'hotels'.
+        #
+        #   @return {dict} Tuples (provider name, product columns...) by the
+        #   product id.
+        #
+
+        table_name, columns = DIMENSION_TABLES[website_type]
+        label_columns = [column for column in columns if column != "provider_id"]
+
+        rows = self._fetch_all(
+            '''SELECT product.id AS id, provider.name AS provider_name, {columns} FROM {table_name} AS product
+            JOIN dim_provider AS provider ON provider.id = product.provider_id'''.format(
+                columns=", ".join("product.{0}".format(column) for column in label_columns),
+                table_name=table_name
             )
-            self.cursor_read.execute(sql_get_fingerprints)
+        )
 
-        except MySQLdb.OperationalError, e:
-            if e[0] not in (2006, 2013):
-                raise
+        return dict(
+            (row["id"], tuple([row["provider_name"]] + [row[column] for column in label_columns]))
+            for row in rows
+        )
 
-            # reconnect to database.
-            self.connect_read()
-            self.cursor_read.execute(sql_get_fingerprints)
 
+    def get_country_labels(self):
+        ##
+        #   Returns the names of the request countries.
+        #
+        #   @return {dict} Names by the country id.
+        #
 
-        return self._result_iter(self.cursor_read)
+        return dict((row["id"], row["name"]) for row in self._fetch_all("SELECT id, name FROM dim_country"))
+
+
+    def stream_result_chunks(self, select_expressions, min_id=0, max_id=None, chunk_size=100000):
+        ##
+        #   Streams the rows of the run in chunks of tuples, ordered by id.
+        #   Only the partition of the run is read.
+        #
+        #   @param {list} select_expressions - Columns or SQL expressions of
+        #   the tuples.
+        #   @param {int} min_id - (optional) Only rows with a greater id.
+        #   @param {int} max_id - (optional) Only rows up to this id.
+        #   @param {int} chunk_size - (optional) Number of rows per chunk.
+        #
+        #   @return {generator} Lists of row tuples.
+        #
+
+        sql_get_results = "SELECT {expressions} FROM `{table_name}` WHERE run_id = %s AND id > %s".format(
+            expressions=", ".join(select_expressions),
+            table_name=self.result_table_name
+        )
+        query_params = [self.run_id, min_id]
+
+        if max_id is not None:
+            sql_get_results += " AND id <= %s"
+            query_params.append(max_id)
+
+        sql_get_results += " ORDER BY id"
+
+        return self._stream_chunks(
+            sql_get_results, query_params, chunk_size, cursorclass=MySQLdb.cursors.SSCursor)
 
 
     def write_results(self, worker_info, fingerprint_id, target_website, search_parameters_id, results):
         ##
-        #   Save the results of the fuzzing run in the database. For debug purpose
-        #   the results are also stored in a file.
+        #   Save the results of the fuzzing run in the database. The rows are
+        #   handed to the background writer with the state of the task (see
+        #   write_task_status()), which inserts them in batches.
+        #   For debug purpose the results are also stored in a file.
         #
         #   @param {dict} worker_info - Information about the current worker.
         #   @param {int} fingerprint_id - Database id of the used fingerprint.
@@ -408,22 +785,19 @@ class DBManager:
         #   extracted from the website.
         #
 
+        rows = []
+
         if self.website_type == cfg.PAGE_TYPES.HOTELS:
             # Handle the type of hotel-comparison websites.
-            sql_insert_query = '''INSERT INTO {table_name} (provider_name, product_name, location, room_type, price,
-                currency, price_euro, nights, rating_value, rating_unit, fp_id, fp_table_name,
-                search_param_id, request_country, request_timezone_offset, proxy_address,
-                access_time) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'''.format(
-                    table_name=self.result_table_name
-                )
-
             for product in results:
 
-                # Insert data for the current product.
-                self.cursor_write.execute(sql_insert_query, (
-                    target_website,
-                    product.get("name", "?"),
-                    product.get("location", None),
+                # Row for the current product. The values of the dimensions
+                # are replaced by their ids in the background writer.
+                rows.append((
+                    (target_website,),
+                    (product.get("name", "?"), product.get("location", None)),
+                    (worker_info.get("name", "unknown"),),
+                    (worker_info.get("proxy_address", None),),
                     product.get("room_type", None),
                     product.get("price", None),
                     product.get("currency", None),
@@ -432,47 +806,36 @@ class DBManager:
                     product.get("rating_value", None),
                     product.get("rating_unit", None),
                     fingerprint_id,
-                    self.fingerprint_table_name,
                     search_parameters_id,
-                    worker_info.get("name", "unknown"),
                     worker_info.get("timezone_offset", None),
-                    worker_info.get("proxy_address", None),
-                    product.get("access_time", "?")
+                    parse_access_time(product.get("access_time", None))
                 ))
 
-
-            self.db_write.commit()
-
         elif self.website_type == cfg.PAGE_TYPES.CARS:
             # Write results of the cars NavScraper.
-            sql_insert_query = '''INSERT INTO {table_name} (provider_name, company_name, car_class,
-                car_model, transmission, price_daily, price_norm_daily, price_total, price_norm_total, currency,
-                fp_id, fp_table_name, search_param_id, request_country, request_timezone_offset,
-                proxy_address, access_time) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'''.format(
-                    table_name=self.result_table_name
-                )
-
             for product in results:
-                self.cursor_write.execute(sql_insert_query, (
-                    target_website,
-                    product.get("company_name", None),
-                    product.get("car_class", None),
-                    product.get("car_model", None),
-                    product.get("transmission", None),
+                rows.append((
+                    (target_website,),
+                    (
+                        product.get("company_name", None),
+                        product.get("car_class", None),
+                        product.get("car_model", None),
+                        product.get("transmission", None),
+                    ),
+                    (worker_info.get("name", "unknown"),),
+                    (worker_info.get("proxy_address", None),),
                     product.get("price_daily", None),
                     product.get("price_norm_daily", None),
                     product.get("price_total", None),
                     product.get("price_norm_total", None),
                     product.get("currency", None),
                     fingerprint_id,
-                    self.fingerprint_table_name,
                     search_parameters_id,
-                    worker_info.get("name", "unknown"),
                     worker_info.get("timezone_offset", None),
-                    worker_info.get("proxy_address", None),
-                    product.get("access_time", "?")
+                    parse_access_time(product.get("access_time", None))
                 ))
-            self.db_write.commit()
+
+        self.pending_rows.extend(rows)
 
 
         # DEBUG Outupt
@@ -525,6 +888,681 @@ class DBManager:
                             ))
 
 
+    def write_rows(self, rows, task_states=[]):
+        ##
+        #   Inserts the given rows into the results table with a single
+        #   multi-row INSERT and updates the scan ledger in the same
+        #   transaction. This is called by the background writer.
+        #
+        #   @param {list} rows - List of row tuples of write_results().
+        #   @param {list} task_states - (optional) List of row tuples for the
+        #   scan ledger.
+        #
+
+        def operation(connection):
+            with closing(connection.cursor()) as cursor:
+                self._execute_write_queries(
+                    cursor=cursor,
+                    rows=self._resolve_dimensions(connection, cursor, rows),
+                    task_states=task_states
+                )
+                connection.commit()
+
+        # The transaction is rolled back if the connection is lost, so the
+        # whole batch is written again.
+        self.pool.run(operation)
+
+
+    def load_segment(self, segment_name, rows, task_states):
+        ##
+        #   Loads the rows and task states of a spool segment in one
+        #   transaction. The rows are loaded with LOAD DATA LOCAL INFILE. The
+        #   segment is recorded in the spool_segments table, so that it is
+        #   never loaded twice. This is called by the SpoolIngestor.
+        #
+        #   @param {string} segment_name - Unique name of the segment.
+        #   @param {list} rows - List of row tuples of write_results().
+        #   @param {list} task_states - List of row tuples for the scan
+        #   ledger.
+        #
+        #   @return {bool} False if the segment was loaded before.
+        #
+
+        def operation(connection):
+            with closing(connection.cursor()) as cursor:
+
+                cursor.execute("SELECT name FROM spool_segments WHERE name=%s", (segment_name,))
+
+                if cursor.fetchone() is not None:
+                    return False
+
+                resolved_rows = self._resolve_dimensions(connection, cursor, rows)
+
+                if len(resolved_rows) > 0:
+                    self._load_rows(cursor, resolved_rows)
+
+                self._execute_write_queries(cursor=cursor, rows=[], task_states=task_states)
+
+                cursor.execute(
+                    "INSERT INTO spool_segments (name, run_name, num_rows, loaded_at) VALUES (%s, %s, %s, %s)",
+                    (segment_name, self.run_name, len(rows), datetime.datetime.utcnow())
+                )
+
+                connection.commit()
+
+                return True
+
+        return self.pool.run(operation)
+
+
+    def _load_rows(self, cursor, rows):
+        ##
+        #   Writes the rows into a temporary file in the default format of
+        #   LOAD DATA (tab separated, NULL as \N) and loads the file into the
+        #   results table.
+        #
+        #   @param {Cursor} cursor - Cursor of a connection of the pool.
+        #   @param {list} rows - List of row tuples for the results table.
+        #
+
+        file_handle, load_filename = tempfile.mkstemp(prefix="pdfuzz_load_", suffix=".tsv")
+
+        try:
+            with os.fdopen(file_handle, "wb") as load_file:
+                for row in rows:
+                    load_file.write("\t".join(format_load_data_value(value) for value in row) + "\n")
+
+            cursor.execute(
+                "LOAD DATA LOCAL INFILE %s INTO TABLE `{table_name}` CHARACTER SET utf8 ({columns})".format(
+                    table_name=self.result_table_name,
+                    columns=", ".join(RESULT_COLUMNS[self.website_type])
+                ),
+                (load_filename,)
+            )
+
+        finally:
+            os.remove(load_filename)
+
+
+    def _resolve_dimensions(self, connection, cursor, rows):
+        ##
+        #   Replaces the values of the dimensions in the rows of
+        #   write_results() by the ids of the dimension entries. New entries
+        #   are committed before the ids are cached, so that the cache never
+        #   holds the id of a rolled back entry.
+        #
+        #   @param {Connection} connection - Connection of the pool.
+        #   @param {Cursor} cursor - Cursor of the connection.
+        #   @param {list} rows - List of row tuples of write_results().
+        #
+        #   @return {list} List of row tuples for the results table.
+        #
+
+        if len(rows) == 0:
+            return rows
+
+        if self.run_id is None:
+            cursor.execute("SELECT id FROM dim_run WHERE name=%s", (self.run_name,))
+            self.run_id = cursor.fetchone()["id"]
+
+        new_ids = {}
+        resolved_rows = []
+
+        for row in rows:
+            provider_values, product_values, country_values, proxy_values = row[:4]
+
+            provider_id = self._get_dimension_id(cursor, "provider", provider_values, new_ids)
+            product_id = self._get_dimension_id(cursor, self.website_type, (provider_id,) + product_values, new_ids)
+            country_id = self._get_dimension_id(cursor, "country", country_values, new_ids)
+
+            proxy_id = None
+            if proxy_values[0] is not None:
+                proxy_id = self._get_dimension_id(cursor, "proxy", proxy_values, new_ids)
+
+            resolved_rows.append((self.run_id, provider_id, product_id, country_id, proxy_id) + row[4:])
+
+        if len(new_ids) > 0:
+            connection.commit()
+            self.dimension_ids.update(new_ids)
+
+        return resolved_rows
+
+
+    def _get_dimension_id(self, cursor, dimension, values, new_ids):
+        ##
+        #   Returns the id of a dimension entry. Unknown entries are inserted.
+        #
+        #   @param {Cursor} cursor - Cursor of the write connection.
+        #   @param {string} dimension - Key of DIMENSION_TABLES.
+        #   @param {tuple} values - Values of the columns of the dimension.
+        #   @param {dict} new_ids - Ids that are not committed yet.
+        #
+        #   @return {int}
+        #
+
+        key = (dimension, values)
+
+        if key in self.dimension_ids:
+            return self.dimension_ids[key]
+
+        if key in new_ids:
+            return new_ids[key]
+
+        table_name, columns = DIMENSION_TABLES[dimension]
+
+        cursor.execute(
+            '''INSERT INTO {table_name} (key_hash, {columns}) VALUES (%s, {placeholders})
+            ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id)'''.format(
+                table_name=table_name,
+                columns=", ".join(columns),
+                placeholders=", ".join(["%s"] * len(columns))
+            ),
+            (hashlib.md5(json.dumps(values)).hexdigest(),) + values
+        )
+
+        new_ids[key] = cursor.lastrowid
+
+        return new_ids[key]
+
+
+    def _execute_write_queries(self, cursor, rows, task_states):
+
+        if len(rows) > 0:
+            cursor.executemany(self._get_insert_query(), rows)
+
+        if len(task_states) > 0:
+            cursor.executemany(
+                '''INSERT INTO scan_ledger (run_name, navscraper, fp_id, worker_country, status,
+                attempts, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE
+                status=VALUES(status), attempts=attempts+VALUES(attempts), updated_at=VALUES(updated_at)''',
+                task_states
+            )
+
+
+    def _get_insert_query(self):
+        ##
+        #   Returns the INSERT query for the results table of the current
+        #   website type.
+        #
+        #   @return {string}
+        #
+
+        columns = RESULT_COLUMNS[self.website_type]
+
+        return "INSERT INTO {table_name} ({columns}) VALUES ({placeholders})".format(
+            table_name=self.result_table_name,
+            columns=", ".join(columns),
+            placeholders=", ".join(["%s"] * len(columns))
+        )
+
+
+class ResultWriter(threading.Thread):
+    ##
+    #   ResultWriter is a background thread that buffers the result rows of
+    #   a DBManager and writes them in batches. A batch is written if it
+    #   reached the batch size or if its oldest row waits longer than the
+    #   flush interval. So the scraping of the next fingerprint overlaps the
+    #   database write of the previous one. The rows and the state of a task
+    #   are one item and are never split between batches. A batch that could
+    #   not be written is kept and written again after the flush interval.
+    #
+
+    def __init__(self, db_manager, batch_size, flush_interval, fallback_spool_dir):
+        ##
+        #
+        #   @param {DBManager} db_manager - Database manager that owns the
+        #   write connection.
+        #   @param {int} batch_size - Number of rows that triggers a write.
+        #   @param {float} flush_interval - Maximal number of seconds a row
+        #   stays in the buffer.
+        #   @param {string} fallback_spool_dir - Spool directory for a batch
+        #   that could still not be written when the writer stops.
+        #
+
+        threading.Thread.__init__(self, name="ResultWriter")
+        self.daemon = True
+
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fallback_spool_dir = fallback_spool_dir
+        self.row_queue = Queue.Queue()
+
+    def put(self, rows, task_states=[]):
+        ##
+        #   Hands rows over to the writer.
+        #
+        #   @param {list} rows - List of row tuples for the results table.
+        #   @param {list} task_states - (optional) List of row tuples for the
+        #   scan ledger.
+        #
+
+        self.row_queue.put((rows, task_states))
+
+    def stop(self):
+        ##
+        #   Writes all buffered rows and waits for the thread to finish.
+        #
+
+        self.row_queue.put(None)
+        self.join()
+
+    def run(self):
+
+        buffered_rows = []
+        buffered_task_states = []
+        first_row_time = None
+
+        # Time of the next attempt after a failed write.
+        retry_time = 0.0
+
+        while True:
+
+            if len(buffered_rows) > 0 or len(buffered_task_states) > 0:
+                timeout = max(0.0, first_row_time + self.flush_interval - time.time(), retry_time - time.time())
+            else:
+                timeout = None
+
+            try:
+                item = self.row_queue.get(timeout=timeout)
+
+            except Queue.Empty:
+                item = ([], [])
+
+            if item is None:
+                # Stop marker of the stop() method.
+                break
+
+            rows, task_states = item
+
+            if (len(rows) > 0 or len(task_states) > 0) and \
+                    len(buffered_rows) == 0 and len(buffered_task_states) == 0:
+                first_row_time = time.time()
+
+            buffered_rows.extend(rows)
+            buffered_task_states.extend(task_states)
+
+            if time.time() < retry_time:
+                continue
+
+            if len(buffered_rows) >= self.batch_size or \
+                    ((len(buffered_rows) > 0 or len(buffered_task_states) > 0) and
+                     time.time() - first_row_time >= self.flush_interval):
+
+                if self._flush(buffered_rows, buffered_task_states):
+                    buffered_rows = []
+                    buffered_task_states = []
+                    retry_time = 0.0
+
+                else:
+                    retry_time = time.time() + self.flush_interval
+
+        if len(buffered_rows) > 0 or len(buffered_task_states) > 0:
+
+            if not self._flush(buffered_rows, buffered_task_states):
+                self._spool(buffered_rows, buffered_task_states)
+
+    def _flush(self, rows, task_states):
+        ##
+        #   Writes a batch to the database.
+        #
+        #   @return {bool} False, if the batch could not be written.
+        #
+
+        try:
+            self.db_manager.write_rows(rows=rows, task_states=task_states)
+            logging.debug("{num} result rows written.".format(num=len(rows)))
+            return True
+
+        except:
+            logging.exception("Unable to write {num} result rows.".format(num=len(rows)))
+            return False
+
+    def _spool(self, rows, task_states):
+        ##
+        #   Stores a batch that could not be written as spool segment of the
+        #   run, so that it can be loaded later (see spool.SpoolIngestor).
+        #
+
+        try:
+            segment_filename = Spool.write_segment(self.fallback_spool_dir, rows, task_states)
+
+        except:
+            logging.exception("Unable to spool {num} result rows. They are lost.".format(num=len(rows)))
+            return
+
+        logging.error("{num} result rows could not be written and were spooled to '{filename}'.".format(
+            num=len(rows), filename=segment_filename))
+
+
+class ConnectionPool:
+    ##
+    #   ConnectionPool shares the connections to the database between the
+    #   DBManagers and threads of a process. At most max_connections
+    #   connections are in use at the same time. Connections that were not
+    #   used for a while are checked with a ping before they are handed out
+    #   again, so that connections which were closed by the server (e.g. by
+    #   its wait_timeout) are replaced.
+    #
+
+    def __init__(self, settings, max_connections, max_idle, idle_seconds, ping_seconds):
+        ##
+        #
+        #   @param {dict} settings - Dictionary with the connection settings.
+        #   @param {int} max_connections - Number of connections that can be
+        #   used at the same time.
+        #   @param {int} max_idle - Number of unused connections that are
+        #   kept open.
+        #   @param {float} idle_seconds - Unused connections are closed after
+        #   this number of seconds.
+        #   @param {float} ping_seconds - Connections that were not used for
+        #   this number of seconds are checked with a ping.
+        #
+
+        self.settings = settings
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self.ping_seconds = ping_seconds
+
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.lock = threading.Lock()
+
+        # Unused connections as (connection, time of the last use), the most
+        # recently used connection last.
+        self.idle_connections = []
+
+    def connect(self):
+
+        return MySQLdb.connect(
+            host=self.settings["host"],
+            port=self.settings["port"],
+            user=self.settings["user"],
+            passwd=self.settings["pass"],
+            db=self.settings["db"],
+            cursorclass=MySQLdb.cursors.DictCursor,
+            charset="utf8",
+            # Required by the LOAD DATA LOCAL INFILE of the spool ingestion.
+            local_infile=1
+        )
+
+    def acquire(self):
+        ##
+        #   Returns a connection of the pool. Waits until a connection is
+        #   free. Every acquired connection has to be released.
+        #
+        #   @return {Connection}
+        #
+
+        self.slots.acquire()
+
+        try:
+            while True:
+
+                with self.lock:
+                    self._close_expired()
+
+                    if len(self.idle_connections) == 0:
+                        break
+
+                    connection, last_used = self.idle_connections.pop()
+
+                if time.time() - last_used < self.ping_seconds:
+                    return connection
+
+                try:
+                    connection.ping()
+                    return connection
+
+                except MySQLdb.Error:
+                    logging.debug("Dropped a dead database connection of the pool.")
+                    close_connection(connection)
+
+            return self.connect()
+
+        except:
+            self.slots.release()
+            raise
+
+    def release(self, connection, broken=False):
+        ##
+        #   Returns a connection to the pool. Changes that were not committed
+        #   are rolled back.
+        #
+        #   @param {Connection} connection - Connection of acquire().
+        #   @param {bool} broken - (optional) If True, the connection is
+        #   closed instead.
+        #
+
+        try:
+            if not broken:
+                try:
+                    connection.rollback()
+
+                except MySQLdb.Error:
+                    broken = True
+
+            if broken:
+                close_connection(connection)
+
+            else:
+                with self.lock:
+                    self.idle_connections.append((connection, time.time()))
+                    self._close_expired()
+
+        finally:
+            self.slots.release()
+
+    def run(self, operation):
+        ##
+        #   Runs an operation with a connection of the pool. If the connection
+        #   to the server is lost, the operation is repeated with a new
+        #   connection (see retry_on_lost_connection()).
+        #
+        #   @param {function} operation - Function that gets the connection.
+        #   Changes have to be committed by the operation.
+        #
+        #   @return The return value of the operation.
+        #
+
+        def run_once():
+            connection = self.acquire()
+
+            try:
+                result = operation(connection)
+
+            except MySQLdb.OperationalError, e:
+                self.release(connection, broken=e[0] in TRANSIENT_ERRORS)
+                raise
+
+            except:
+                self.release(connection)
+                raise
+
+            self.release(connection)
+
+            return result
+
+        return retry_on_lost_connection(run_once)
+
+    def close(self):
+        ##
+        #   Closes the unused connections.
+        #
+
+        with self.lock:
+            for connection, _ in self.idle_connections:
+                close_connection(connection)
+
+            self.idle_connections = []
+
+    def _close_expired(self):
+        # Closes the connections that were unused too long and the surplus
+        # of unused connections. The lock has to be held.
+
+        now = time.time()
+
+        kept_connections = [
+            (connection, last_used) for connection, last_used in self.idle_connections
+            if now - last_used < self.idle_seconds
+        ]
+        kept_connections = kept_connections[max(0, len(kept_connections) - self.max_idle):]
+
+        for connection, last_used in self.idle_connections:
+            if (connection, last_used) not in kept_connections:
+                close_connection(connection)
+
+        self.idle_connections = kept_connections
+
+
+def get_pool(settings):
+    ##
+    #   Returns the connection pool of the current process for the given
+    #   connection settings. A forked process gets new pools, because a
+    #   connection can not be used by two processes.
+    #
+    #   @param {dict} settings - Dictionary with the connection settings.
+    #
+    #   @return {ConnectionPool}
+    #
+
+    global _pools_pid
+
+    key = tuple(sorted(settings.items()))
+
+    with _pools_lock:
+
+        if _pools_pid != os.getpid():
+            # The pools of the parent process are kept referenced, but never
+            # used. Closing their connections would close the connections of
+            # the parent process as well.
+            _inherited_pools.extend(_pools.values())
+            _pools.clear()
+            _pools_pid = os.getpid()
+
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                settings=settings,
+                max_connections=cfg.MYSQL_POOL_SIZE,
+                max_idle=cfg.MYSQL_POOL_MAX_IDLE,
+                idle_seconds=cfg.MYSQL_POOL_IDLE_SECONDS,
+                ping_seconds=cfg.MYSQL_PING_SECONDS
+            )
+
+        return _pools[key]
+
+
+def retry_on_lost_connection(operation):
+    ##
+    #   Calls an operation and repeats it if the connection to the database
+    #   was lost (see TRANSIENT_ERRORS). The delay between the attempts
+    #   starts at MYSQL_RETRY_DELAY seconds and is doubled after every
+    #   attempt. After MYSQL_RETRIES attempts the error is raised.
+    #
+    #   @param {function} operation - Function without parameters.
+    #
+    #   @return The return value of the operation.
+    #
+
+    delay = cfg.MYSQL_RETRY_DELAY
+    attempt = 1
+
+    while True:
+
+        try:
+            return operation()
+
+        except MySQLdb.OperationalError, e:
+            if e[0] not in TRANSIENT_ERRORS or attempt >= cfg.MYSQL_RETRIES:
+                raise
+
+            logging.warning("Lost the connection to the database ({error}). Attempt {attempt} of {retries} in {delay}s.".format(
+                error=e,
+                attempt=attempt + 1,
+                retries=cfg.MYSQL_RETRIES,
+                delay=delay
+            ))
+
+        time.sleep(delay)
+        delay *= 2
+        attempt += 1
+
+
+def format_load_data_value(value):
+    ##
+    #   Formats a value for the default format of LOAD DATA INFILE.
+    #
+    #   @return {string} UTF-8 encoded.
+    #
+
+    if value is None:
+        return "\\N"
+
+    if isinstance(value, datetime.datetime):
+        value = value.strftime("%Y-%m-%d %H:%M:%S")
+
+    elif isinstance(value, float):
+        value = repr(value)
+
+    elif not isinstance(value, basestring):
+        value = str(value)
+
+    if isinstance(value, unicode):
+        value = value.encode("utf-8")
+
+    # Escape the special characters of the default format.
+    for character, escaped in [("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r"), ("\0", "\\0")]:
+        value = value.replace(character, escaped)
+
+    return value
+
+
+def close_connection(connection):
+
+    try:
+        connection.close()
+
+    except MySQLdb.Error:
+        pass
+
+
+def get_results_table_name(website_type):
+    ##
+    #   Returns the name of the results table of a website type. The table
+    #   holds the results of all runs, partitioned by the run id.
+    #
+    #   @param {string} website_type - Type of the website. Example: 'hotels'.
+    #
+    #   @return {string} None if the website type is not known yet.
+    #
+
+    if website_type is None:
+        return None
+
+    return "pdfuzz_results_" + website_type
+
+
+def get_partition_name(run_id):
+
+    return "r{0}".format(int(run_id))
+
+
+def parse_access_time(access_time):
+    ##
+    #   Converts the access time of a NavScraper result into a datetime.
+    #
+    #   @param {string} access_time - UTC time in ACCESS_TIME_FORMAT.
+    #
+    #   @return {datetime.datetime} The current UTC time if the access time
+    #   is missing or invalid.
+    #
+
+    try:
+        return datetime.datetime.strptime(access_time, ACCESS_TIME_FORMAT)
+
+    except (TypeError, ValueError):
+        return datetime.datetime.utcnow()
+
+
 def get_formatted_date(year, month, day):
 
     return "{day}.{month}.{year}".format(
@@ -9,9 +9,13 @@
 #   @author Nicolai Wilkop
 #
 
+import os
 import sys
 import logging
 import ast
+import cPickle
+import threading
+import collections
 import jinja2
 
 from jsmin import jsmin
@@ -20,6 +24,100 @@ from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import pdfuzz.config.config as cfg
 
 
+# Template of the injection code. It is compiled only once per process.
+INJECT_TEMPLATE = jinja2.Environment(
+    loader=jinja2.PackageLoader(
+        "pdfuzz.config",
+        "templates"
+    )
+).get_template("inject_template.js")
+
+# Cache of the minified injection code, stored by the fingerprint id and the
+# timezone offset. It is used if the code was not pre-rendered into the
+# fingerprint store. The NavScrapers of a worker scan the same fingerprints
+# shortly after each other, so only the recently used scripts are kept.
+INJECT_JS_CACHE = collections.OrderedDict()
+INJECT_JS_CACHE_SIZE = 32
+INJECT_JS_CACHE_LOCK = threading.Lock()
+
+# File of the preprocessed fingerprints of the current run. It is set by
+# build_fingerprint_store(). Processes that are forked afterwards inherit it
+# and load the fingerprints from this file instead of the database.
+FINGERPRINT_STORE_FILENAME = None
+
+# Pool of shared string objects, so that equal strings of different
+# fingerprints are stored only once.
+STRING_POOL = {}
+
+# Shared strings of the fingerprint store, loaded once per process from the
+# string file of the store. The records reference them by their index.
+STORE_STRINGS = None
+STORE_STRINGS_LOCK = threading.Lock()
+
+
+def intern_string(value):
+    ##
+    #   Returns the shared object of an equal string from the pool. Unlike the
+    #   builtin intern() this also works for unicode strings.
+    #
+    #   @param {string} value
+    #
+    #   @return {string}
+    #
+
+    return STRING_POOL.setdefault(value, value)
+
+
+class FingerprintRecord(object):
+    ##
+    #   Compact, preprocessed fingerprint of a single timezone offset. Instead
+    #   of the raw features it holds the prepared dcap, the parsed values for
+    #   the injection template and the minified injection code, which was
+    #   rendered once per run. Like the fingerprint dictionaries, the
+    #   attributes can be read via fingerprint["id"].
+    #
+
+    __slots__ = ["id", "timezoneoffset", "dcap", "template_values", "inject_js"]
+
+    def __init__(self, id, timezoneoffset, dcap, template_values, inject_js=None):
+        ##
+        #
+        #   @param {int} id - Database id of the fingerprint.
+        #   @param {int} timezoneoffset - Timezone offset of the worker.
+        #   @param {tuple} dcap - Items of the dcap without the injection code.
+        #   @param {dict} template_values - Values of the injection template
+        #   without the id and the timezone offset.
+        #   @param {string} inject_js - (optional) Minified injection code for
+        #   the timezone offset. If None, it is rendered when the dcap is
+        #   created (see create_inject_js()).
+        #
+
+        self.id = id
+        self.timezoneoffset = timezoneoffset
+        self.dcap = dcap
+        self.template_values = template_values
+        self.inject_js = inject_js
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __getstate__(self):
+        return (self.id, self.timezoneoffset, self.dcap, self.template_values, self.inject_js)
+
+    def __setstate__(self, state):
+        self.id, self.timezoneoffset, self.dcap, self.template_values, self.inject_js = state
+
+    def get_template_context(self):
+        ##
+        #   Returns the fingerprint in the form of get_fingerprints() for the
+        #   injection template.
+        #
+        #   @return {dict}
+        #
+
+        return dict(self.template_values, id=self.id, timezoneoffset=self.timezoneoffset)
+
+
 def get_fingerprints(db_manager, timezone_offset):
     ##
     #   Generator function to receive features of a fingerprint. These features
@@ -94,7 +192,8 @@ def get_fingerprints(db_manager, timezone_offset):
                             )
 
                         # Save the list of plugins in the new fingerprint.
-                        fingerprint["plugins"] = list(js_new_plugin_list)
+                        fingerprint["plugins"] = [
+                            intern_string(plugin) for plugin in js_new_plugin_list]
 
                     elif "mimeTypes" in attribute:
                         # Using a set to remove duplicate mimeTypes
@@ -116,7 +215,8 @@ def get_fingerprints(db_manager, timezone_offset):
                             )
 
                         # Save the list of mimetypes in the new fingerprint.
-                        fingerprint["mimetypes"] = list(js_new_mimetypes_list)
+                        fingerprint["mimetypes"] = [
+                            intern_string(mimetype) for mimetype in js_new_mimetypes_list]
 
                     else:
                         # Use the value of the raw fingerprint by using the key
@@ -181,34 +281,249 @@ def create_inject_js(fingerprint):
     #   @return {string} javascript code to manipulate the fingerprint.
     #
 
-    # Get template to init the template engine via the PackageLoader of jinja2.
-    template = jinja2.Environment(
-        loader=jinja2.PackageLoader(
-            "pdfuzz.config",
-            "templates"
-        )
-    ).get_template("inject_template.js")
+    cache_key = (fingerprint["id"], fingerprint["timezoneoffset"])
+
+    with INJECT_JS_CACHE_LOCK:
+        inject_js = INJECT_JS_CACHE.pop(cache_key, None)
+
+    if inject_js is None:
+        inject_js = render_inject_js(fingerprint)
+
+    with INJECT_JS_CACHE_LOCK:
+        # The most recently used script is the last entry.
+        INJECT_JS_CACHE[cache_key] = inject_js
+
+        while len(INJECT_JS_CACHE) > INJECT_JS_CACHE_SIZE:
+            INJECT_JS_CACHE.popitem(last=False)
+
+    # Pass back the injection javascript code.
+    return inject_js
+
+
+def render_inject_js(fingerprint):
+    ##
+    #   Renders and minifies the injection code of a fingerprint.
+    #
+    #   @param {dict} fingerprint - The fingerprint contains navigator_obj,
+    #   screen_obj, timezoneoffset.
+    #   @return {string} javascript code to manipulate the fingerprint.
+    #
 
     # Reder template with fingerprint information.
-    inject_js = template.render(fingerprint)
+    inject_js = INJECT_TEMPLATE.render(fingerprint)
 
     # minify js code.
-    inject_js_min = jsmin(inject_js)
+    return jsmin(inject_js)
 
-    # Pass back the injection javascript code.
-    return inject_js_min
 
+def build_fingerprint_store(db_manager, filename, timezone_offsets):
+    ##
+    #   Preprocesses all fingerprints once per run and writes them into a
+    #   file: For every fingerprint the dcap and the values of the injection
+    #   template are prepared and the injection code is rendered for the
+    #   timezone offsets of all workers. Afterwards load_fingerprints() reads
+    #   the file.
+    #
+    #   The plugin and mimetype strings of the pool are written once into a
+    #   string file next to the store. The records reference them by their
+    #   index, so that the readers share them across all records.
+    #
+    #   @param {pdfuzz.core.db_connection.DBManager} db_manager - Instance of
+    #   the database management class.
+    #   @param {string} filename - Path of the store file.
+    #   @param {iterable} timezone_offsets - Timezone offsets of the workers.
+    #
+
+    global FINGERPRINT_STORE_FILENAME, STORE_STRINGS
+
+    timezone_offsets = sorted(set(timezone_offsets))
+    num_fingerprints = 0
+
+    string_ids = {}
+
+    def get_string_id(obj):
+        # Only the strings of the pool are shared. Other strings that are
+        # equal to a pooled one are pickled as they are.
+        if isinstance(obj, basestring) and STRING_POOL.get(obj) is obj:
+            return string_ids.setdefault(obj, len(string_ids))
+
+        return None
+
+    with open(filename, "wb") as store_file:
+
+        pickler = cPickle.Pickler(store_file, cPickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = get_string_id
+
+        for fingerprint in get_fingerprints(db_manager=db_manager, timezone_offset=None):
+
+            dcap = create_dcap(fingerprint=fingerprint, inject_js=False)
+
+            template_values = dict(fingerprint)
+            del template_values["id"]
+            del template_values["timezoneoffset"]
+
+            inject_js = {}
+            for timezone_offset in timezone_offsets:
+                inject_js[timezone_offset] = render_inject_js(
+                    dict(fingerprint, timezoneoffset=timezone_offset))
+
+            pickler.dump((fingerprint["id"], tuple(sorted(dcap.items())), template_values, inject_js))
+
+            # Every record is a pickle of its own, so that the memo of the
+            # pickler does not keep the records of the whole store.
+            pickler.clear_memo()
+            num_fingerprints += 1
+
+    store_strings = [None] * len(string_ids)
+    for value, string_id in string_ids.items():
+        store_strings[string_id] = value
 
-def create_dcap(fingerprint):
+    with open(get_store_strings_filename(filename), "wb") as strings_file:
+        cPickle.dump(store_strings, strings_file, cPickle.HIGHEST_PROTOCOL)
+
+    # Clear the pool, it is not needed anymore.
+    STRING_POOL.clear()
+
+    with STORE_STRINGS_LOCK:
+        STORE_STRINGS = None
+
+    FINGERPRINT_STORE_FILENAME = filename
+
+    logging.info("{num} fingerprints preprocessed.".format(num=num_fingerprints))
+
+
+def has_fingerprint_store():
+    ##
+    #   Checks if the fingerprints of the run are read from a fingerprint
+    #   store.
+    #
+    #   @return {bool}
+    #
+
+    return FINGERPRINT_STORE_FILENAME is not None and os.path.isfile(FINGERPRINT_STORE_FILENAME)
+
+
+def load_fingerprints(db_manager, timezone_offset):
+    ##
+    #   Generator over the fingerprints of the run. If a fingerprint store was
+    #   built, the preprocessed records are read from it. Otherwise the
+    #   fingerprints are read from the database.
+    #
+    #   @param {pdfuzz.core.db_connection.DBManager} db_manager - Instance of
+    #   the database management class.
+    #   @param {int} timezone_offset - Timezone offset of the worker.
+    #
+    #   @return {FingerprintRecord or dict}
+    #
+
+    if not has_fingerprint_store():
+        return get_fingerprints(db_manager=db_manager, timezone_offset=timezone_offset)
+
+    return _read_fingerprint_store(
+        filename=FINGERPRINT_STORE_FILENAME,
+        timezone_offset=timezone_offset
+    )
+
+
+def get_store_strings_filename(filename):
+    ##
+    #   Returns the path of the string file of a fingerprint store.
+    #
+    #   @param {string} filename - Path of the store file.
+    #
+    #   @return {string}
+    #
+
+    return filename + ".strings"
+
+
+def _load_store_strings(filename):
+    ##
+    #   Returns the shared strings of a fingerprint store. They are loaded
+    #   once per process.
+    #
+    #   @param {string} filename - Path of the store file.
+    #
+    #   @return {list}
+    #
+
+    global STORE_STRINGS
+
+    with STORE_STRINGS_LOCK:
+
+        if STORE_STRINGS is None:
+            with open(get_store_strings_filename(filename), "rb") as strings_file:
+                STORE_STRINGS = cPickle.load(strings_file)
+
+        return STORE_STRINGS
+
+
+def _read_fingerprint_store(filename, timezone_offset):
+    ##
+    #   Generator over the records of a fingerprint store for a timezone
+    #   offset. Every record is read with a new unpickler, so only the
+    #   current record and the shared strings are held in memory.
+    #
+    #   @param {string} filename - Path of the store file.
+    #   @param {int} timezone_offset - Timezone offset of the worker.
+    #
+    #   @return {FingerprintRecord}
+    #
+
+    store_strings = _load_store_strings(filename)
+
+    with open(filename, "rb") as store_file:
+
+        while True:
+
+            unpickler = cPickle.Unpickler(store_file)
+            unpickler.persistent_load = store_strings.__getitem__
+
+            try:
+                fingerprint_id, dcap_items, template_values, inject_js = unpickler.load()
+
+            except EOFError:
+                break
+
+            yield FingerprintRecord(
+                id=fingerprint_id,
+                timezoneoffset=timezone_offset,
+                dcap=dcap_items,
+                template_values=template_values,
+                inject_js=inject_js.get(timezone_offset)
+            )
+
+
+def create_dcap(fingerprint, inject_js=True):
     ##
     #   Create the DesiredCapabilities for the PhantomJS instance.
     #   General settings for the behavior of the browser are made here.
     #
-    #   @param {dict} fingerprint - The fingerprint contains navigator_obj,
-    #   screen_obj, timezoneoffset.
+    #   @param {dict or FingerprintRecord} fingerprint - The fingerprint
+    #   contains navigator_obj, screen_obj, timezoneoffset. A preprocessed
+    #   record already contains the dcap.
+    #   @param {bool} inject_js - (optional) If False, the injection code is
+    #   not added.
     #   @return {selenium.webdriver.common.desired_capabilities.DesiredCapabilities}
     #
 
+    if isinstance(fingerprint, FingerprintRecord):
+        dcap = dict(fingerprint.dcap)
+
+        if inject_js:
+            # The injection code was rendered when the store was built, unless
+            # the timezone offset of the worker was unknown then.
+            code = fingerprint.inject_js
+            if code is None:
+                code = create_inject_js(fingerprint.get_template_context())
+
+            dcap = set_onInitialized_jsInject_code(
+                dcap=dcap,
+                jsInject_code=code
+            )
+
+        return dcap
+
     # Transform DesiredCapabilities profile to dictionary.
     dcap_profile = DesiredCapabilities.PHANTOMJS
     dcap = dict(dcap_profile)
@@ -233,11 +548,12 @@ def create_dcap(fingerprint):
     )
 
     # Set inject JS code.
-    code = create_inject_js(fingerprint)
-    dcap = set_onInitialized_jsInject_code(
-        dcap=dcap,
-        jsInject_code=code
-    )
+    if inject_js:
+        code = create_inject_js(fingerprint)
+        dcap = set_onInitialized_jsInject_code(
+            dcap=dcap,
+            jsInject_code=code
+        )
 
     return dcap
 
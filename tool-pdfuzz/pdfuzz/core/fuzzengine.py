@@ -8,11 +8,16 @@
 #   @author Nicolai Wilkop
 #
 
+import os
 import atexit
 import time
 import logging
+import threading
 import multiprocessing
+import Queue
 import urllib2
+import socket
+import httplib
 import pprint
 
 import pdfuzz.common.exceptions as PDFuzzExceptions
@@ -20,6 +25,15 @@ import pdfuzz.config.config as cfg
 import pdfuzz.core.phantomconnection as phanconn
 import pdfuzz.core.fpfuzzer as fpfuzzer
 import pdfuzz.core.db_connection as db_connection
+import pdfuzz.core.ratelimiter as ratelimiter
+import pdfuzz.core.healthmonitor as healthmonitor
+import pdfuzz.core.metrics as metrics
+import pdfuzz.core.replay as replay
+import pdfuzz.core.spool as Spool
+import pdfuzz.config.navscrapers.api.currency_converter as CurrencyConverter
+import pdfuzz.config.navscrapers.api.timing as Timing
+import pdfuzz.config.navscrapers.api.corpus as Corpus
+import pdfuzz.selenium_extension.expected_conditions as MyEC
 
 
 def start_fuzzing(cl_settings, search_parameters_id):
@@ -32,37 +46,8 @@ def start_fuzzing(cl_settings, search_parameters_id):
     #   parameters entry.
     #
 
-    # ----- INIT Fuzzing Run -----
-    print("[*] Initialization")
-    logging.info("Initialization")
-
-    # Get list of navscraper from the config file.
-    navscraper_list = cfg.NAVSCRAPERS
-
-    # Init the webdriver manager.
-    phwd_manager = phanconn.PhantomWebdriverManager(
-        webdriver_details_list=cfg.WEBDRIVERS_SETTINGS
-    )
-
-    # Start all webdriver server that are defined in the config file.
-    print("[**] Starting WebDriver Server")
-    logging.debug("[**] Starting WebDriver Server")
-
-    phwd_manager.start_all_webdriver_instances()
-
-    print("[**] Waiting for WebDriver Server")
-    logging.debug("[**] Waiting for WebDriver Server")
-
-    time.sleep(5)
-
-    # Register atexit routine to shutdown all webdriver server.
-    print("[**] Register Shutdown Cleanup")
-    logging.debug("[**] Register Shutdown Cleanup")
-
-    atexit.register(phwd_manager.shutdown_all_webdriver_server)
-
-    # Get a list of phantom wrappers to communicate with the webdriver servers.
-    phantom_wrapper_list = phwd_manager.get_phantom_wrappers()
+    navscraper_list, phwd_manager, phantom_wrapper_list, rate_limiter, health_monitor, metrics_collector = \
+        init_fuzzing(cl_settings=cl_settings)
 
     # ----- MAIN Routine -----
     print("[*] Start Fuzzing..")
@@ -80,36 +65,269 @@ def start_fuzzing(cl_settings, search_parameters_id):
             name=phantom_wrapper_info["country"] + " (local)",
             target=inner_fuzzing_local,
             args=(phantom_wrapper_info, navscraper_list,
-                  search_parameters_id, cl_settings, phwd_manager,)
+                  search_parameters_id, cl_settings, health_monitor,
+                  rate_limiter, metrics_collector,)
         )
         worker_list.append(process)
         process.start()
 
     # Iterate over all phantom wrappers that are using a VM connection and
     # create a process for each VM.
-    for index, phantom_wrapper_set in enumerate(phantom_wrapper_list["vm"]):
+    for phantom_wrapper_set in phantom_wrapper_list["vm"]:
 
-        start_delay = index * 2
         # Crate/Start a new process for every set of webdriver servers in the
         # list. The name of the process is the country of the geolocation.
         process = multiprocessing.Process(
             name=phantom_wrapper_set[0]["country"] + " (vm_master)",
             target=vm_master,
             args=(phantom_wrapper_set, navscraper_list,
-                  search_parameters_id, cl_settings, start_delay,)
+                  search_parameters_id, cl_settings,
+                  rate_limiter, health_monitor, metrics_collector,)
         )
         worker_list.append(process)
         process.start()
 
+    # Start the health monitor and the metrics after the workers are forked,
+    # so that they do not inherit their threads.
+    health_monitor.start()
+    metrics_collector.start()
+    spool_ingestor = start_spool_ingestor(cl_settings=cl_settings)
+
     # Waiting for all processes.
     for process in worker_list:
         process.join()
 
+    health_monitor.stop()
+    metrics_collector.stop()
+
+    if spool_ingestor is not None:
+        # Load the remaining spool segments.
+        spool_ingestor.stop()
+
     print("[*] Finished")
     logging.info("[*] Finished")
 
 
-def inner_fuzzing_local(phantom_wrapper_info, navscraper_list, search_parameters_id, cl_settings, phwd_manager):
+def init_fuzzing(cl_settings):
+    ##
+    #   Prepares a fuzzing run: Starts the webdriver servers and prepares the
+    #   rate limiter, the exchange rates and the fingerprints. This is shared
+    #   by the fuzzing engines.
+    #
+    #   @param {argparse.results} cl_settings - Object of parsed parameters
+    #   from the commandline.
+    #
+    #   @return {list} NavScraper classes, {PhantomWebdriverManager},
+    #   {dict} phantom wrappers, {ratelimiter.HostRateLimiter},
+    #   {healthmonitor.EndpointHealthMonitor} (not started),
+    #   {metrics.MetricsCollector} (not started)
+    #
+
+    # ----- INIT Fuzzing Run -----
+    print("[*] Initialization")
+    logging.info("Initialization")
+
+    # Get list of navscraper from the config file.
+    navscraper_list = cfg.NAVSCRAPERS
+
+    # Init the webdriver manager.
+    phwd_manager = phanconn.PhantomWebdriverManager(
+        webdriver_details_list=cfg.WEBDRIVERS_SETTINGS
+    )
+
+    # Start all webdriver server that are defined in the config file.
+    print("[**] Starting WebDriver Server")
+    logging.debug("[**] Starting WebDriver Server")
+
+    phwd_manager.start_all_webdriver_instances()
+
+    # Register atexit routine to shutdown all webdriver server.
+    print("[**] Register Shutdown Cleanup")
+    logging.debug("[**] Register Shutdown Cleanup")
+
+    atexit.register(phwd_manager.shutdown_all_webdriver_server)
+
+    # Get a list of phantom wrappers to communicate with the webdriver servers.
+    phantom_wrapper_list = phwd_manager.get_phantom_wrappers()
+
+    # Init the health monitor of the webdriver servers. Its states are
+    # shared by all workers. The monitor waits for the servers to start, so
+    # that every worker begins as soon as its server answers.
+    health_monitor = healthmonitor.EndpointHealthMonitor(
+        phantom_wrapper_infos=phwd_manager.get_all_phantom_wrapper_infos(),
+        restart_hook=phwd_manager.restart_webdriver,
+        probe_interval=cfg.WEBDRIVER_PROBE_INTERVAL,
+        probe_timeout=cfg.WEBDRIVER_PROBE_TIMEOUT,
+        max_probe_failures=cfg.WEBDRIVER_MAX_PROBE_FAILURES,
+        restart_timeout=cfg.WEBDRIVER_RESTART_TIMEOUT,
+        max_restarts=cfg.WEBDRIVER_MAX_RESTARTS,
+        startup_timeout=cfg.WEBDRIVER_STARTUP_TIMEOUT
+    )
+
+    # Stop the monitor before the servers are shut down, so that it does not
+    # restart them. The atexit routines are called in reverse order.
+    atexit.register(health_monitor.stop)
+
+    # Init the live metrics. The workers send their counts through a shared
+    # queue. The HTTP server is bound here, before the workers are forked.
+    metrics_collector = metrics.MetricsCollector(
+        host=cfg.METRICS_HOST,
+        port=cfg.METRICS_PORT,
+        throughput_window=cfg.METRICS_THROUGHPUT_WINDOW
+    )
+
+    # Init the rate limiter for the hosts of the target websites. It is
+    # shared by all workers.
+    rate_limiter = ratelimiter.HostRateLimiter(
+        hosts=[
+            ratelimiter.get_host(navscraper_class.ENTRY_URI)
+            for navscraper_class in navscraper_list
+            if navscraper_class.PAGE_TYPE == cl_settings.target_website_type
+        ],
+        requests_per_minute=cfg.HOST_REQUESTS_PER_MINUTE
+    )
+
+    # Prefetch the exchange rates, so that the worker processes inherit them
+    # and do not request them while scraping.
+    print("[**] Prefetching Exchange Rates")
+    logging.debug("[**] Prefetching Exchange Rates")
+
+    CurrencyConverter.init_exchange_rates(
+        cache_filename=cfg.EXCHANGE_RATES_CACHE_FILE,
+        ttl=cfg.EXCHANGE_RATES_TTL,
+        offline_filename=cfg.EXCHANGE_RATES_OFFLINE_FILE
+    )
+
+    # Record the durations of the stages of every scan in the timing log of
+    # the run.
+    if cfg.TIMING_LOG:
+        if not os.path.isdir(cfg.TIMING_LOG_DIR):
+            os.makedirs(cfg.TIMING_LOG_DIR)
+
+        Timing.set_log_file(get_timing_log_filename(cl_settings.result_table_name))
+
+    # Save the scraped pages into the corpus of the scraping benchmark.
+    Corpus.set_dump_dir(cfg.PAGE_DUMP_DIR)
+
+    # Preprocess the fingerprints once, so that the worker processes load
+    # the prepared dcaps and injection code.
+    if cfg.FINGERPRINT_STORE:
+        print("[**] Preprocessing Fingerprints")
+        logging.debug("[**] Preprocessing Fingerprints")
+
+        build_fingerprint_store(
+            phantom_wrapper_list=phantom_wrapper_list,
+            cl_settings=cl_settings
+        )
+
+    return navscraper_list, phwd_manager, phantom_wrapper_list, rate_limiter, health_monitor, metrics_collector
+
+
+def start_spool_ingestor(cl_settings):
+    ##
+    #   Starts the thread that loads the spool segments of the workers into
+    #   the database, if the results are spooled (see cfg.SPOOL_DIR).
+    #
+    #   @param {argparse.results} cl_settings - Object of parsed parameters
+    #   from the commandline.
+    #
+    #   @return {spool.SpoolIngestor} None if the results are not spooled.
+    #
+
+    if cfg.SPOOL_DIR is None:
+        return None
+
+    spool_ingestor = Spool.SpoolIngestor(
+        db_manager=db_connection.DBManager(
+            settings=cfg.MYSQL,
+            website_type=None,
+            mode="ingest",
+            run_name=cl_settings.result_table_name
+        ),
+        spool_dir=Spool.get_run_spool_dir(cfg.SPOOL_DIR, cl_settings.result_table_name),
+        interval=cfg.SPOOL_INGEST_INTERVAL
+    )
+    spool_ingestor.start()
+
+    return spool_ingestor
+
+
+def get_timing_log_filename(run_name):
+    ##
+    #   Returns the path of the timing log of a run.
+    #
+    #   @param {string} run_name - Name of the results table of the run.
+    #
+    #   @return {string}
+    #
+
+    return os.path.join(cfg.TIMING_LOG_DIR, "{0}.jsonl".format(run_name))
+
+
+def get_worker_name():
+    ##
+    #   Returns the name of the current worker. A worker is a process or, in
+    #   the thread engine, a thread.
+    #
+    #   @return {string}
+    #
+
+    current_thread = threading.current_thread()
+
+    if current_thread.name == "MainThread":
+        return multiprocessing.current_process().name
+
+    return current_thread.name
+
+
+def build_fingerprint_store(phantom_wrapper_list, cl_settings):
+    ##
+    #   Preprocesses the fingerprints for the timezone offsets of all workers
+    #   into the fingerprint store of the run.
+    #
+    #   @param {dict} phantom_wrapper_list - Phantom wrappers of the local and
+    #   VM workers.
+    #   @param {argparse.results} cl_settings - Object of parsed parameters
+    #   from the commandline.
+    #
+
+    if not os.path.isdir(cfg.FINGERPRINT_STORE_DIR):
+        os.makedirs(cfg.FINGERPRINT_STORE_DIR)
+
+    # Init database connection
+    db_manager = db_connection.DBManager(
+        settings=cfg.MYSQL,
+        mode="fuzzing_read",
+        website_type=cl_settings.target_website_type,
+        run_name=cl_settings.result_table_name
+    )
+
+    # Timezone offsets of all workers, the injection code is rendered once
+    # for each of them.
+    timezone_offsets = [
+        phantom_wrapper_info["timezone_offset"]
+        for phantom_wrapper_info in phantom_wrapper_list["local"]
+    ]
+    for phantom_wrapper_set in phantom_wrapper_list["vm"]:
+        timezone_offsets.extend(
+            phantom_wrapper_info["timezone_offset"]
+            for phantom_wrapper_info in phantom_wrapper_set
+        )
+
+    fpfuzzer.build_fingerprint_store(
+        db_manager=db_manager,
+        filename=os.path.join(
+            cfg.FINGERPRINT_STORE_DIR,
+            "{0}.fpstore".format(cl_settings.result_table_name)
+        ),
+        timezone_offsets=timezone_offsets
+    )
+
+    # Close database connection.
+    db_manager.close()
+
+
+def inner_fuzzing_local(phantom_wrapper_info, navscraper_list, search_parameters_id, cl_settings, health_monitor, rate_limiter, metrics_collector):
     ##
     #   Main fuzzing routine that can be started in multiple threads/processes.
     #   It iterates over the several variables (NavScrapers, Fingerprints),
@@ -122,7 +340,12 @@ def inner_fuzzing_local(phantom_wrapper_info, navscraper_list, search_parameters
     #   parameters entry.
     #   @param {argparse.results} cl_settings - Object of parsed parameters
     #   from the commandline.
-    #   @param {PhantomWebdriverManager} phwd_manager - ...
+    #   @param {healthmonitor.EndpointHealthMonitor} health_monitor - Health
+    #   monitor of the webdriver servers.
+    #   @param {ratelimiter.HostRateLimiter} rate_limiter - Rate limiter that
+    #   is shared by all workers.
+    #   @param {metrics.MetricsCollector} metrics_collector - Collector of
+    #   the live metrics.
     #
 
     # Store the type of the target websites in a local variable.
@@ -138,6 +361,21 @@ def inner_fuzzing_local(phantom_wrapper_info, navscraper_list, search_parameters
     else:
         proxy_address = None
 
+    # Determine the input parameters for the navigation of the
+    # NavScraper.
+    navigation_search_parameters = \
+        cfg.SEARCH_PARAMETERS.get(target_website_type, {})
+
+    # NavScraper instances and timeout limits of this worker, stored by the
+    # index of the NavScraper.
+    navscrapers = {}
+    timeout_limits = {}
+
+    # Recorder of the pages for the offline replay.
+    recorder = None
+    if cfg.RECORD_DIR is not None:
+        recorder = replay.PageRecorder(record_dir=cfg.RECORD_DIR, worker_name=get_worker_name())
+
     try:
         # Get phantomwrapper object
         phw = phantom_wrapper_info["phantomwrapper"]
@@ -146,56 +384,111 @@ def inner_fuzzing_local(phantom_wrapper_info, navscraper_list, search_parameters
         db_manager = db_connection.DBManager(
             settings=cfg.MYSQL,
             website_type=target_website_type,
-            result_table_name=cl_settings.result_table_name
+            run_name=cl_settings.result_table_name
         )
 
-        # Iterate over navscrapers.
-        # Means that this iterated also over the target websites.
-        for navscraper_class in navscraper_list:
+        # Get all fingerprints that are to be tested. The fingerprint store
+        # is streamed by every NavScraper on its own, so the fingerprints are
+        # not held in memory. Without a store they are read from the database
+        # only once.
+        fingerprint_list = None
+        if not fpfuzzer.has_fingerprint_store():
+            fingerprint_list = list(fpfuzzer.load_fingerprints(
+                db_manager=db_manager,
+                timezone_offset=phantom_wrapper_info["timezone_offset"]
+            ))
+
+        # Tasks of this run that were completed before a restart.
+        completed_tasks = db_manager.get_completed_tasks(
+            worker_country=phantom_wrapper_info["country"])
+
+        # Every NavScraper with the actual page type gets its own iterator
+        # over the fingerprints. Means that this iterates also over the
+        # target websites.
+        task_sources = {}
+        navscraper_hosts = {}
+        for navscraper_index, navscraper_class in enumerate(navscraper_list):
 
             # Skip every NavScraper that does not have the actual page type.
             if navscraper_class.PAGE_TYPE != target_website_type:
                 continue
 
-            # Get a new instance of the current NavScraper.
-            navscraper = navscraper_class()
-
-            logging.info("Testing: {0}".format(navscraper.ENTRY_URI))
-
-            # Get the initial timeout limit from the config file.
-            timeout_limit = cfg.TIMEOUT_LIMIT
-
-            # Determine the input parameters for the navigation of the
-            # NavScraper.
-            navigation_search_parameters = \
-                cfg.SEARCH_PARAMETERS.get(target_website_type, {})
-
-            # Iterate over all fingerprints that are to be tested.
-            for fingerprint in fpfuzzer.get_fingerprints(
+            fingerprints = fingerprint_list
+            if fingerprints is None:
+                fingerprints = fpfuzzer.load_fingerprints(
                     db_manager=db_manager,
-                    timezone_offset=phantom_wrapper_info["timezone_offset"]):
+                    timezone_offset=phantom_wrapper_info["timezone_offset"]
+                )
 
-                scan_successful = False
-                timeout_occurred = False
-                retry_count = 0
-                while not scan_successful:
+            task_sources[navscraper_index] = iter(get_pending_fingerprints(
+                fingerprints=fingerprints,
+                navscraper_class=navscraper_class,
+                completed_tasks=completed_tasks
+            ))
+            navscraper_hosts[navscraper_index] = \
+                ratelimiter.get_host(navscraper_class.ENTRY_URI)
+
+        # Iterate over all tasks. While the host of one website cools down,
+        # the tasks of the other websites are processed.
+        for navscraper_index, fingerprint in iter_tasks(
+                task_sources=task_sources,
+                navscraper_hosts=navscraper_hosts,
+                rate_limiter=rate_limiter,
+                phantom_wrapper_info=phantom_wrapper_info,
+                health_monitor=health_monitor):
+
+            if navscraper_index not in navscrapers:
+                # Get a new instance of the current NavScraper.
+                navscrapers[navscraper_index] = navscraper_list[navscraper_index]()
+                logging.info("Testing: {0}".format(
+                    navscrapers[navscraper_index].ENTRY_URI))
+
+                # Get the initial timeout limit from the config file.
+                timeout_limits[navscraper_index] = cfg.TIMEOUT_LIMIT
+
+            navscraper = navscrapers[navscraper_index]
+
+            # Labels of the metrics of this task.
+            metric_labels = {
+                "site": navscraper.ENTRY_URI,
+                "country": phantom_wrapper_info["country"],
+            }
+
+            scan_successful = False
+            timeout_occurred = False
+            retry_count = 0
+            network_error_count = 0
+            while not scan_successful:
 
-                    try:
-                        # Run the navigation and scraping routine of the
-                        # current NavScraper with the actual fingerprint.
-                        results = gather_information_with_fingerprint(
-                            navscraper=navscraper,
-                            fingerprint=fingerprint,
-                            phw=phw,
-                            navigation_search_parameters=navigation_search_parameters
-                        )
+                # Anti DDoS delay
+                rate_limiter.wait(navscraper_hosts[navscraper_index])
+
+                Timing.start_scan(
+                    worker=get_worker_name(),
+                    country=phantom_wrapper_info["country"],
+                    site=navscraper.ENTRY_URI,
+                    fp_id=fingerprint["id"],
+                    attempt=retry_count + network_error_count + 1
+                )
 
-                        # Save results in database.
+                try:
+                    # Run the navigation and scraping routine of the
+                    # current NavScraper with the actual fingerprint.
+                    results = gather_information_with_fingerprint(
+                        navscraper=navscraper,
+                        fingerprint=fingerprint,
+                        phw=phw,
+                        navigation_search_parameters=navigation_search_parameters,
+                        recorder=recorder
+                    )
+
+                    # Save results in database.
+                    with Timing.span("store"):
                         store_results(
                             db_manager=db_manager,
                             results=results,
                             worker_info={
-                                "name": multiprocessing.current_process().name,
+                                "name": get_worker_name(),
                                 "timezone_offset": phantom_wrapper_info["timezone_offset"],
                                 "proxy_address": proxy_address,
                             },
@@ -204,110 +497,191 @@ def inner_fuzzing_local(phantom_wrapper_info, navscraper_list, search_parameters
                             search_parameters_id=search_parameters_id
                         )
 
-                        # Mark scan with current FP as successful.
-                        scan_successful = True
+                    metrics_collector.count("pdfuzz_rows_written_total", value=len(results), **metric_labels)
 
-                        # Reset timeout limit.
-                        timeout_limit = cfg.TIMEOUT_LIMIT
+                    # Mark scan with current FP as successful.
+                    scan_successful = True
 
-                    except PDFuzzExceptions.NavScraperException as e:
+                    # Reset timeout limit.
+                    timeout_limits[navscraper_index] = cfg.TIMEOUT_LIMIT
 
-                        if isinstance(e, PDFuzzExceptions.NetworkErrorException):
-                            logging.warning("Restarting WebDriver after crash.")
-                            # Restart the PhantomJS WebDriver and go on.
-                            phw = phwd_manager.restart_webdriver(phantom_wrapper_info)
+                except PDFuzzExceptions.NavScraperException as e:
 
-                        elif retry_count == cfg.FP_RETRY:
-                            log_scan_not_completed_error(
-                                driver=phw.get_driver(),
-                                exception=e
-                            )
-                            break
+                    metrics_collector.count("pdfuzz_scan_errors_total", error=type(e).__name__, **metric_labels)
 
-                        # Increment the retry counter.
-                        retry_count += 1
-                        print("# {retry_count}. retry for {website} with FP {fp_id}".format(
-                            retry_count=retry_count,
-                            website=navscraper.ENTRY_URI,
-                            fp_id=fingerprint["id"]
-                        ))
-                        logging.info("{retry_count}. retry for {website} with FP {fp_id}".format(
-                            retry_count=retry_count,
-                            website=navscraper.ENTRY_URI,
-                            fp_id=fingerprint["id"]
-                        ))
+                    if isinstance(e, PDFuzzExceptions.NetworkErrorException) and \
+                            network_error_count < cfg.FP_RETRY:
+                        # The webdriver server failed, not the website. Wait
+                        # for the restart without counting a retry.
+                        network_error_count += 1
+                        wait_for_restarted_webdriver(
+                            phantom_wrapper_info=phantom_wrapper_info,
+                            health_monitor=health_monitor,
+                            report_failure=True
+                        )
+                        continue
 
-                    except PDFuzzExceptions.PageLoadTimeoutException as e:
+                    if retry_count == cfg.FP_RETRY:
+                        log_scan_not_completed_error(
+                            driver=phw.get_driver(),
+                            exception=e
+                        )
+                        break
 
-                        if retry_count == cfg.FP_RETRY:
-                            break
+                    # Increment the retry counter.
+                    retry_count += 1
+                    metrics_collector.count("pdfuzz_retries_total", **metric_labels)
+                    print("# {retry_count}. retry for {website} with FP {fp_id}".format(
+                        retry_count=retry_count,
+                        website=navscraper.ENTRY_URI,
+                        fp_id=fingerprint["id"]
+                    ))
+                    logging.info("{retry_count}. retry for {website} with FP {fp_id}".format(
+                        retry_count=retry_count,
+                        website=navscraper.ENTRY_URI,
+                        fp_id=fingerprint["id"]
+                    ))
+
+                except PDFuzzExceptions.PageLoadTimeoutException as e:
+
+                    metrics_collector.count("pdfuzz_scan_errors_total", error=type(e).__name__, **metric_labels)
+
+                    if retry_count == cfg.FP_RETRY:
+                        break
+
+                    # Increment the retry counter.
+                    retry_count += 1
+                    metrics_collector.count("pdfuzz_retries_total", **metric_labels)
 
-                        # Increment the retry counter.
-                        retry_count += 1
+                    if timeout_limits[navscraper_index] > 0 and not timeout_occurred:
+                        timeout_limits[navscraper_index] -= 1
+                        timeout_occurred = True
+                        logging.info("{timeout_limit} timouts remaining for {website}".format(
+                            timeout_limit=timeout_limits[navscraper_index],
+                            website=navscraper.ENTRY_URI
+                        ))
 
-                        if timeout_limit > 0 and not timeout_occurred:
-                            timeout_limit -= 1
-                            timeout_occurred = True
-                            logging.info("{timeout_limit} timouts remaining for {website}".format(
-                                timeout_limit=timeout_limit,
-                                website=navscraper.ENTRY_URI
-                            ))
+                finally:
+                    Timing.finish_scan(status="completed" if scan_successful else "failed")
 
-                    finally:
-                        # Disconnect from PhantomJS WebDriver server.
+                    if scan_successful:
+                        # Keep the session for the next fingerprint.
+                        phw.release()
+                    else:
+                        # Recycle the session after an error.
                         phw.disconnect()
 
-                if timeout_limit == 0:
-                    # If the timeout limit reached zero, move on to the
-                    # next website.
-                    logging.info("Skip fuzzing of {website} after {max_timeouts} timeouts.".format(
-                        website=navscraper.ENTRY_URI,
-                        max_timeouts=cfg.TIMEOUT_LIMIT
-                    ))
-                    break
+            metrics_collector.count(
+                "pdfuzz_scans_total",
+                status="completed" if scan_successful else "failed",
+                **metric_labels
+            )
 
-                # Anti DDoS delay
-                logging.debug("Waiting for {sec} seconds before using the next fingerprint.".format(
-                    sec=cfg.ANTI_DDOS_DELAY_SECONDS))
-                time.sleep(cfg.ANTI_DDOS_DELAY_SECONDS)
+            # Record the state of the task in the scan ledger.
+            db_manager.write_task_status(
+                navscraper=navscraper.ENTRY_URI,
+                fingerprint_id=fingerprint["id"],
+                worker_country=phantom_wrapper_info["country"],
+                status=db_connection.TASK_STATUS_COMPLETED if scan_successful else db_connection.TASK_STATUS_FAILED,
+                attempts=retry_count + 1
+            )
+
+            if timeout_limits[navscraper_index] == 0:
+                # If the timeout limit reached zero, move on to the
+                # next website.
+                logging.info("Skip fuzzing of {website} after {max_timeouts} timeouts.".format(
+                    website=navscraper.ENTRY_URI,
+                    max_timeouts=cfg.TIMEOUT_LIMIT
+                ))
+                del task_sources[navscraper_index]
 
         # If the worker is finished, write it to the log and console.
         logging.debug("Shutdown worker {}".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
         print("Shutdown worker {}".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
+
+    except PDFuzzExceptions.WebDriverUnavailableException as e:
+
+        logging.error("Worker {name} stopped: {msg}".format(
+            name=get_worker_name(), msg=e))
+        print("Worker {name} stopped: {msg}".format(
+            name=get_worker_name(), msg=e))
 
     except:
 
         logging.exception("Processname: {name}".format(
-            name=multiprocessing.current_process().name))
+            name=get_worker_name()))
 
         logging.debug("Worker {} crashed".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
         print("Worker {} crashed".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
 
     finally:
 
         # close database connection.
         db_manager.close()
+
+        # Disconnect from PhantomJS WebDriver server.
+        phw.disconnect()
         return
 
 
-def get_chunks(the_list, num_of_sub_lists):
+def iter_tasks(task_sources, navscraper_hosts, rate_limiter, phantom_wrapper_info=None, health_monitor=None):
+    ##
+    #   Generator that yields the tasks of a worker. The next task is always
+    #   taken from the website whose host is available first, so that the
+    #   worker moves on to other websites while a host cools down. While the
+    #   webdriver server of the worker is unavailable, no task is taken, so
+    #   that the other workers of a VM take over the shared tasks.
+    #
+    #   @param {dict} task_sources - Iterators over fingerprints, stored by
+    #   the index of their NavScraper. Exhausted iterators are removed. The
+    #   caller may remove entries to skip a website.
+    #   @param {dict} navscraper_hosts - Host of the target website, stored
+    #   by the index of the NavScraper.
+    #   @param {ratelimiter.HostRateLimiter} rate_limiter - Rate limiter that
+    #   is shared by all workers.
+    #   @param {dict} phantom_wrapper_info - (optional) Information about the
+    #   webdriver server of the worker.
+    #   @param {healthmonitor.EndpointHealthMonitor} health_monitor -
+    #   (optional) Health monitor of the webdriver servers.
+    #
+    #   @return {tuple} (navscraper_index, fingerprint)
+    #
 
-    chunks = [[] for x in range(num_of_sub_lists)]
+    while len(task_sources) > 0:
+
+        if health_monitor is not None:
+            wait_for_restarted_webdriver(
+                phantom_wrapper_info=phantom_wrapper_info,
+                health_monitor=health_monitor
+            )
 
-    for index, item in enumerate(the_list):
-        chunks[index % num_of_sub_lists].append(item)
+        host = rate_limiter.choose(
+            [navscraper_hosts[index] for index in task_sources])
 
-    return chunks
+        navscraper_index = min(
+            index for index in task_sources if navscraper_hosts[index] == host)
 
+        try:
+            fingerprint = next(task_sources[navscraper_index])
 
-def vm_master(phantom_wrapper_set, navscraper_list, search_parameters_id, cl_settings, start_delay):
+        except StopIteration:
+            # All fingerprints of this website are done.
+            del task_sources[navscraper_index]
+            continue
+
+        yield navscraper_index, fingerprint
+
+
+def vm_master(phantom_wrapper_set, navscraper_list, search_parameters_id, cl_settings, rate_limiter, health_monitor, metrics_collector):
     ##
     #   The master starts a subprocess for each WebDriver instance that is
-    #   running on the VM.
+    #   running on the VM. The fingerprints of every NavScraper are put into
+    #   a shared task queue, so that every worker pulls the next task as soon
+    #   as it is idle.
     #
     #   @param {} phantom_wrapper_set - ...
     #   @param {list} navscraper_list - List that holds the instances of the
@@ -316,17 +690,18 @@ def vm_master(phantom_wrapper_set, navscraper_list, search_parameters_id, cl_set
     #   entry.
     #   @param {argparse.results} cl_settings - Object of parsed parameters from
     #   the commandline.
-    #   @param {int} start_delay - Number of seconds to wait befor starting the
-    #   worker sub-processes.
+    #   @param {ratelimiter.HostRateLimiter} rate_limiter - Rate limiter that
+    #   is shared by all workers.
+    #   @param {healthmonitor.EndpointHealthMonitor} health_monitor - Health
+    #   monitor of the webdriver servers.
+    #   @param {metrics.MetricsCollector} metrics_collector - Collector of
+    #   the live metrics.
     #
 
-    # Wait before starting to work.
-    time.sleep(start_delay)
-
     logging.debug("VM master: {} (started)".format(
-        multiprocessing.current_process().name))
+        get_worker_name()))
     print("VM master: {} (started)".format(
-        multiprocessing.current_process().name))
+        get_worker_name()))
 
     vm_worker_list = []
 
@@ -335,29 +710,27 @@ def vm_master(phantom_wrapper_set, navscraper_list, search_parameters_id, cl_set
         settings=cfg.MYSQL,
         mode="fuzzing_read",
         website_type=cl_settings.target_website_type,
-        result_table_name=cl_settings.result_table_name
+        run_name=cl_settings.result_table_name
     )
 
-    # Get all fingerprints from the database.
-    total_fingerprints = list(fpfuzzer.get_fingerprints(
-        db_manager=db_manager,
-        timezone_offset=phantom_wrapper_set[0]["timezone_offset"]
-    ))
-
-    # Close database connection.
-    db_manager.close()
+    # Tasks of this run that were completed before a restart.
+    completed_tasks = db_manager.get_completed_tasks(
+        worker_country=phantom_wrapper_set[0]["country"])
 
-    # Determine list of fingerprints for each worker.
-    list_of_fingerprint_lists = get_chunks(
-        the_list=total_fingerprints,
-        num_of_sub_lists=len(phantom_wrapper_set)
+    # Bounded task queues. The NavScrapers are referenced by their index in
+    # the navscraper list. They are filled after the workers are forked.
+    task_queues = create_task_queues(
+        navscraper_list=navscraper_list,
+        target_website_type=cl_settings.target_website_type
     )
 
-    for phantom_wrapper_index, phantom_wrapper_info in enumerate(phantom_wrapper_set):
-
-        time.sleep(start_delay + phantom_wrapper_index)
+    # Events to tell all workers of this VM that a website has to be skipped,
+    # because its timeout limit is reached.
+    skip_events = [multiprocessing.Event() for _ in navscraper_list]
 
-        fingerprint_sublist = list_of_fingerprint_lists[phantom_wrapper_index]
+    # The workers wait for their webdriver server before they take the
+    # first task.
+    for phantom_wrapper_index, phantom_wrapper_info in enumerate(phantom_wrapper_set):
 
         # Crate/Start a new process for every set of webdriver servers in the
         # list. The name of the process is the country of the geolocation.
@@ -366,26 +739,194 @@ def vm_master(phantom_wrapper_set, navscraper_list, search_parameters_id, cl_set
                 phantom_wrapper_info["country"], phantom_wrapper_index),
             target=inner_fuzzing_vm,
             args=(phantom_wrapper_info, navscraper_list,
-                  search_parameters_id, cl_settings, fingerprint_sublist,)
+                  search_parameters_id, cl_settings, task_queues, skip_events,
+                  rate_limiter, health_monitor, metrics_collector,)
         )
         vm_worker_list.append(process)
         process.start()
 
+    # Stream the fingerprints into the task queues while the workers consume
+    # them.
+    start_task_feeders(
+        task_queues=task_queues,
+        navscraper_list=navscraper_list,
+        load_fingerprints=lambda: fpfuzzer.load_fingerprints(
+            db_manager=db_manager,
+            timezone_offset=phantom_wrapper_set[0]["timezone_offset"]
+        ),
+        num_workers=len(phantom_wrapper_set),
+        skip_events=skip_events,
+        completed_tasks=completed_tasks
+    )
+
     # Waiting for all processes.
     for process in vm_worker_list:
         process.join()
 
+    # Close database connection.
+    db_manager.close()
+
+    # If workers crashed, tasks are left in the queues. Do not wait for them
+    # to be consumed on exit.
+    for task_queue in task_queues.values():
+        task_queue.cancel_join_thread()
+
     logging.debug("Shutdown VM master: {} (finished)".format(
-        multiprocessing.current_process().name))
+        get_worker_name()))
     print("Shutdown VM master: {} (finished)".format(
-        multiprocessing.current_process().name))
+        get_worker_name()))
+
+
+def create_task_queues(navscraper_list, target_website_type, queue_class=multiprocessing.Queue):
+    ##
+    #   Creates a bounded queue of fingerprints for every NavScraper with the
+    #   actual page type. Separate queues let the workers choose the website
+    #   whose host is available first. The queues are filled by
+    #   start_task_feeders().
+    #
+    #   @param {list} navscraper_list - List that holds the various NavScraper
+    #   classes.
+    #   @param {string} target_website_type - Type of the target websites.
+    #   @param {class} queue_class - (optional) Class of the queues. Default:
+    #   multiprocessing.Queue
+    #
+    #   @return {dict} Queues of fingerprints, stored by the index of their
+    #   NavScraper.
+    #
+
+    task_queues = {}
+
+    for navscraper_index, navscraper_class in enumerate(navscraper_list):
+
+        # Skip every NavScraper that does not have the actual page type.
+        if navscraper_class.PAGE_TYPE != target_website_type:
+            continue
+
+        task_queues[navscraper_index] = queue_class(maxsize=cfg.TASK_QUEUE_SIZE)
+
+    return task_queues
+
+
+def start_task_feeders(task_queues, navscraper_list, load_fingerprints, num_workers, skip_events, completed_tasks=set()):
+    ##
+    #   Starts a feeder thread for every task queue, which streams the
+    #   fingerprints into the queue while the workers consume it. Every
+    #   feeder reads the fingerprints on its own, so a queue never waits for
+    #   the workers of another website. A stop marker (None) is appended to
+    #   every queue for each worker. A feeder stops early, if its website is
+    #   skipped.
+    #
+    #   @param {dict} task_queues - Queues of create_task_queues().
+    #   @param {list} navscraper_list - List that holds the various NavScraper
+    #   classes.
+    #   @param {function} load_fingerprints - Returns a new iterator over the
+    #   fingerprints to scan.
+    #   @param {int} num_workers - Number of workers that consume the queues.
+    #   @param {list} skip_events - Events that are set if a website is
+    #   skipped, stored by the index of the NavScraper.
+    #   @param {set} completed_tasks - (optional) Tasks from the scan ledger
+    #   that are not queued again.
+    #
+    #   @return {list} Started threads.
+    #
+
+    feeder_threads = []
+
+    for navscraper_index, task_queue in task_queues.items():
+
+        thread = threading.Thread(
+            name="Task Feeder {0}".format(navscraper_list[navscraper_index].ENTRY_URI),
+            target=feed_task_queue,
+            args=(task_queue, navscraper_list[navscraper_index], load_fingerprints,
+                  num_workers, skip_events[navscraper_index], completed_tasks,)
+        )
+        thread.daemon = True
+        feeder_threads.append(thread)
+        thread.start()
+
+    return feeder_threads
+
+
+def feed_task_queue(task_queue, navscraper_class, load_fingerprints, num_workers, skip_event, completed_tasks):
+    ##
+    #   Streams the pending fingerprints of a NavScraper into its bounded
+    #   task queue. See start_task_feeders().
+    #
+
+    try:
+        for fingerprint in get_pending_fingerprints(
+                fingerprints=load_fingerprints(),
+                navscraper_class=navscraper_class,
+                completed_tasks=completed_tasks):
+
+            if not put_task(task_queue, fingerprint, skip_event):
+                return
+
+    except:
+        logging.exception("Feeding the tasks of {website} failed.".format(
+            website=navscraper_class.ENTRY_URI))
+
+    # One stop marker for each worker.
+    for _ in range(num_workers):
+        if not put_task(task_queue, None, skip_event):
+            return
+
+
+def put_task(task_queue, task, skip_event):
+    ##
+    #   Puts a task into a bounded queue. Waits while the queue is full, until
+    #   the website is skipped.
+    #
+    #   @return {bool} False, if the website was skipped.
+    #
+
+    while not skip_event.is_set():
+
+        try:
+            task_queue.put(task, timeout=1)
+            return True
+
+        except Queue.Full:
+            continue
 
+    return False
 
-def inner_fuzzing_vm(phantom_wrapper_info, navscraper_list, search_parameters_id, cl_settings, fingerprint_list):
+
+def get_pending_fingerprints(fingerprints, navscraper_class, completed_tasks):
+    ##
+    #   Filters the fingerprints whose task with the NavScraper was already
+    #   completed in this run.
+    #
+    #   @param {iterable} fingerprints - Fingerprints to scan.
+    #   @param {class} navscraper_class - Class of the NavScraper.
+    #   @param {set} completed_tasks - Set of (navscraper, fp_id) tuples from
+    #   the scan ledger.
+    #
+    #   @return {generator}
+    #
+
+    num_completed = len([
+        navscraper for navscraper, _ in completed_tasks
+        if navscraper == navscraper_class.ENTRY_URI
+    ])
+
+    if num_completed > 0:
+        logging.info("Resume {website}: {num} fingerprints already completed.".format(
+            website=navscraper_class.ENTRY_URI,
+            num=num_completed
+        ))
+
+    return (
+        fingerprint for fingerprint in fingerprints
+        if (navscraper_class.ENTRY_URI, fingerprint["id"]) not in completed_tasks
+    )
+
+
+def inner_fuzzing_vm(phantom_wrapper_info, navscraper_list, search_parameters_id, cl_settings, task_queues, skip_events, rate_limiter, health_monitor, metrics_collector):
     ##
     #   Main fuzzing routine that can be started in multiple threads/processes.
-    #   It iterates over the several variables (NavScrapers, Fingerprints),
-    #   gets the data from the websites and stores it in the database.
+    #   It pulls (NavScraper, fingerprint) tasks from the shared queues of the
+    #   VM, gets the data from the websites and stores it in the database.
     #
     #   @param {} phantom_wrapper_info - ...
     #   @param {list} navscraper_list - List that holds the instances of the
@@ -394,7 +935,16 @@ def inner_fuzzing_vm(phantom_wrapper_info, navscraper_list, search_parameters_id
     #   parameters entry.
     #   @param {argparse.results} cl_settings - Object of parsed parameters
     #   from the commandline.
-    #   @param {list} fingerprint_list - List of fingerprints to scan.
+    #   @param {dict} task_queues - Shared queues of fingerprints, stored by
+    #   the index of their NavScraper.
+    #   @param {list} skip_events - List of multiprocessing.Event objects, one
+    #   for each NavScraper. A set event marks the website as skipped.
+    #   @param {ratelimiter.HostRateLimiter} rate_limiter - Rate limiter that
+    #   is shared by all workers.
+    #   @param {healthmonitor.EndpointHealthMonitor} health_monitor - Health
+    #   monitor of the webdriver servers.
+    #   @param {metrics.MetricsCollector} metrics_collector - Collector of
+    #   the live metrics.
     #
 
     # Store the type of the target websites in a local variable.
@@ -411,6 +961,21 @@ def inner_fuzzing_vm(phantom_wrapper_info, navscraper_list, search_parameters_id
     else:
         proxy_address = None
 
+    # Determine the input parameters for the navigation of the
+    # NavScraper
+    navigation_search_parameters = \
+        cfg.SEARCH_PARAMETERS.get(target_website_type, {})
+
+    # NavScraper instances and timeout limits of this worker, stored by the
+    # index of the NavScraper.
+    navscrapers = {}
+    timeout_limits = {}
+
+    # Recorder of the pages for the offline replay.
+    recorder = None
+    if cfg.RECORD_DIR is not None:
+        recorder = replay.PageRecorder(record_dir=cfg.RECORD_DIR, worker_name=get_worker_name())
+
     try:
 
         # Get phantomwrapper object
@@ -421,54 +986,83 @@ def inner_fuzzing_vm(phantom_wrapper_info, navscraper_list, search_parameters_id
             settings=cfg.MYSQL,
             mode="fuzzing_write",
             website_type=target_website_type,
-            result_table_name=cl_settings.result_table_name
+            run_name=cl_settings.result_table_name
         )
 
-        # Iterate over navscrapers.
-        # Means that this iterated also over the target websites.
-        for navscraper_class in navscraper_list:
-
-            # Skip every NavScraper that does not have the actual page type.
-            if navscraper_class.PAGE_TYPE != target_website_type:
+        # Every queue is read until its stop marker is reached.
+        task_sources = {}
+        navscraper_hosts = {}
+        for navscraper_index, task_queue in task_queues.items():
+            task_sources[navscraper_index] = iter(task_queue.get, None)
+            navscraper_hosts[navscraper_index] = \
+                ratelimiter.get_host(navscraper_list[navscraper_index].ENTRY_URI)
+
+        # Iterate over all tasks. While the host of one website cools down,
+        # the tasks of the other websites are processed.
+        for navscraper_index, fingerprint in iter_tasks(
+                task_sources=task_sources,
+                navscraper_hosts=navscraper_hosts,
+                rate_limiter=rate_limiter,
+                phantom_wrapper_info=phantom_wrapper_info,
+                health_monitor=health_monitor):
+
+            # Skip the website, if it was skipped by any worker.
+            if skip_events[navscraper_index].is_set():
+                del task_sources[navscraper_index]
                 continue
 
-            # Get a new instance of the current NavScraper.
-            navscraper = navscraper_class()
+            if navscraper_index not in navscrapers:
+                # Get a new instance of the current NavScraper.
+                navscrapers[navscraper_index] = navscraper_list[navscraper_index]()
+                logging.info("Testing: {0}".format(
+                    navscrapers[navscraper_index].ENTRY_URI))
 
-            logging.info("Testing: {0}".format(navscraper.ENTRY_URI))
+                # Get the initial timeout limit from the config file.
+                timeout_limits[navscraper_index] = cfg.TIMEOUT_LIMIT
 
-            # Get the initial timeout limit from the config file.
-            timeout_limit = cfg.TIMEOUT_LIMIT
+            navscraper = navscrapers[navscraper_index]
 
-            # Determine the input parameters for the navigation of the
-            # NavScraper
-            navigation_search_parameters = \
-                cfg.SEARCH_PARAMETERS.get(target_website_type, {})
+            # Labels of the metrics of this task.
+            metric_labels = {
+                "site": navscraper.ENTRY_URI,
+                "country": phantom_wrapper_info["country"],
+            }
 
-            # Iterate over all fingerprints that are to be tested.
-            for fingerprint in fingerprint_list:
+            scan_successful = False
+            timeout_occurred = False
+            retry_count = 0
+            network_error_count = 0
+            while not scan_successful:
 
-                scan_successful = False
-                timeout_occurred = False
-                retry_count = 0
-                while not scan_successful:
+                # Anti DDoS delay
+                rate_limiter.wait(navscraper_hosts[navscraper_index])
+
+                Timing.start_scan(
+                    worker=get_worker_name(),
+                    country=phantom_wrapper_info["country"],
+                    site=navscraper.ENTRY_URI,
+                    fp_id=fingerprint["id"],
+                    attempt=retry_count + network_error_count + 1
+                )
 
-                    try:
-                        # Run the navigation and scraping routine of the
-                        # current NavScraper with the actual fingerprint.
-                        results = gather_information_with_fingerprint(
-                            navscraper=navscraper,
-                            fingerprint=fingerprint,
-                            phw=phw,
-                            navigation_search_parameters=navigation_search_parameters
-                        )
+                try:
+                    # Run the navigation and scraping routine of the
+                    # current NavScraper with the actual fingerprint.
+                    results = gather_information_with_fingerprint(
+                        navscraper=navscraper,
+                        fingerprint=fingerprint,
+                        phw=phw,
+                        navigation_search_parameters=navigation_search_parameters,
+                        recorder=recorder
+                    )
 
-                        # Save results in database.
+                    # Save results in database.
+                    with Timing.span("store"):
                         store_results(
                             db_manager=db_manager,
                             results=results,
                             worker_info={
-                                "name": multiprocessing.current_process().name.split(" ")[0],
+                                "name": get_worker_name().split(" ")[0],
                                 "timezone_offset": phantom_wrapper_info["timezone_offset"],
                                 "proxy_address": proxy_address,
                             },
@@ -477,90 +1071,168 @@ def inner_fuzzing_vm(phantom_wrapper_info, navscraper_list, search_parameters_id
                             search_parameters_id=search_parameters_id
                         )
 
-                        # Mark scan with current FP as successful.
-                        scan_successful = True
+                    metrics_collector.count("pdfuzz_rows_written_total", value=len(results), **metric_labels)
 
-                        # Reset timeout limit.
-                        timeout_limit = cfg.TIMEOUT_LIMIT
+                    # Mark scan with current FP as successful.
+                    scan_successful = True
 
-                    except PDFuzzExceptions.NavScraperException as e:
+                    # Reset timeout limit.
+                    timeout_limits[navscraper_index] = cfg.TIMEOUT_LIMIT
 
-                        if retry_count == cfg.FP_RETRY:
-                            log_scan_not_completed_error(
-                                driver=phw.get_driver(),
-                                exception=e
-                            )
-                            break
+                except PDFuzzExceptions.NavScraperException as e:
 
-                        # Increment the retry counter.
-                        retry_count += 1
-                        print("# {retry_count}. retry for {website} with FP {fp_id}".format(
-                            retry_count=retry_count,
-                            website=navscraper.ENTRY_URI,
-                            fp_id=fingerprint["id"]
-                        ))
-                        logging.info("{retry_count}. retry for {website} with FP {fp_id}".format(
-                            retry_count=retry_count,
-                            website=navscraper.ENTRY_URI,
-                            fp_id=fingerprint["id"]
-                        ))
+                    metrics_collector.count("pdfuzz_scan_errors_total", error=type(e).__name__, **metric_labels)
+
+                    if isinstance(e, PDFuzzExceptions.NetworkErrorException) and \
+                            network_error_count < cfg.FP_RETRY:
+                        # The webdriver server failed, not the website. Wait
+                        # for the restart without counting a retry.
+                        network_error_count += 1
+                        wait_for_restarted_webdriver(
+                            phantom_wrapper_info=phantom_wrapper_info,
+                            health_monitor=health_monitor,
+                            report_failure=True
+                        )
+                        continue
+
+                    if retry_count == cfg.FP_RETRY:
+                        log_scan_not_completed_error(
+                            driver=phw.get_driver(),
+                            exception=e
+                        )
+                        break
+
+                    # Increment the retry counter.
+                    retry_count += 1
+                    metrics_collector.count("pdfuzz_retries_total", **metric_labels)
+                    print("# {retry_count}. retry for {website} with FP {fp_id}".format(
+                        retry_count=retry_count,
+                        website=navscraper.ENTRY_URI,
+                        fp_id=fingerprint["id"]
+                    ))
+                    logging.info("{retry_count}. retry for {website} with FP {fp_id}".format(
+                        retry_count=retry_count,
+                        website=navscraper.ENTRY_URI,
+                        fp_id=fingerprint["id"]
+                    ))
+
+                except PDFuzzExceptions.PageLoadTimeoutException as e:
 
-                    except PDFuzzExceptions.PageLoadTimeoutException as e:
+                    metrics_collector.count("pdfuzz_scan_errors_total", error=type(e).__name__, **metric_labels)
 
-                        if retry_count == cfg.FP_RETRY:
-                            break
+                    if retry_count == cfg.FP_RETRY:
+                        break
 
-                        # Increment the retry counter.
-                        retry_count += 1
+                    # Increment the retry counter.
+                    retry_count += 1
+                    metrics_collector.count("pdfuzz_retries_total", **metric_labels)
 
-                        if timeout_limit > 0 and not timeout_occurred:
-                            timeout_limit -= 1
-                            timeout_occurred = True
-                            logging.info("{timeout_limit} timouts remaining for {website}".format(
-                                timeout_limit=timeout_limit,
-                                website=navscraper.ENTRY_URI
-                            ))
+                    if timeout_limits[navscraper_index] > 0 and not timeout_occurred:
+                        timeout_limits[navscraper_index] -= 1
+                        timeout_occurred = True
+                        logging.info("{timeout_limit} timouts remaining for {website}".format(
+                            timeout_limit=timeout_limits[navscraper_index],
+                            website=navscraper.ENTRY_URI
+                        ))
+
+                finally:
+                    Timing.finish_scan(status="completed" if scan_successful else "failed")
 
-                    finally:
-                        # Disconnect from PhantomJS WebDriver server.
+                    if scan_successful:
+                        # Keep the session for the next fingerprint.
+                        phw.release()
+                    else:
+                        # Recycle the session after an error.
                         phw.disconnect()
 
-                if timeout_limit == 0:
-                    # If the timeout limit reached zero, move on to the
-                    # next website.
-                    logging.info("Skip fuzzing of {website} after {max_timeouts} timeouts.".format(
-                        website=navscraper.ENTRY_URI,
-                        max_timeouts=cfg.TIMEOUT_LIMIT
-                    ))
-                    break
+            metrics_collector.count(
+                "pdfuzz_scans_total",
+                status="completed" if scan_successful else "failed",
+                **metric_labels
+            )
 
-                # Anti DDoS delay
-                logging.debug("Waiting for {sec} seconds before using the next fingerprint.".format(
-                    sec=cfg.ANTI_DDOS_DELAY_SECONDS))
-                time.sleep(cfg.ANTI_DDOS_DELAY_SECONDS)
+            # Record the state of the task in the scan ledger.
+            db_manager.write_task_status(
+                navscraper=navscraper.ENTRY_URI,
+                fingerprint_id=fingerprint["id"],
+                worker_country=phantom_wrapper_info["country"],
+                status=db_connection.TASK_STATUS_COMPLETED if scan_successful else db_connection.TASK_STATUS_FAILED,
+                attempts=retry_count + 1
+            )
+
+            if timeout_limits[navscraper_index] == 0:
+                # If the timeout limit reached zero, tell all workers of
+                # this VM to move on to the next website.
+                logging.info("Skip fuzzing of {website} after {max_timeouts} timeouts.".format(
+                    website=navscraper.ENTRY_URI,
+                    max_timeouts=cfg.TIMEOUT_LIMIT
+                ))
+                skip_events[navscraper_index].set()
+                del task_sources[navscraper_index]
 
         # If the worker is finished, write it to the log and console.
         logging.debug("Shutdown worker {}".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
         print("Shutdown worker {}".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
+
+    except PDFuzzExceptions.WebDriverUnavailableException as e:
+
+        logging.error("Worker {name} stopped: {msg}".format(
+            name=get_worker_name(), msg=e))
+        print("Worker {name} stopped: {msg}".format(
+            name=get_worker_name(), msg=e))
 
     except:
 
         logging.exception("Processname: {name}".format(
-            name=multiprocessing.current_process().name))
+            name=get_worker_name()))
 
         logging.debug("Worker {} crashed".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
         print("Worker {} crashed".format(
-            multiprocessing.current_process().name))
+            get_worker_name()))
 
     finally:
 
         # close database connection.
         db_manager.close()
+
+        # Disconnect from PhantomJS WebDriver server.
+        phw.disconnect()
+        return
+
+
+def wait_for_restarted_webdriver(phantom_wrapper_info, health_monitor, report_failure=False):
+    ##
+    #   Waits until the health monitor marks the webdriver server of the
+    #   worker as available.
+    #
+    #   @param {dict} phantom_wrapper_info - Information about the webdriver
+    #   server of the worker.
+    #   @param {healthmonitor.EndpointHealthMonitor} health_monitor - Health
+    #   monitor of the webdriver servers.
+    #   @param {bool} report_failure - (optional) Report a network error of
+    #   the worker before, so that the server is probed at once.
+    #
+
+    ip = phantom_wrapper_info["ip"]
+    port = phantom_wrapper_info["port"]
+
+    if report_failure:
+        health_monitor.report_failure(ip, port)
+
+    if health_monitor.is_available(ip, port):
         return
 
+    logging.info("Worker {name} waits for WebDriver {ip}:{port}.".format(
+        name=get_worker_name(), ip=ip, port=port))
+
+    if not health_monitor.wait_until_available(ip, port):
+        raise PDFuzzExceptions.WebDriverUnavailableException(
+            "WebDriver {ip}:{port} failed.".format(ip=ip, port=port)
+        )
+
 
 def error_log(driver, target_website, country, fingerprint_id, error_msg="NO_RESULTS"):
 
@@ -582,11 +1254,20 @@ def error_log(driver, target_website, country, fingerprint_id, error_msg="NO_RES
     logging.error(driver.page_source)
 
 
-def connect_to_phantomjs(phw, fingerprint):
+def connect_to_phantomjs(phw, fingerprint, page_scripts=()):
 
     # Get desired_capabilities version of fingerprint.
     dcap = fpfuzzer.create_dcap(fingerprint=fingerprint)
 
+    # The page scripts are injected into every document before the code of
+    # the fingerprint.
+    page_scripts = [script for script in page_scripts if script]
+    if len(page_scripts) > 0:
+        dcap = fpfuzzer.set_onInitialized_jsInject_code(
+            dcap=dcap,
+            jsInject_code="".join(page_scripts) + (dcap.get("phantomjs.page.onInitialized.jsInject") or "")
+        )
+
     # Connect to WebDriver with specific dcap profile.
     phw.connect(dcap=dcap)
 
@@ -597,7 +1278,7 @@ def load_website(phw, uri, fp_id):
     print("# Load page '{url}' with FP {fp_id} from {country}".format(
         url=uri,
         fp_id=fp_id,
-        country=multiprocessing.current_process().name
+        country=get_worker_name()
     ))
     logging.info("# Load page '{url}' with FP {fp_id}".format(
         url=uri,
@@ -619,7 +1300,7 @@ def navscraper_navigation(navscraper, phw, search_parameters, fingerprint):
     print("# NavScraper Navigation - {url} with FP {fp_id} from {country}".format(
         url=navscraper.ENTRY_URI,
         fp_id=fingerprint["id"],
-        country=multiprocessing.current_process().name
+        country=get_worker_name()
     ))
     logging.info(
         "# NavScraper Navigation - {}".format(navscraper.ENTRY_URI))
@@ -653,7 +1334,7 @@ def navscraper_scraping(navscraper, phw, fingerprint):
     print("# Scraping - {url} with FP {fp_id} from {country}".format(
         url=navscraper.ENTRY_URI,
         fp_id=fingerprint["id"],
-        country=multiprocessing.current_process().name
+        country=get_worker_name()
     ))
     logging.info("# Scraping")
 
@@ -668,7 +1349,7 @@ def navscraper_scraping(navscraper, phw, fingerprint):
             raise PDFuzzExceptions.NoResultsException(
                 message="No Results found",
                 target_website=navscraper.ENTRY_URI,
-                country=multiprocessing.current_process().name,
+                country=get_worker_name(),
                 fp_id=fingerprint["id"]
             )
 
@@ -679,7 +1360,7 @@ def navscraper_scraping(navscraper, phw, fingerprint):
                 raise PDFuzzExceptions.SmallResultsException(
                     message="Small Set of Results",
                     target_website=navscraper.ENTRY_URI,
-                    country=multiprocessing.current_process().name,
+                    country=get_worker_name(),
                     fp_id=fingerprint["id"]
                 )
 
@@ -694,7 +1375,7 @@ def navscraper_scraping(navscraper, phw, fingerprint):
         raise PDFuzzExceptions.ScrapingErrorException(
             message="Scraping error",
             target_website=navscraper.ENTRY_URI,
-            country=multiprocessing.current_process().name,
+            country=get_worker_name(),
             fp_id=fingerprint["id"]
         )
 
@@ -707,7 +1388,7 @@ def store_results(db_manager, results, worker_info, fp_id, target_website, searc
     print("# Saving data - {url} with FP {fp_id} from {country}".format(
         url=target_website,
         fp_id=fp_id,
-        country=multiprocessing.current_process().name
+        country=get_worker_name()
     ))
     logging.info("# Saving data")
 
@@ -720,22 +1401,51 @@ def store_results(db_manager, results, worker_info, fp_id, target_website, searc
     )
 
 
-def gather_information_with_fingerprint(navscraper, fingerprint, phw, navigation_search_parameters):
+def gather_information_with_fingerprint(navscraper, fingerprint, phw, navigation_search_parameters, recorder=None):
+    ##
+    #   Runs all stages of a scan with a fingerprint.
+    #
+    #   @param {NavScraper} navscraper - NavScraper of the target website.
+    #   @param {dict} fingerprint - Fingerprint to scan with.
+    #   @param {PhantomWrapper} phw - Wrapper of the webdriver server.
+    #   @param {dict} navigation_search_parameters - Input values for the
+    #   navigation.
+    #   @param {replay.PageRecorder} recorder - (optional) Recorder that
+    #   saves the page of every stage.
+    #
+    #   @return {list} Scraped rows.
+    #
+
+    # The network monitor counts the requests of every document from its
+    # start, so the waits of the NavScrapers see the requests of the actions
+    # before them.
+    page_scripts = [MyEC.NETWORK_MONITOR_INSTALL_SCRIPT]
+
+    if recorder is not None:
+        recorder.start(
+            navscraper=navscraper,
+            fingerprint_id=fingerprint["id"],
+            search_parameters=navigation_search_parameters
+        )
+        page_scripts.append(recorder.get_page_script())
 
     try:
         # Create injection code and connect to PhantomJS using the
         # injection code to manipulate the fingerprint.
-        connect_to_phantomjs(
-            phw=phw,
-            fingerprint=fingerprint
-        )
+        with Timing.span("connect"):
+            connect_to_phantomjs(
+                phw=phw,
+                fingerprint=fingerprint,
+                page_scripts=page_scripts
+            )
 
         # Load the current target website.
-        loading_status = load_website(
-            phw=phw,
-            uri=navscraper.ENTRY_URI,
-            fp_id=fingerprint["id"]
-        )
+        with Timing.span("load"):
+            loading_status = load_website(
+                phw=phw,
+                uri=navscraper.ENTRY_URI,
+                fp_id=fingerprint["id"]
+            )
 
         if not loading_status:
             # If the page cannot be loaded in the defined time.
@@ -746,36 +1456,57 @@ def gather_information_with_fingerprint(navscraper, fingerprint, phw, navigation
             )
 
         else:
+            if recorder is not None:
+                recorder.record_step(driver=phw.get_driver(), step="entry")
+
             # Use the NavScraper to navigate to the result page.
-            nav_status = navscraper_navigation(
-                navscraper=navscraper,
-                phw=phw,
-                search_parameters=navigation_search_parameters,
-                fingerprint=fingerprint
-            )
+            try:
+                with Timing.span("navigation"):
+                    nav_status = navscraper_navigation(
+                        navscraper=navscraper,
+                        phw=phw,
+                        search_parameters=navigation_search_parameters,
+                        fingerprint=fingerprint
+                    )
+
+            finally:
+                # The navigation may have left the origin of the entry page.
+                phw.add_current_origin()
 
             if not nav_status:
                 raise PDFuzzExceptions.NavigationFailedException(
                     message="No Results found",
                     target_website=navscraper.ENTRY_URI,
-                    country=multiprocessing.current_process().name,
+                    country=get_worker_name(),
                     fp_id=fingerprint["id"]
                 )
 
             else:
+                if recorder is not None:
+                    recorder.record_step(driver=phw.get_driver(), step="results")
+
                 # Use NavScraper to read out the information from
                 # the result page.
-                results = navscraper_scraping(
-                    navscraper=navscraper,
-                    phw=phw,
-                    fingerprint=fingerprint
-                )
+                try:
+                    with Timing.span("scraping"):
+                        results = navscraper_scraping(
+                            navscraper=navscraper,
+                            phw=phw,
+                            fingerprint=fingerprint
+                        )
+
+                finally:
+                    phw.add_current_origin()
+
+                if recorder is not None:
+                    recorder.record_step(driver=phw.get_driver(), step="scraped")
+                    recorder.finish(rows=results)
 
                 if results is None:
                     raise PDFuzzExceptions.NoResultsException(
                         message="No Results found",
                         target_website=navscraper.ENTRY_URI,
-                        country=multiprocessing.current_process().name,
+                        country=get_worker_name(),
                         fp_id=fingerprint["id"]
                     )
 
@@ -783,21 +1514,43 @@ def gather_information_with_fingerprint(navscraper, fingerprint, phw, navigation
 
     except urllib2.URLError as e:
 
-        logging.warning("Restarting WebDriver after crash.")
+        logging.warning("Connection to the WebDriver failed.")
         raise PDFuzzExceptions.NetworkErrorException(
             message=str(e),
             target_website=navscraper.ENTRY_URI,
-            country=multiprocessing.current_process().name,
+            country=get_worker_name(),
             fp_id=fingerprint["id"]
         )
 
 
 def log_scan_not_completed_error(driver, exception):
+    ##
+    #   Logs a scan that failed after all retries with a screenshot and the
+    #   page source. After network errors the webdriver server may be dead
+    #   and after a failed connect there is no driver, so only the error
+    #   itself is logged.
+    #
+    #   @param {selenium.webdriver} driver - Driver of the worker. Can be None.
+    #   @param {Exception} exception - Last exception of the scan.
+    #
 
-    error_log(
-        driver=driver,
-        target_website=exception.target_website,
+    if driver is not None and \
+            not isinstance(exception, PDFuzzExceptions.NetworkErrorException):
+        try:
+            error_log(
+                driver=driver,
+                target_website=exception.target_website,
+                country=exception.country,
+                fingerprint_id=exception.fp_id,
+                error_msg=exception.error_msg
+            )
+            return
+
+        except (urllib2.URLError, socket.error, httplib.HTTPException):
+            logging.warning("The WebDriver is not reachable for the error log.")
+
+    logging.error("{error_description} on {website} for ({country}, FP_ID({fp_id}))".format(
+        website=exception.target_website,
         country=exception.country,
-        fingerprint_id=exception.fp_id,
-        error_msg=exception.error_msg
-    )
+        fp_id=exception.fp_id,
+        error_description=exception.error_msg))
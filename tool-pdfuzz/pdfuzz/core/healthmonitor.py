@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module contains the health monitor of the webdriver servers. The
+#   monitor runs as a thread in the main process and probes the /status URL
+#   of every endpoint. At the start of a run, all endpoints are polled in
+#   parallel until they are ready. Dead endpoints are taken out of scheduling
+#   and restarted by a restart hook. Every restart runs in a thread of its
+#   own, so that the monitor keeps probing the other endpoints. The states of the endpoints live in shared
+#   memory, so that all worker processes see them.
+#
+#   @date   18.10.2026
+#
+
+import time
+import socket
+import httplib
+import logging
+import threading
+import urllib2
+import multiprocessing
+
+
+# States of an endpoint.
+ENDPOINT_HEALTHY = 0
+# A worker reported an error. The endpoint is probed at once.
+ENDPOINT_SUSPECT = 1
+# The endpoint does not answer. It is restarted in the next round.
+ENDPOINT_DEAD = 2
+# The endpoint was launched and did not answer yet.
+ENDPOINT_STARTING = 3
+# The endpoint is being restarted.
+ENDPOINT_RESTARTING = 4
+# The endpoint did not come back after the maximal number of restarts or the
+# monitor was stopped. Its workers stop.
+ENDPOINT_FAILED = 5
+
+# Seconds between two checks of the states by waiting workers and by the
+# monitor thread.
+POLL_INTERVAL = 0.5
+
+# Seconds between the probes of an endpoint that is not ready yet. The delay
+# is doubled after every probe up to the maximum.
+MIN_PROBE_BACKOFF = 0.1
+MAX_PROBE_BACKOFF = 2.0
+
+
+def probe_endpoint(ip, port, timeout=5):
+    ##
+    #   Requests the /status URL of a webdriver server. PhantomJS and
+    #   chromedriver both answer it without a session.
+    #
+    #   @param {string} ip - IP of the webdriver server.
+    #   @param {int} port - Port of the webdriver server.
+    #   @param {int} timeout - (optional) Seconds to wait for the answer.
+    #
+    #   @return {bool} True, if the server answered.
+    #
+
+    try:
+        response = urllib2.urlopen(
+            "http://{ip}:{port}/status".format(ip=ip, port=port),
+            timeout=timeout
+        )
+        response.read()
+
+        return response.getcode() == 200
+
+    except (urllib2.URLError, socket.error, httplib.HTTPException):
+        return False
+
+
+def wait_for_endpoint(ip, port, timeout, probe_timeout=5, stop_event=None):
+    ##
+    #   Probes a webdriver server with exponential backoff until it answers.
+    #
+    #   @param {string} ip - IP of the webdriver server.
+    #   @param {int} port - Port of the webdriver server.
+    #   @param {int} timeout - Maximal number of seconds to wait.
+    #   @param {int} probe_timeout - (optional) Seconds to wait for the
+    #   answer of a single probe.
+    #   @param {threading.Event} stop_event - (optional) Event to cancel the
+    #   waiting.
+    #
+    #   @return {bool} True, if the server answered in time.
+    #
+
+    end_time = time.time() + timeout
+    backoff = MIN_PROBE_BACKOFF
+
+    while True:
+
+        remaining = end_time - time.time()
+
+        if probe_endpoint(ip=ip, port=port, timeout=max(0.1, min(probe_timeout, remaining))):
+            return True
+
+        remaining = end_time - time.time()
+        if remaining <= 0:
+            return False
+
+        delay = min(backoff, remaining)
+        if stop_event is None:
+            time.sleep(delay)
+        elif stop_event.wait(delay):
+            return False
+
+        backoff = min(backoff * 2, MAX_PROBE_BACKOFF)
+
+
+class EndpointHealthMonitor:
+    ##
+    #   EndpointHealthMonitor keeps track of the states of the webdriver
+    #   servers. The object has to be created before the worker processes are
+    #   forked. The monitor thread should be started after the worker
+    #   processes are forked.
+    #
+
+    def __init__(self, phantom_wrapper_infos, restart_hook, probe_interval=10, probe_timeout=5, max_probe_failures=2, restart_timeout=120, max_restarts=3, startup_timeout=60):
+        ##
+        #
+        #   @param {list} phantom_wrapper_infos - Information about all
+        #   webdriver servers that are monitored.
+        #   @param {function} restart_hook - Function that is called with the
+        #   information of a dead webdriver server to restart it.
+        #   @param {int} probe_interval - (optional) Seconds between two
+        #   probes of a healthy endpoint.
+        #   @param {int} probe_timeout - (optional) Seconds to wait for the
+        #   answer of a probe.
+        #   @param {int} max_probe_failures - (optional) Number of failed
+        #   probes in a row after which a healthy endpoint is restarted.
+        #   @param {int} restart_timeout - (optional) Seconds to wait for an
+        #   endpoint to answer after a restart.
+        #   @param {int} max_restarts - (optional) Number of failed restarts
+        #   in a row after which an endpoint is given up.
+        #   @param {int} startup_timeout - (optional) Seconds to wait for all
+        #   endpoints to answer at the start of the run.
+        #
+
+        self.phantom_wrapper_infos = list(phantom_wrapper_infos)
+        self.endpoints = [
+            (phantom_wrapper_info["ip"], phantom_wrapper_info["port"])
+            for phantom_wrapper_info in self.phantom_wrapper_infos
+        ]
+
+        self.restart_hook = restart_hook
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.max_probe_failures = max_probe_failures
+        self.restart_timeout = restart_timeout
+        self.max_restarts = max_restarts
+        self.startup_timeout = startup_timeout
+
+        self.states = multiprocessing.RawArray("i", [ENDPOINT_STARTING] * len(self.endpoints))
+        self.lock = multiprocessing.Lock()
+
+        # Only used by the monitor thread and the restart thread of an
+        # endpoint, which owns it while the endpoint is restarting.
+        self.probe_failures = [0] * len(self.endpoints)
+        self.restart_failures = [0] * len(self.endpoints)
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _get_index(self, ip, port):
+        return self.endpoints.index((ip, port))
+
+    def get_state(self, ip, port):
+        ##
+        #   Returns the state of an endpoint.
+        #
+        #   @param {string} ip - IP of the webdriver server.
+        #   @param {int} port - Port of the webdriver server.
+        #
+        #   @return {int} One of the ENDPOINT_* states.
+        #
+
+        endpoint_index = self._get_index(ip, port)
+
+        with self.lock:
+            return self.states[endpoint_index]
+
+    def _set_state(self, endpoint_index, state):
+
+        with self.lock:
+            self.states[endpoint_index] = state
+
+    def is_available(self, ip, port):
+        ##
+        #   Checks whether new tasks may be scheduled on an endpoint.
+        #
+        #   @param {string} ip - IP of the webdriver server.
+        #   @param {int} port - Port of the webdriver server.
+        #
+        #   @return {bool}
+        #
+
+        return self.get_state(ip, port) == ENDPOINT_HEALTHY
+
+    def report_failure(self, ip, port):
+        ##
+        #   Called by a worker after a network error. The endpoint is taken
+        #   out of scheduling until the monitor has probed it.
+        #
+        #   @param {string} ip - IP of the webdriver server.
+        #   @param {int} port - Port of the webdriver server.
+        #
+
+        endpoint_index = self._get_index(ip, port)
+
+        with self.lock:
+            if self.states[endpoint_index] == ENDPOINT_HEALTHY:
+                self.states[endpoint_index] = ENDPOINT_SUSPECT
+
+    def wait_until_available(self, ip, port):
+        ##
+        #   Blocks until new tasks may be scheduled on an endpoint. The worker
+        #   keeps waiting while the endpoint is starting or restarted, however
+        #   long it takes. It only gives up, if the monitor gave up the
+        #   endpoint (see max_restarts) or was stopped.
+        #
+        #   @param {string} ip - IP of the webdriver server.
+        #   @param {int} port - Port of the webdriver server.
+        #
+        #   @return {bool} False, if the endpoint failed for good.
+        #
+
+        while True:
+
+            state = self.get_state(ip, port)
+
+            if state == ENDPOINT_HEALTHY:
+                return True
+
+            if state == ENDPOINT_FAILED:
+                return False
+
+            time.sleep(POLL_INTERVAL)
+
+    def start(self):
+        ##
+        #   Starts the monitor thread.
+        #
+
+        self.thread = threading.Thread(name="Health Monitor", target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        ##
+        #   Stops the monitor thread. No endpoint is restarted afterwards and
+        #   all endpoints that are not healthy are marked as failed, so that
+        #   no worker waits for them anymore.
+        #
+
+        self.stop_event.set()
+
+        if self.thread is not None:
+            self.thread.join()
+
+        with self.lock:
+            for endpoint_index in range(len(self.endpoints)):
+                if self.states[endpoint_index] != ENDPOINT_HEALTHY:
+                    self.states[endpoint_index] = ENDPOINT_FAILED
+
+    def _wait_for_startup(self):
+        ##
+        #   Polls all starting endpoints in parallel. Every endpoint is
+        #   marked as healthy as soon as it answers, so that its worker can
+        #   start. Endpoints that do not answer before the deadline are
+        #   marked as dead and restarted by the monitor loop.
+        #
+
+        def wait_for_startup_of_endpoint(endpoint_index):
+
+            ip, port = self.endpoints[endpoint_index]
+
+            if wait_for_endpoint(ip=ip, port=port, timeout=self.startup_timeout,
+                                 probe_timeout=self.probe_timeout, stop_event=self.stop_event):
+                logging.debug("WebDriver {ip}:{port} is ready.".format(ip=ip, port=port))
+                self._set_state(endpoint_index, ENDPOINT_HEALTHY)
+
+        start_time = time.time()
+
+        probe_threads = []
+        for endpoint_index in range(len(self.endpoints)):
+
+            thread = threading.Thread(
+                name="Startup Probe {0}:{1}".format(*self.endpoints[endpoint_index]),
+                target=wait_for_startup_of_endpoint,
+                args=(endpoint_index,)
+            )
+            thread.daemon = True
+            probe_threads.append(thread)
+            thread.start()
+
+        for thread in probe_threads:
+            thread.join()
+
+        num_dead = 0
+        for endpoint_index, (ip, port) in enumerate(self.endpoints):
+
+            with self.lock:
+                if self.states[endpoint_index] != ENDPOINT_STARTING:
+                    continue
+
+                self.states[endpoint_index] = ENDPOINT_DEAD
+
+            num_dead += 1
+            logging.warning("WebDriver {ip}:{port} did not start within {sec} seconds.".format(
+                ip=ip, port=port, sec=self.startup_timeout))
+
+        print("[**] {num} WebDriver Server ready after {sec:.1f} seconds".format(
+            num=len(self.endpoints) - num_dead, sec=time.time() - start_time))
+        logging.info("{num} WebDriver Server ready after {sec:.1f} seconds".format(
+            num=len(self.endpoints) - num_dead, sec=time.time() - start_time))
+
+    def _run(self):
+
+        self._wait_for_startup()
+
+        next_probes = [0.0] * len(self.endpoints)
+
+        while not self.stop_event.is_set():
+
+            for endpoint_index in range(len(self.endpoints)):
+
+                if self.stop_event.is_set():
+                    break
+
+                with self.lock:
+                    state = self.states[endpoint_index]
+
+                # Restarting endpoints are handled by their restart thread,
+                # failed endpoints are given up.
+                if state in (ENDPOINT_RESTARTING, ENDPOINT_FAILED):
+                    continue
+
+                # Healthy endpoints are probed in intervals, all others
+                # at once.
+                if state == ENDPOINT_HEALTHY and time.time() < next_probes[endpoint_index]:
+                    continue
+
+                self.check_endpoint(endpoint_index)
+                next_probes[endpoint_index] = time.time() + self.probe_interval
+
+            self.stop_event.wait(POLL_INTERVAL)
+
+    def check_endpoint(self, endpoint_index):
+        ##
+        #   Probes an endpoint and starts its restart, if it is dead.
+        #
+        #   @param {int} endpoint_index - Index of the endpoint.
+        #
+
+        ip, port = self.endpoints[endpoint_index]
+
+        if probe_endpoint(ip=ip, port=port, timeout=self.probe_timeout):
+
+            if self.states[endpoint_index] != ENDPOINT_HEALTHY:
+                logging.info("WebDriver {ip}:{port} is available again.".format(ip=ip, port=port))
+
+            self.probe_failures[endpoint_index] = 0
+            self.restart_failures[endpoint_index] = 0
+            self._set_state(endpoint_index, ENDPOINT_HEALTHY)
+            return
+
+        self.probe_failures[endpoint_index] += 1
+
+        # A single slow answer of a busy healthy endpoint is tolerated.
+        if self.states[endpoint_index] == ENDPOINT_HEALTHY and \
+                self.probe_failures[endpoint_index] < self.max_probe_failures:
+            return
+
+        self._set_state(endpoint_index, ENDPOINT_RESTARTING)
+
+        print("[**] WebDriver {ip}:{port} is dead. Restarting it.".format(ip=ip, port=port))
+        logging.warning("WebDriver {ip}:{port} is dead. Restarting it.".format(ip=ip, port=port))
+
+        thread = threading.Thread(
+            name="Restart {0}:{1}".format(ip, port),
+            target=self.restart_endpoint,
+            args=(endpoint_index,)
+        )
+        thread.daemon = True
+        thread.start()
+
+    def restart_endpoint(self, endpoint_index):
+        ##
+        #   Restarts an endpoint and waits for it to answer. Runs in a thread
+        #   of its own while the endpoint is in the restarting state. If the
+        #   endpoint does not come back, it is marked as dead and restarted
+        #   again in the next round, until max_restarts is reached.
+        #
+        #   @param {int} endpoint_index - Index of the endpoint.
+        #
+
+        ip, port = self.endpoints[endpoint_index]
+
+        try:
+            self.restart_hook(self.phantom_wrapper_infos[endpoint_index])
+
+        except Exception:
+            logging.exception("Restart of WebDriver {ip}:{port} failed.".format(ip=ip, port=port))
+            restarted = False
+
+        else:
+            restarted = wait_for_endpoint(ip=ip, port=port, timeout=self.restart_timeout,
+                                          probe_timeout=self.probe_timeout, stop_event=self.stop_event)
+
+        if self.stop_event.is_set():
+            self._set_state(endpoint_index, ENDPOINT_FAILED)
+            return
+
+        if restarted:
+            logging.info("WebDriver {ip}:{port} restarted.".format(ip=ip, port=port))
+            self.probe_failures[endpoint_index] = 0
+            self.restart_failures[endpoint_index] = 0
+            self._set_state(endpoint_index, ENDPOINT_HEALTHY)
+            return
+
+        self.restart_failures[endpoint_index] += 1
+
+        if self.restart_failures[endpoint_index] >= self.max_restarts:
+            print("[**] WebDriver {ip}:{port} did not come back after {num} restarts.".format(
+                ip=ip, port=port, num=self.restart_failures[endpoint_index]))
+            logging.error("WebDriver {ip}:{port} did not come back after {num} restarts.".format(
+                ip=ip, port=port, num=self.restart_failures[endpoint_index]))
+            self._set_state(endpoint_index, ENDPOINT_FAILED)
+
+        else:
+            # The endpoint stays dead and is restarted again in the next
+            # round.
+            logging.warning("WebDriver {ip}:{port} did not answer after the restart.".format(ip=ip, port=port))
+            self._set_state(endpoint_index, ENDPOINT_DEAD)
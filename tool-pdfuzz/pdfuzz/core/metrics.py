@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module contains the live metrics of a fuzzing run. The workers send
+#   their counts through a shared queue to the main process, which aggregates
+#   them and serves them in the Prometheus text format:
+#
+#   curl http://127.0.0.1:9101/metrics
+#
+#   @date   18.10.2026
+#
+
+import time
+import socket
+import logging
+import threading
+import collections
+import multiprocessing
+import BaseHTTPServer
+
+
+# Type and description of the metrics.
+METRICS = collections.OrderedDict([
+    ("pdfuzz_scans_total", ("counter", "Finished tasks by website, country and status.")),
+    ("pdfuzz_scan_errors_total", ("counter", "Failed scan attempts by website, country and exception type.")),
+    ("pdfuzz_retries_total", ("counter", "Retries of tasks by website and country.")),
+    ("pdfuzz_rows_written_total", ("counter", "Result rows by website and country.")),
+    ("pdfuzz_scans_per_minute", ("gauge", "Completed tasks per minute in the throughput window by website and country.")),
+    ("pdfuzz_last_scan_timestamp_seconds", ("gauge", "Time of the last finished task by country.")),
+])
+
+
+class MetricsCollector:
+    ##
+    #   MetricsCollector aggregates the counts of all workers. The object has
+    #   to be created and its HTTP server bound before the worker processes
+    #   are forked, so that a port in use turns the metrics off before any
+    #   worker runs. The aggregation and the HTTP server are started in the
+    #   main process after the workers are forked.
+    #
+
+    def __init__(self, host, port, throughput_window=300):
+        ##
+        #
+        #   @param {string} host - Address of the HTTP server.
+        #   @param {int} port - Port of the HTTP server. If None, all counts
+        #   are dropped.
+        #   @param {int} throughput_window - (optional) Number of seconds
+        #   the throughput is averaged over.
+        #
+
+        self.queue = None
+        self.host = host
+        self.port = port
+        self.throughput_window = throughput_window
+
+        # Only used by the main process.
+        self.counters = {}
+        self.completions = {}
+        self.last_scans = {}
+        self.lock = threading.Lock()
+        self.threads = []
+        self.http_server = None
+
+        if port is None:
+            return
+
+        try:
+            self.http_server = BaseHTTPServer.HTTPServer((host, port), MetricsRequestHandler)
+
+        except socket.error as e:
+            print("[**] Metrics are turned off: {host}:{port} is not available ({msg}).".format(
+                host=host, port=port, msg=e))
+            logging.error("Metrics are turned off: {host}:{port} is not available ({msg}).".format(
+                host=host, port=port, msg=e))
+            return
+
+        self.http_server.collector = self
+        self.queue = multiprocessing.Queue()
+
+    def count(self, metric, value=1, **labels):
+        ##
+        #   Counts an event. Called by the workers.
+        #
+        #   @param {string} metric - Name of the metric, see METRICS.
+        #   @param {int} value - (optional) Amount to add.
+        #   @param {dict} labels - Labels of the event, e.g. site and country.
+        #
+
+        if self.queue is None:
+            return
+
+        self.queue.put((metric, tuple(sorted(labels.items())), value, time.time()))
+
+    def start(self):
+        ##
+        #   Starts the aggregation of the counts and the HTTP server.
+        #
+
+        if self.http_server is None:
+            return
+
+        for name, target in [("Metrics Aggregation", self._aggregate),
+                             ("Metrics Server", self.http_server.serve_forever)]:
+            thread = threading.Thread(name=name, target=target)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+        print("[**] Metrics on http://{host}:{port}/metrics".format(host=self.host, port=self.port))
+        logging.info("Metrics on http://{host}:{port}/metrics".format(host=self.host, port=self.port))
+
+    def stop(self):
+        ##
+        #   Stops the HTTP server and the aggregation.
+        #
+
+        if self.http_server is None or len(self.threads) == 0:
+            return
+
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        self.http_server = None
+
+        # Stop marker for the aggregation.
+        self.queue.put(None)
+
+        for thread in self.threads:
+            thread.join()
+
+    def _aggregate(self):
+
+        while True:
+
+            item = self.queue.get()
+            if item is None:
+                break
+
+            metric, labels, value, timestamp = item
+
+            with self.lock:
+                key = (metric, labels)
+                self.counters[key] = self.counters.get(key, 0) + value
+
+                if metric == "pdfuzz_scans_total":
+                    labels = dict(labels)
+                    self.last_scans[labels["country"]] = timestamp
+
+                    if labels["status"] == "completed":
+                        timestamps = self.completions.setdefault(
+                            (labels["site"], labels["country"]), collections.deque())
+                        timestamps.append(timestamp)
+
+                        # Forget the completions before the window.
+                        while timestamps[0] < timestamp - self.throughput_window:
+                            timestamps.popleft()
+
+    def get_samples(self):
+        ##
+        #   Returns the current values of all metrics.
+        #
+        #   @return {list} Tuples (metric, labels, value).
+        #
+
+        samples = []
+        window_start = time.time() - self.throughput_window
+
+        with self.lock:
+
+            for (metric, labels), value in self.counters.items():
+                samples.append((metric, labels, value))
+
+            for (site, country), timestamps in self.completions.items():
+                while len(timestamps) > 0 and timestamps[0] < window_start:
+                    timestamps.popleft()
+
+                samples.append((
+                    "pdfuzz_scans_per_minute",
+                    (("country", country), ("site", site)),
+                    len(timestamps) * 60.0 / self.throughput_window
+                ))
+
+            for country, timestamp in self.last_scans.items():
+                samples.append((
+                    "pdfuzz_last_scan_timestamp_seconds",
+                    (("country", country),),
+                    timestamp
+                ))
+
+        return samples
+
+    def render(self):
+        ##
+        #   Renders all metrics in the Prometheus text format.
+        #
+        #   @return {string}
+        #
+
+        samples = sorted(self.get_samples())
+        lines = []
+
+        for metric, (metric_type, description) in METRICS.items():
+
+            lines.append("# HELP {0} {1}".format(metric, description))
+            lines.append("# TYPE {0} {1}".format(metric, metric_type))
+
+            for sample_metric, labels, value in samples:
+                if sample_metric != metric:
+                    continue
+
+                label_string = ",".join(
+                    '{0}="{1}"'.format(key, str(label_value).replace("\\", "\\\\").replace('"', '\\"'))
+                    for key, label_value in labels
+                )
+                lines.append("{metric}{{{labels}}} {value}".format(
+                    metric=metric, labels=label_string, value=repr(float(value))))
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.server.collector.render()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the requests out of the console.
+        logging.debug("Metrics request: " + format % args)
@@ -9,7 +9,7 @@
 #
 
 import logging
-import time
+import urlparse
 import subprocess
 import pkg_resources
 import selenium
@@ -17,6 +17,61 @@ import selenium
 import pdfuzz.config.config as cfg
 
 
+# Supported browser engines of the webdriver servers.
+DRIVER_BACKENDS = ["phantomjs", "chromium"]
+
+
+def get_page_settings(dcap):
+    ##
+    #   Splits the PhantomJS page capabilities of a dcap, which are created
+    #   by fpfuzzer.create_dcap(), into their groups.
+    #
+    #   @param {dict} dcap - Dictionary representation of DesiredCapabilities
+    #   object from selenium package.
+    #
+    #   @return {dict} settings, {dict} custom headers, {dict} viewport size,
+    #   {string} JavaScript code to inject.
+    #
+
+    settings = {}
+    custom_headers = {}
+    viewport_size = {}
+    inject_js = None
+
+    for key, value in dcap.items():
+
+        if key.startswith("phantomjs.page.settings."):
+            settings[key[len("phantomjs.page.settings."):]] = value
+
+        elif key.startswith("phantomjs.page.customHeaders."):
+            custom_headers[key[len("phantomjs.page.customHeaders."):]] = value
+
+        elif key.startswith("phantomjs.page.viewportSize."):
+            viewport_size[key[len("phantomjs.page.viewportSize."):]] = value
+
+        elif key == "phantomjs.page.onInitialized.jsInject":
+            inject_js = value
+
+    return settings, custom_headers, viewport_size, inject_js
+
+
+def get_origin(url):
+    ##
+    #   Returns the origin of a URL, e.g. 'https://www.example.com'.
+    #
+    #   @param {string} url
+    #
+    #   @return {string} None for URLs without web storage, e.g. about:blank.
+    #
+
+    parts = urlparse.urlsplit(url or "")
+
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+
+    return "{0}://{1}".format(parts.scheme, parts.netloc.lower())
+
+
 class PhantomWrapper:
     ##
     #   PhantomWrapper is used to build up a connection via PhantomJS remote
@@ -36,11 +91,53 @@ class PhantomWrapper:
         self.RWD_PORT = remote_webdriver_port
 
         self.page_load_timeout = cfg.PAGE_LOAD_TIMEOUT
+        self.max_session_uses = cfg.MAX_SESSION_USES
+
+        self.driver = None
+        self.session_uses = 0
+        self.session_released = False
+
+        # Origins that were visited since the web storage was cleared. The
+        # local storage of PhantomJS is shared by all sessions of the server.
+        self.visited_origins = set()
 
     def connect(self, dcap):
         ##
         #   Connect to the defined remote webdriver server with specific
-        #   desired capabilities.
+        #   desired capabilities. A warm session that was handed back via
+        #   release() is reused. Its state is cleared and the capabilities of
+        #   the new fingerprint are applied to it.
+        #
+        #   @param {selenium.webdriver.common.desired_capabilities} dcap
+        #
+
+        if self.driver is not None and self.session_released:
+
+            try:
+                self._reset_session(dcap=dcap)
+                self.session_released = False
+                self.session_uses += 1
+                return
+
+            except:
+                logging.warning("Reset of the WebDriver session failed. Starting a new session.")
+                self.disconnect()
+
+        elif self.driver is not None:
+            # The last session was not handed back properly.
+            self.disconnect()
+
+        self._start_session(dcap=dcap)
+
+        # set page load timeout
+        self.driver.set_page_load_timeout(self.page_load_timeout)
+
+        self.session_released = False
+        self.session_uses = 1
+
+    def _start_session(self, dcap):
+        ##
+        #   Starts a new session on the remote webdriver server.
         #
         #   @param {selenium.webdriver.common.desired_capabilities} dcap
         #
@@ -50,15 +147,156 @@ class PhantomWrapper:
             command_executor='http://{0}:{1}'.format(self.RWD_IP, self.RWD_PORT)
         )
 
-        # set page load timeout
-        self.driver.set_page_load_timeout(self.page_load_timeout)
+        # Register the GhostDriver command to execute code in the PhantomJS
+        # context of the page.
+        self.driver.command_executor._commands["executePhantomScript"] = \
+            ("POST", "/session/$sessionId/phantom/execute")
+
+        # The web storage outlives the sessions of a PhantomJS server.
+        if len(self.visited_origins) > 0:
+            self._clear_web_storage()
+
+    def release(self):
+        ##
+        #   Hands the session back after a successful scan, so that it can be
+        #   reused by the next call of connect(). The session is closed if it
+        #   reached the maximal number of uses.
+        #
+
+        if self.driver is None:
+            return
+
+        if self.session_uses >= self.max_session_uses:
+            self.disconnect()
+
+        else:
+            self.session_released = True
 
     def disconnect(self):
         ##
-        #   Disconnect connection to the remote webdriver server.
+        #   Disconnect connection to the remote webdriver server. This is also
+        #   used to recycle the session after an error.
+        #
+
+        if self.driver is None:
+            return
+
+        try:
+            self.driver.quit()
+
+        except:
+            logging.warning("WebDriver session could not be closed properly.")
+
+        finally:
+            self.driver = None
+            self.session_uses = 0
+            self.session_released = False
+
+    def _reset_session(self, dcap):
+        ##
+        #   Clears cookies, web storage and the memory cache of the session and
+        #   applies the PhantomJS page capabilities of the given dcap.
+        #
+        #   @param {selenium.webdriver.common.desired_capabilities} dcap
+        #
+
+        self._clear_web_storage()
+
+        # Leave the last visited page.
+        self.driver.get("about:blank")
+
+        settings, custom_headers, viewport_size, inject_js = get_page_settings(dcap)
+
+        # Apply the new fingerprint to the page object of PhantomJS.
+        self.driver.execute("executePhantomScript", {
+            "script": '''
+                var page = this;
+                var settings = arguments[0];
+                var inject_js = arguments[3];
+
+                phantom.clearCookies();
+                if (typeof page.clearMemoryCache === "function") {
+                    page.clearMemoryCache();
+                }
+
+                for (var key in settings) {
+                    page.settings[key] = settings[key];
+                }
+                page.customHeaders = arguments[1];
+                if (arguments[2].width && arguments[2].height) {
+                    page.viewportSize = arguments[2];
+                }
+
+                page.onInitialized = null;
+                if (inject_js) {
+                    page.onInitialized = function () {
+                        page.evaluateJavaScript("function () {" + inject_js + "}");
+                    };
+                }
+            ''',
+            "args": [settings, custom_headers, viewport_size, inject_js],
+        })
+
+    def _add_visited_origin(self, url):
+
+        origin = get_origin(url)
+
+        if origin is not None:
+            self.visited_origins.add(origin)
+
+    def add_current_origin(self):
+        ##
+        #   Records the origin of the current page, so that its web storage
+        #   is cleared before the next fingerprint. The navigation and the
+        #   scraping of a NavScraper can move to other origins than the
+        #   loaded page.
         #
 
-        self.driver.quit()
+        if self.driver is None:
+            return
+
+        try:
+            self._add_visited_origin(self.driver.current_url)
+
+        except:
+            # E.g. the webdriver server is not reachable. The error of the
+            # scan is raised by the caller.
+            logging.debug("The URL of the current page is not available.")
+
+    def _clear_web_storage(self):
+        ##
+        #   Clears the local and session storage of all origins that were
+        #   visited, not only of the last page. An empty document is set for
+        #   every origin without loading it, so no request is sent. The
+        #   injection code of the session is kept.
+        #
+
+        self._add_visited_origin(self.driver.current_url)
+
+        self.driver.execute("executePhantomScript", {
+            "script": '''
+                var page = this;
+                var origins = arguments[0];
+                var on_initialized = page.onInitialized;
+
+                page.onInitialized = null;
+
+                for (var i = 0; i < origins.length; i++) {
+                    page.setContent("<html></html>", origins[i] + "/");
+                    page.evaluate(function () {
+                        try {
+                            window.localStorage.clear();
+                            window.sessionStorage.clear();
+                        } catch (e) {}
+                    });
+                }
+
+                page.onInitialized = on_initialized;
+            ''',
+            "args": [sorted(self.visited_origins)],
+        })
+
+        self.visited_origins.clear()
 
     def get_driver(self):
         ##
@@ -78,6 +316,8 @@ class PhantomWrapper:
         #   browser fingerprint.
         #
 
+        self._add_visited_origin(uri)
+
         try:
 
             self.driver.get(uri)
@@ -88,6 +328,189 @@ class PhantomWrapper:
             logging.error(e.msg)
             return False
 
+        finally:
+            # The page may have been redirected to another origin.
+            self._add_visited_origin(self.driver.current_url)
+
+
+class ChromiumWrapper(PhantomWrapper):
+    ##
+    #   ChromiumWrapper connects to a ChromeDriver server, which controls a
+    #   headless Chromium. It offers the interface of the PhantomWrapper. The
+    #   PhantomJS page capabilities of the fingerprint are applied via the
+    #   DevTools protocol: The injection code is added as script that is
+    #   evaluated on every new document, the headers and the viewport are set
+    #   by the Network and Emulation domains.
+    #
+
+    def __init__(self, remote_webdriver_ip, remote_webdriver_port, proxy_ip=None, proxy_port=None):
+        ##
+        #
+        #   @param {string} remote_webdriver_ip - IP of the ChromeDriver server.
+        #   @param {int} remote_webdriver_port - Port of the ChromeDriver server.
+        #   @param {string} proxy_ip - (optional) IP address of the proxy server.
+        #   @param {int} proxy_port - (optional) Port of the proxy server.
+        #
+
+        PhantomWrapper.__init__(
+            self,
+            remote_webdriver_ip=remote_webdriver_ip,
+            remote_webdriver_port=remote_webdriver_port
+        )
+
+        self.proxy_ip = proxy_ip
+        self.proxy_port = proxy_port
+
+        # Identifier of the injection script of the current fingerprint.
+        self.inject_script_id = None
+
+    def _start_session(self, dcap):
+        ##
+        #   Starts a new headless Chromium session and applies the page
+        #   capabilities of the fingerprint.
+        #
+        #   @param {selenium.webdriver.common.desired_capabilities} dcap
+        #
+
+        settings, custom_headers, viewport_size, inject_js = get_page_settings(dcap)
+
+        chromium_args = ["--headless", "--disable-gpu", "--no-first-run"]
+
+        if viewport_size.get("width") and viewport_size.get("height"):
+            chromium_args.append("--window-size={0},{1}".format(
+                viewport_size["width"], viewport_size["height"]))
+
+        if self.proxy_ip is not None and self.proxy_port is not None:
+            chromium_args.append("--proxy-server={0}:{1}".format(
+                self.proxy_ip, self.proxy_port))
+
+        chrome_options = {
+            "args": chromium_args,
+            # Selenium speaks the JSON wire protocol.
+            "w3c": False,
+        }
+
+        if cfg.CHROMIUM_BIN is not None:
+            chrome_options["binary"] = cfg.CHROMIUM_BIN
+
+        capabilities = dict(selenium.webdriver.DesiredCapabilities.CHROME)
+        capabilities["goog:chromeOptions"] = chrome_options
+
+        self.driver = selenium.webdriver.Remote(
+            desired_capabilities=capabilities,
+            command_executor='http://{0}:{1}'.format(self.RWD_IP, self.RWD_PORT)
+        )
+
+        # Register the ChromeDriver command to send DevTools commands.
+        self.driver.command_executor._commands["executeCdpCommand"] = \
+            ("POST", "/session/$sessionId/goog/cdp/execute")
+
+        self.inject_script_id = None
+
+        # Every Chromium session has a profile of its own.
+        self.visited_origins.clear()
+
+        self._apply_page_settings(dcap=dcap)
+
+    def _reset_session(self, dcap):
+        ##
+        #   Clears cookies, web storage and the cache of the session and
+        #   applies the page capabilities of the given dcap.
+        #
+        #   @param {selenium.webdriver.common.desired_capabilities} dcap
+        #
+
+        self._clear_web_storage()
+
+        # Leave the last visited page.
+        self.driver.get("about:blank")
+
+        self._execute_cdp_command("Network.clearBrowserCookies")
+        self._execute_cdp_command("Network.clearBrowserCache")
+
+        self._apply_page_settings(dcap=dcap)
+
+    def _clear_web_storage(self):
+        ##
+        #   Clears the local storage, the other site data and the session
+        #   storage of all origins that were visited, not only of the last
+        #   page.
+        #
+
+        self._add_visited_origin(self.driver.current_url)
+
+        for origin in sorted(self.visited_origins):
+
+            self._execute_cdp_command("Storage.clearDataForOrigin", {
+                "origin": origin,
+                "storageTypes": "local_storage,indexeddb,websql,cache_storage,service_workers",
+            })
+
+            self._execute_cdp_command("DOMStorage.clear", {
+                "storageId": {"securityOrigin": origin, "isLocalStorage": False},
+            })
+
+        self.visited_origins.clear()
+
+    def _apply_page_settings(self, dcap):
+        ##
+        #   Applies the user agent, the custom headers, the viewport size and
+        #   the injection code of the dcap to the session.
+        #
+        #   @param {selenium.webdriver.common.desired_capabilities} dcap
+        #
+
+        settings, custom_headers, viewport_size, inject_js = get_page_settings(dcap)
+
+        self._execute_cdp_command("Network.enable")
+
+        if settings.get("userAgent"):
+            self._execute_cdp_command("Network.setUserAgentOverride", {
+                "userAgent": settings["userAgent"],
+            })
+
+        self._execute_cdp_command("Network.setExtraHTTPHeaders", {
+            "headers": custom_headers,
+        })
+
+        if viewport_size.get("width") and viewport_size.get("height"):
+            self._execute_cdp_command("Emulation.setDeviceMetricsOverride", {
+                "width": int(viewport_size["width"]),
+                "height": int(viewport_size["height"]),
+                "deviceScaleFactor": 0,
+                "mobile": False,
+            })
+
+        # Replace the injection script of the last fingerprint.
+        if self.inject_script_id is not None:
+            self._execute_cdp_command("Page.removeScriptToEvaluateOnNewDocument", {
+                "identifier": self.inject_script_id,
+            })
+            self.inject_script_id = None
+
+        if inject_js:
+            result = self._execute_cdp_command("Page.addScriptToEvaluateOnNewDocument", {
+                "source": "(function () {" + inject_js + "})();",
+            })
+            self.inject_script_id = result["identifier"]
+
+    def _execute_cdp_command(self, cmd, params={}):
+        ##
+        #   Sends a command of the DevTools protocol to the browser.
+        #
+        #   @param {string} cmd - Name of the command. Example: 'Network.enable'.
+        #   @param {dict} params - (optional) Parameters of the command.
+        #
+        #   @return {dict} Result of the command.
+        #
+
+        response = self.driver.execute("executeCdpCommand", {
+            "cmd": cmd,
+            "params": params,
+        })
+
+        return response["value"]
+
 
 class PhantomWebdriverManager:
     ##
@@ -96,22 +519,37 @@ class PhantomWebdriverManager:
     #   and returns the connection details.
     #
 
-    def __init__(self, webdriver_details_list):
+    def __init__(self, webdriver_details_list, remote_restart_hook=None):
         ##
         #
         #   @param {list} webdriver_details_list - ...
+        #   @param {function} remote_restart_hook - (optional) Function that
+        #   is called with the information of a dead webdriver server on a VM
+        #   to restart it. Default: run_restart_command
         #
 
-        self.webdriver_instances = []
+        # Processes of the local webdriver servers, stored by their port.
+        self.webdriver_instances = {}
         self.phantom_wrapper_list = {
             'vm': [],
             'local': [],
         }
         self.webdriver_details_list = webdriver_details_list
 
+        # Browser engine of the webdriver servers. See DRIVER_BACKENDS.
+        self.driver_backend = cfg.DRIVER_BACKEND
+
+        if self.driver_backend not in DRIVER_BACKENDS:
+            raise ValueError("Unknown driver backend: '{0}'".format(self.driver_backend))
+
         # Get path to PhantomJS binary from "phantomjs_bin" file of "pdfuzz.config" package.
         self.phantomjs_bin = pkg_resources.resource_string("pdfuzz.config", "phantomjs_bin")
 
+        if remote_restart_hook is None:
+            remote_restart_hook = self.run_restart_command
+
+        self.remote_restart_hook = remote_restart_hook
+
     def start_all_webdriver_instances(self):
         ##
         #   Iterates over the list of webdriver instances that are to be created.
@@ -175,18 +613,21 @@ class PhantomWebdriverManager:
 
         if ip in ["localhost", "127.0.0.1"]:
 
-            if proxy_ip is None or proxy_port is None:
-                # If no proxy information are set.
-                p = subprocess.Popen([self.phantomjs_bin, "--webdriver={0}".format(port)])
-
-            else:
-                # If a proxy server is defined.
-                p = subprocess.Popen([self.phantomjs_bin, "--webdriver={0}".format(port), "--proxy={0}:{1}".format(proxy_ip, proxy_port)])
+            p = subprocess.Popen(self.get_webdriver_command(
+                port=port,
+                proxy_ip=proxy_ip,
+                proxy_port=proxy_port
+            ))
 
-            self.webdriver_instances.append(p)
+            self.webdriver_instances[port] = p
 
             # Create a new phantom wrapper for ip and port.
-            phw = self.create_phantom_wrapper(ip=ip, port=port)
+            phw = self.create_phantom_wrapper(
+                ip=ip,
+                port=port,
+                proxy_ip=proxy_ip,
+                proxy_port=proxy_port
+            )
 
             self.phantom_wrapper_list["local"].append({
                 "index": len(self.phantom_wrapper_list["local"]),
@@ -208,7 +649,12 @@ class PhantomWebdriverManager:
             for i in range(num_wd_instances):
 
                 # Create a new phantom wrapper for ip and port.
-                phw = self.create_phantom_wrapper(ip=ip, port=port + i)
+                phw = self.create_phantom_wrapper(
+                    ip=ip,
+                    port=port + i,
+                    proxy_ip=proxy_ip,
+                    proxy_port=proxy_port
+                )
 
                 self.phantom_wrapper_list["vm"][vm_index].append({
                     "index": i,
@@ -223,7 +669,10 @@ class PhantomWebdriverManager:
 
     def restart_webdriver(self, phantom_wrapper_info):
         ##
-        #
+        #   Restarts a crashed webdriver server. A local server is killed and
+        #   started again. A server on a VM is restarted by the remote restart
+        #   hook. The phantom wrappers are kept, they open a new session on
+        #   their next connect.
         #
         #   @param {dict} phantom_wrapper_info - Dictionary with all information
         #   about the crashed webdriver server.
@@ -231,55 +680,112 @@ class PhantomWebdriverManager:
 
         if phantom_wrapper_info["ip"] in ["localhost", "127.0.0.1"]:
 
-            if phantom_wrapper_info.get["proxy_ip"] is None or phantom_wrapper_info["proxy_port"] is None:
-                # If no proxy information are set.
-                p = subprocess.Popen([
-                    self.phantomjs_bin,
-                    "--webdriver={0}".format(
-                        phantom_wrapper_info["port"]
-                    )
-                ])
+            port = phantom_wrapper_info["port"]
 
-            else:
-                # If a proxy server is defined.
-                p = subprocess.Popen([
-                    self.phantomjs_bin,
-                    "--webdriver={0}".format(
-                        phantom_wrapper_info["port"]
-                    ),
-                    "--proxy={0}:{1}".format(
-                        phantom_wrapper_info["proxy_ip"],
-                        phantom_wrapper_info["proxy_port"]
-                    )
-                ])
+            old_process = self.webdriver_instances.get(port)
+            if old_process is not None and old_process.poll() is None:
+                # The server hangs. Kill it to free the port.
+                old_process.kill()
+                old_process.wait()
+
+            self.webdriver_instances[port] = subprocess.Popen(self.get_webdriver_command(
+                port=port,
+                proxy_ip=phantom_wrapper_info["proxy_ip"],
+                proxy_port=phantom_wrapper_info["proxy_port"]
+            ))
+
+        else:
+            self.remote_restart_hook(phantom_wrapper_info)
+
+    def run_restart_command(self, phantom_wrapper_info):
+        ##
+        #   Default restart hook for webdriver servers on a VM. Runs the
+        #   WEBDRIVER_RESTART_COMMAND of the config file. Without a command,
+        #   nothing is done and the server is reattached as soon as it is
+        #   restarted on the VM, e.g. by a process supervisor.
+        #
+        #   @param {dict} phantom_wrapper_info - Dictionary with all information
+        #   about the crashed webdriver server.
+        #
 
-            self.webdriver_instances.append(p)
+        if cfg.WEBDRIVER_RESTART_COMMAND is None:
+            logging.info("Waiting for WebDriver {ip}:{port} to be restarted on the VM.".format(
+                ip=phantom_wrapper_info["ip"],
+                port=phantom_wrapper_info["port"]
+            ))
+            return
+
+        command = cfg.WEBDRIVER_RESTART_COMMAND.format(
+            ip=phantom_wrapper_info["ip"],
+            port=phantom_wrapper_info["port"],
+            proxy_ip=phantom_wrapper_info["proxy_ip"],
+            proxy_port=phantom_wrapper_info["proxy_port"]
+        )
 
-            phw = self.create_phantom_wrapper(port=phantom_wrapper_info["port"])
+        return_code = subprocess.call(command, shell=True)
 
-            # Replace the old phantomwrapper object.
-            phantom_wrapper_info["phantomwrapper"] = phw
+        if return_code != 0:
+            logging.warning("Restart command '{command}' returned {code}.".format(
+                command=command,
+                code=return_code
+            ))
 
-            # Replace the old list entry.
-            self.phantom_wrapper_list["local"][phantom_wrapper_info["index"]] = phantom_wrapper_info
+    def get_webdriver_command(self, port, proxy_ip=None, proxy_port=None):
+        ##
+        #   Builds the command to start a webdriver server of the configured
+        #   driver backend.
+        #
+        #   PhantomJS:
+        #   phantomjs --webdriver=<port> [--proxy=<uri>:<port>]
+        #
+        #   Chromium:
+        #   chromedriver --port=<port>
+        #   The proxy is passed to Chromium by the ChromiumWrapper.
+        #
+        #   @param {int} port - Port of the webdriver server.
+        #   @param {string} proxy_ip - (optional) IP address of the proxy server.
+        #   @param {int} proxy_port - (optional) Port of the proxy server.
+        #
+        #   @return {list}
+        #
+
+        if self.driver_backend == "chromium":
+            return [cfg.CHROMEDRIVER_BIN, "--port={0}".format(port)]
 
-            # Delay to let the webdriver start.
-            time.sleep(5)
+        if proxy_ip is None or proxy_port is None:
+            # If no proxy information are set.
+            return [self.phantomjs_bin, "--webdriver={0}".format(port)]
 
-            return phw
+        # If a proxy server is defined.
+        return [
+            self.phantomjs_bin,
+            "--webdriver={0}".format(port),
+            "--proxy={0}:{1}".format(proxy_ip, proxy_port)
+        ]
 
-    def create_phantom_wrapper(self, port, ip):
+    def create_phantom_wrapper(self, port, ip, proxy_ip=None, proxy_port=None):
         ##
-        #   ...
+        #   Creates the wrapper for a webdriver server of the configured
+        #   driver backend.
         #
         #   @param {int} port - Port of the webdriver server the wrapper shall
         #   connect to.
         #   @param {string} ip - (optional) IP of the webdriver server the
         #   wrapper shall connect to.
+        #   @param {string} proxy_ip - (optional) IP address of the proxy server.
+        #   @param {int} proxy_port - (optional) Port of the proxy server.
         #
         #   @return pdfuzz.core.phantomconnection.PhantomWrapper
         #
 
+        if self.driver_backend == "chromium":
+            return ChromiumWrapper(
+                remote_webdriver_ip=ip,
+                remote_webdriver_port=port,
+                proxy_ip=proxy_ip,
+                proxy_port=proxy_port
+            )
+
         ph = PhantomWrapper(remote_webdriver_ip=ip, remote_webdriver_port=port)
 
         return ph
@@ -297,7 +803,7 @@ class PhantomWebdriverManager:
         print("[**] Shutdown all WebDriver Server")
         logging.info("Shutdown all WebDriver Server")
 
-        for p in self.webdriver_instances:
+        for p in self.webdriver_instances.values():
             if p is not None:
                 # Kill process.
                 p.kill()
@@ -311,3 +817,18 @@ class PhantomWebdriverManager:
         #
 
         return self.phantom_wrapper_list
+
+    def get_all_phantom_wrapper_infos(self):
+        ##
+        #   Returns the information about all local and VM webdriver servers
+        #   in one list.
+        #
+        #   @return {list}
+        #
+
+        phantom_wrapper_infos = list(self.phantom_wrapper_list["local"])
+
+        for phantom_wrapper_set in self.phantom_wrapper_list["vm"]:
+            phantom_wrapper_infos.extend(phantom_wrapper_set)
+
+        return phantom_wrapper_infos
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module contains the rate limiter that is shared by all worker
+#   processes. It makes sure that every target host receives only a limited
+#   number of requests per minute, regardless of the number of workers.
+#
+#   @date   18.10.2026
+#
+
+import time
+import logging
+import urlparse
+import multiprocessing
+
+
+def get_host(uri):
+    ##
+    #   Determines the host of the given URI.
+    #
+    #   @param {string} uri - URI of the target website. Example:
+    #   'http://hotels.com'.
+    #
+    #   @return {string} Host of the URI. Example: 'hotels.com'.
+    #
+
+    return urlparse.urlparse(uri).netloc.lower()
+
+
+class HostRateLimiter:
+    ##
+    #   HostRateLimiter hands out request slots per host. The slots of a host
+    #   are spaced evenly, so that all processes together do not exceed the
+    #   requests-per-minute budget of the host. The state lives in shared
+    #   memory, so the object has to be created before the worker processes
+    #   are forked.
+    #
+
+    def __init__(self, hosts, requests_per_minute):
+        ##
+        #
+        #   @param {list} hosts - List of all hosts that are going to be
+        #   requested.
+        #   @param {float} requests_per_minute - Maximal number of requests
+        #   per minute for a single host. Has to be greater than zero.
+        #
+
+        if requests_per_minute <= 0:
+            raise ValueError("The requests per minute have to be greater than 0: {0}".format(requests_per_minute))
+
+        self.hosts = sorted(set(hosts))
+        self.interval = 60.0 / requests_per_minute
+
+        # Point in time from which on the next request to a host is allowed.
+        self.next_slots = multiprocessing.RawArray("d", len(self.hosts))
+        self.lock = multiprocessing.Lock()
+
+    def get_delay(self, host):
+        ##
+        #   Returns the number of seconds until the next request slot of the
+        #   host is available. No slot is reserved.
+        #
+        #   @param {string} host - Host of the target website.
+        #
+        #   @return {float}
+        #
+
+        host_index = self.hosts.index(host)
+
+        with self.lock:
+            next_slot = self.next_slots[host_index]
+
+        return max(0.0, next_slot - time.time())
+
+    def acquire(self, host):
+        ##
+        #   Reserves the next request slot of the host.
+        #
+        #   @param {string} host - Host of the target website.
+        #
+        #   @return {float} Number of seconds to wait until the reserved slot
+        #   is reached.
+        #
+
+        host_index = self.hosts.index(host)
+
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slots[host_index])
+            self.next_slots[host_index] = slot + self.interval
+
+        return slot - now
+
+    def wait(self, host):
+        ##
+        #   Reserves the next request slot of the host and blocks until it is
+        #   reached.
+        #
+        #   @param {string} host - Host of the target website.
+        #
+
+        delay = self.acquire(host)
+
+        if delay > 0:
+            logging.debug("Waiting for {sec:.1f} seconds before requesting {host}.".format(
+                sec=delay, host=host))
+            time.sleep(delay)
+
+    def choose(self, hosts):
+        ##
+        #   Chooses the host whose next request slot is available first.
+        #
+        #   @param {list} hosts - List of candidate hosts.
+        #
+        #   @return {string}
+        #
+
+        return min(hosts, key=self.get_delay)
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module records the pages of a scan and replays them offline.
+#
+#   Recording: The PageRecorder saves the page source and the XHR responses
+#   of every step of a scan (entry page, result page, scraped page) and the
+#   scraped rows into a directory per website, worker and fingerprint:
+#
+#   <record dir>/<host>_<worker>_<fp_id>/manifest.json
+#   <record dir>/<host>_<worker>_<fp_id>/01_entry.html
+#   ...
+#
+#   Replay: The ReplayServer serves a recording over HTTP. The steps are
+#   available under /replay/<step>. Used as HTTP proxy of the browser, it
+#   answers every recorded URL and XHR with the recorded response and every
+#   other request with 404, so that the target website is never requested.
+#   HTTPS requests (CONNECT) are refused.
+#
+#   @date   18.10.2026
+#
+
+import os
+import re
+import json
+import shutil
+import urllib
+import logging
+import urlparse
+import threading
+import SocketServer
+import BaseHTTPServer
+
+
+# Installs a hook into the page that keeps the responses of all
+# XMLHttpRequests until they are collected. It is part of the injection code
+# of a recorded scan, so it is installed into every new document before the
+# scripts of the page run.
+XHR_RECORDER_SCRIPT = '''
+    (function () {
+        if (window.__pdfuzzRecordedXHR) {
+            return;
+        }
+        window.__pdfuzzRecordedXHR = [];
+
+        var open = XMLHttpRequest.prototype.open;
+        var send = XMLHttpRequest.prototype.send;
+
+        XMLHttpRequest.prototype.open = function (method, url) {
+            this.__pdfuzzRequest = {method: method, url: url};
+            return open.apply(this, arguments);
+        };
+
+        XMLHttpRequest.prototype.send = function () {
+            var xhr = this;
+            xhr.addEventListener("load", function () {
+                try {
+                    var link = document.createElement("a");
+                    link.href = xhr.__pdfuzzRequest.url;
+                    window.__pdfuzzRecordedXHR.push({
+                        method: xhr.__pdfuzzRequest.method,
+                        url: link.href,
+                        status: xhr.status,
+                        content_type: xhr.getResponseHeader("Content-Type"),
+                        body: xhr.responseText
+                    });
+                } catch (e) {}
+            });
+            return send.apply(this, arguments);
+        };
+    })();
+'''
+
+# Returns and clears the recorded XHR responses.
+XHR_COLLECTOR_SCRIPT = '''
+    var recorded = window.__pdfuzzRecordedXHR || [];
+    window.__pdfuzzRecordedXHR = [];
+    return recorded;
+'''
+
+MANIFEST_FILENAME = "manifest.json"
+
+# Holds the name of the worker that writes a recording.
+OWNER_FILENAME = "owner"
+
+
+def get_recording_id(entry_uri, worker_name, fingerprint_id):
+    ##
+    #   Returns the name of the directory of a recording. The workers of all
+    #   countries scan the same fingerprints, so the worker is part of it.
+    #
+    #   @param {string} entry_uri - Entry URI of the NavScraper.
+    #   @param {string} worker_name - Name of the worker.
+    #   @param {int} fingerprint_id - Id of the fingerprint.
+    #
+    #   @return {string} Example: 'www.hotels.com_Germany-local_42'
+    #
+
+    host = urlparse.urlparse(entry_uri).netloc.lower() or "unknown"
+    worker = re.sub(r"[^A-Za-z0-9.-]+", "-", worker_name).strip("-") or "unknown"
+
+    return "{host}_{worker}_{fp_id}".format(host=host.replace(":", "_"), worker=worker, fp_id=fingerprint_id)
+
+
+def load_recording(recording_dir):
+    ##
+    #   Reads the manifest of a recording.
+    #
+    #   @param {string} recording_dir - Directory of the recording.
+    #
+    #   @return {dict}
+    #
+
+    with open(os.path.join(recording_dir, MANIFEST_FILENAME), "r") as manifest_file:
+        return json.load(manifest_file)
+
+
+def normalize_url(url):
+    ##
+    #   Removes the scheme and the fragment of a URL, so that HTTP and HTTPS
+    #   requests of the same resource match.
+    #
+    #   @param {string} url
+    #
+    #   @return {string}
+    #
+
+    parts = urlparse.urlsplit(url)
+
+    return urlparse.urlunsplit(("", parts.netloc.lower(), parts.path or "/", parts.query, "")).lstrip("/")
+
+
+class PageRecorder:
+    ##
+    #   PageRecorder saves the steps of the scans of a worker. Errors while
+    #   recording are logged and never abort a scan.
+    #
+
+    def __init__(self, record_dir, worker_name):
+        ##
+        #
+        #   @param {string} record_dir - Directory of the recordings.
+        #   @param {string} worker_name - Name of the worker.
+        #
+
+        self.record_dir = record_dir
+        self.worker_name = worker_name
+        self.recording_dir = None
+        self.manifest = None
+
+    def start(self, navscraper, fingerprint_id, search_parameters):
+        ##
+        #   Starts the recording of a scan. An older recording of the same
+        #   website and fingerprint by this worker is replaced. A recording
+        #   of another worker is never removed, the scan is not recorded then.
+        #
+        #   @param {NavScraper} navscraper - NavScraper of the scan.
+        #   @param {int} fingerprint_id - Id of the fingerprint.
+        #   @param {dict} search_parameters - Input values for the navigation.
+        #
+
+        self.manifest = None
+        self.recording_dir = os.path.join(
+            self.record_dir, get_recording_id(navscraper.ENTRY_URI, self.worker_name, fingerprint_id))
+
+        try:
+            if os.path.isdir(self.recording_dir):
+
+                owner = None
+                owner_filename = os.path.join(self.recording_dir, OWNER_FILENAME)
+                if os.path.isfile(owner_filename):
+                    with open(owner_filename, "r") as owner_file:
+                        owner = owner_file.read()
+
+                if owner != self.worker_name:
+                    logging.warning("The recording '{0}' belongs to another worker. The scan is not recorded.".format(
+                        self.recording_dir))
+                    return
+
+                shutil.rmtree(self.recording_dir)
+
+            os.makedirs(self.recording_dir)
+
+            with open(os.path.join(self.recording_dir, OWNER_FILENAME), "w") as owner_file:
+                owner_file.write(self.worker_name)
+
+        except (IOError, OSError):
+            logging.exception("Recording '{0}' could not be started.".format(self.recording_dir))
+            return
+
+        self.manifest = {
+            "navscraper": "{module}.{name}".format(
+                module=navscraper.__class__.__module__,
+                name=navscraper.__class__.__name__
+            ),
+            "entry_uri": navscraper.ENTRY_URI,
+            "worker": self.worker_name,
+            "fp_id": fingerprint_id,
+            "search_parameters": search_parameters,
+            "steps": [],
+            "rows": None,
+        }
+
+    def get_page_script(self):
+        ##
+        #   Returns the code that has to be injected into every document of
+        #   the scan, see XHR_RECORDER_SCRIPT.
+        #
+        #   @return {string} None if the scan is not recorded.
+        #
+
+        if self.manifest is None:
+            return None
+
+        return XHR_RECORDER_SCRIPT
+
+    def record_step(self, driver, step):
+        ##
+        #   Saves the current page and the XHR responses of the current
+        #   document since the last step.
+        #
+        #   @param {selenium.webdriver} driver - Webdriver instance.
+        #   @param {string} step - Name of the step, e.g. "entry".
+        #
+
+        if self.manifest is None:
+            return
+
+        try:
+            page_filename = "{index:02d}_{step}.html".format(
+                index=len(self.manifest["steps"]) + 1, step=step)
+
+            with open(os.path.join(self.recording_dir, page_filename), "w") as page_file:
+                page_file.write(driver.page_source.encode("utf-8"))
+
+            self.manifest["steps"].append({
+                "step": step,
+                "url": driver.current_url,
+                "page": page_filename,
+                "xhr": driver.execute_script(XHR_COLLECTOR_SCRIPT) or [],
+            })
+
+        except:
+            logging.exception("Recording of step '{0}' failed.".format(step))
+
+    def finish(self, rows=None):
+        ##
+        #   Saves the manifest of the scan.
+        #
+        #   @param {list} rows - (optional) Scraped rows.
+        #
+
+        if self.manifest is None:
+            return
+
+        self.manifest["rows"] = rows
+
+        try:
+            with open(os.path.join(self.recording_dir, MANIFEST_FILENAME), "w") as manifest_file:
+                json.dump(self.manifest, manifest_file, default=str, indent=1)
+
+        except:
+            logging.exception("Manifest of the recording could not be written.")
+
+        self.manifest = None
+
+
+class ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class ReplayServer:
+    ##
+    #   ReplayServer serves a single recording over HTTP.
+    #
+
+    def __init__(self, recording_dir, host="127.0.0.1", port=0):
+        ##
+        #
+        #   @param {string} recording_dir - Directory of the recording.
+        #   @param {string} host - (optional) Address of the server.
+        #   @param {int} port - (optional) Port of the server. 0 chooses a
+        #   free port.
+        #
+
+        self.recording_dir = recording_dir
+        self.manifest = load_recording(recording_dir)
+
+        # Responses by the normalized URL, by the path of the URL and by the
+        # path below /replay/. A response is a tuple (status, content type,
+        # body).
+        self.responses_by_url = {}
+        self.responses_by_path = {}
+        self.step_responses = {}
+
+        for step in self.manifest["steps"]:
+
+            with open(os.path.join(recording_dir, step["page"]), "r") as page_file:
+                response = (200, "text/html; charset=utf-8", page_file.read())
+
+            self.step_responses["/replay/" + step["step"]] = response
+            self._add_response(step["url"], response)
+
+            for xhr in step["xhr"]:
+                self._add_response(xhr["url"], (
+                    xhr.get("status") or 200,
+                    xhr.get("content_type") or "text/plain",
+                    (xhr.get("body") or u"").encode("utf-8")
+                ))
+
+        self.http_server = ThreadingHTTPServer((host, port), ReplayRequestHandler)
+        self.http_server.replay_server = self
+        self.host, self.port = self.http_server.server_address
+        self.thread = None
+
+    def _add_response(self, url, response):
+
+        normalized_url = normalize_url(url)
+
+        # The first response of a URL is kept, like the first request of the
+        # recorded scan got it.
+        self.responses_by_url.setdefault(normalized_url, response)
+        self.responses_by_path.setdefault("/" + normalized_url.split("/", 1)[-1], response)
+
+    def get_response(self, request_path):
+        ##
+        #   Finds the recorded response of a request.
+        #
+        #   @param {string} request_path - Path of the request, or the
+        #   absolute URL if the server is used as proxy.
+        #
+        #   @return {tuple} (status, content type, body) or None.
+        #
+
+        if request_path.startswith("/replay/"):
+            return self.step_responses.get(urllib.unquote(request_path.split("?")[0]))
+
+        if "://" in request_path:
+            return self.responses_by_url.get(normalize_url(request_path))
+
+        return self.responses_by_path.get(request_path)
+
+    def get_step_url(self, step):
+        ##
+        #   Returns the URL of a recorded step.
+        #
+        #   @param {string} step - Name of the step, e.g. "results".
+        #
+        #   @return {string}
+        #
+
+        return "http://{host}:{port}/replay/{step}".format(host=self.host, port=self.port, step=step)
+
+    def get_proxy_address(self):
+
+        return "{host}:{port}".format(host=self.host, port=self.port)
+
+    def start(self):
+        ##
+        #   Starts the server thread.
+        #
+
+        self.thread = threading.Thread(name="Replay Server", target=self.http_server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        ##
+        #   Stops the server thread.
+        #
+
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+
+class ReplayRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+
+        response = self.server.replay_server.get_response(self.path)
+
+        if response is None:
+            logging.debug("Replay: No recorded response for '{0}'".format(self.path))
+            self.send_error(404)
+            return
+
+        status, content_type, body = response
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+
+        # Recorded XHR responses are matched by their URL only.
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.do_GET()
+
+    def do_CONNECT(self):
+        # HTTPS is not replayed. Refusing it keeps the browser offline.
+        self.send_error(501)
+
+    def log_message(self, format, *args):
+        logging.debug("Replay request: " + format % args)
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module stores the results of the workers in local spool files, so
+#   that the scan loop does not wait for the database and an outage of the
+#   database does not lose results. If SPOOL_DIR is set, the SpoolWriter
+#   replaces the ResultWriter of the DBManager. The rows are appended to the
+#   segment files of the run:
+#
+#   <spool dir>/<run name>/<host>_<timestamp>_<pid>_<n>.open   (written)
+#   <spool dir>/<run name>/<host>_<timestamp>_<pid>_<n>.seg    (sealed)
+#   <spool dir>/<run name>/<host>_<timestamp>_<pid>_<n>.done   (loaded)
+#
+#   Every record of a segment is a JSON list [rows, task states], prefixed
+#   with its length as 4 byte unsigned integer (big endian). A record that
+#   was cut off by a crash is recognized by its length and skipped.
+#
+#   The SpoolIngestor loads the sealed segments into the database with
+#   LOAD DATA LOCAL INFILE (see DBManager.load_segment()) and marks them as
+#   done.
+#
+#   @date   18.10.2026
+#
+
+import os
+import json
+import glob
+import time
+import socket
+import struct
+import logging
+import datetime
+import threading
+import itertools
+import Queue
+
+
+SEGMENT_OPEN_SUFFIX = ".open"
+SEGMENT_SEALED_SUFFIX = ".seg"
+SEGMENT_DONE_SUFFIX = ".done"
+
+# Length prefix of a record.
+RECORD_HEADER = struct.Struct(">I")
+
+# Numbers the segments of a process.
+_segment_counter = itertools.count(1)
+
+
+class SpoolWriter(threading.Thread):
+    ##
+    #   SpoolWriter is a background thread that appends the result rows and
+    #   task states of a DBManager to the spool segments of the run. It has
+    #   the interface of the ResultWriter. The segment is synced to the disk
+    #   in batches and sealed when it is full or old enough, so that the
+    #   ingestion can load it.
+    #
+
+    def __init__(self, spool_dir, fsync_rows, fsync_seconds, segment_rows, segment_seconds):
+        ##
+        #
+        #   @param {string} spool_dir - Spool directory of the run.
+        #   @param {int} fsync_rows - Number of unsynced rows and task states
+        #   that trigger a sync.
+        #   @param {float} fsync_seconds - Maximal number of seconds that a
+        #   record stays unsynced.
+        #   @param {int} segment_rows - Number of rows that seal a segment.
+        #   @param {float} segment_seconds - Maximal age of a segment in
+        #   seconds.
+        #
+
+        threading.Thread.__init__(self, name="SpoolWriter")
+        self.daemon = True
+
+        self.spool_dir = spool_dir
+        self.fsync_rows = fsync_rows
+        self.fsync_seconds = fsync_seconds
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.record_queue = Queue.Queue()
+
+        # State of the open segment.
+        self.segment_file = None
+        self.segment_filename = None
+        self.segment_start_time = None
+        self.segment_row_count = 0
+        self.unsynced_count = 0
+        self.last_sync_time = None
+
+        if not os.path.isdir(spool_dir):
+            try:
+                os.makedirs(spool_dir)
+            except OSError:
+                # Created by another worker.
+                pass
+
+    def put(self, rows, task_states=[]):
+        ##
+        #   Hands rows over to the writer.
+        #
+        #   @param {list} rows - List of row tuples of
+        #   DBManager.write_results().
+        #   @param {list} task_states - (optional) List of row tuples for the
+        #   scan ledger.
+        #
+
+        self.record_queue.put((rows, task_states))
+
+    def stop(self):
+        ##
+        #   Writes all queued records, seals the segment and waits for the
+        #   thread to finish.
+        #
+
+        self.record_queue.put(None)
+        self.join()
+
+    def run(self):
+
+        while True:
+
+            # Wake up regularly while a segment is open, so that it is synced
+            # and sealed in time.
+            if self.segment_file is not None:
+                timeout = 1.0
+            else:
+                timeout = None
+
+            try:
+                item = self.record_queue.get(timeout=timeout)
+
+            except Queue.Empty:
+                item = ([], [])
+
+            if item is None:
+                # Stop marker of the stop() method.
+                break
+
+            rows, task_states = item
+
+            try:
+                if len(rows) > 0 or len(task_states) > 0:
+                    self._append(rows, task_states)
+
+                if self.segment_file is not None:
+
+                    if self.unsynced_count >= self.fsync_rows or \
+                            (self.unsynced_count > 0 and time.time() - self.last_sync_time >= self.fsync_seconds):
+                        self._sync()
+
+                    if self.segment_row_count >= self.segment_rows or \
+                            time.time() - self.segment_start_time >= self.segment_seconds:
+                        self._seal()
+
+            except:
+                logging.exception("Unable to spool {num} result rows.".format(num=len(rows)))
+
+        if self.segment_file is not None:
+            try:
+                self._seal()
+
+            except:
+                logging.exception("Unable to seal the spool segment '{0}'.".format(self.segment_filename))
+
+    def _append(self, rows, task_states):
+
+        if self.segment_file is None:
+            self._open_segment()
+
+        record = json.dumps([rows, task_states], default=_json_default)
+
+        self.segment_file.write(RECORD_HEADER.pack(len(record)) + record)
+
+        self.segment_row_count += len(rows)
+        self.unsynced_count += len(rows) + len(task_states)
+
+    def _open_segment(self):
+
+        segment_name = "{host}_{timestamp}_{pid}_{number}".format(
+            host=socket.gethostname().replace("_", "-"),
+            timestamp=time.strftime("%Y%m%d%H%M%S", time.gmtime()),
+            pid=os.getpid(),
+            number=next(_segment_counter)
+        )
+
+        self.segment_filename = os.path.join(self.spool_dir, segment_name + SEGMENT_OPEN_SUFFIX)
+        self.segment_file = open(self.segment_filename, "ab")
+        self.segment_start_time = time.time()
+        self.segment_row_count = 0
+        self.unsynced_count = 0
+        self.last_sync_time = time.time()
+
+    def _sync(self):
+
+        self.segment_file.flush()
+        os.fsync(self.segment_file.fileno())
+
+        self.unsynced_count = 0
+        self.last_sync_time = time.time()
+
+    def _seal(self):
+        ##
+        #   Syncs and closes the segment and hands it over to the ingestion.
+        #
+
+        self._sync()
+        self.segment_file.close()
+
+        os.rename(
+            self.segment_filename,
+            self.segment_filename[:-len(SEGMENT_OPEN_SUFFIX)] + SEGMENT_SEALED_SUFFIX
+        )
+
+        self.segment_file = None
+        self.segment_filename = None
+
+
+class SpoolIngestor(threading.Thread):
+    ##
+    #   SpoolIngestor is a background thread that loads the sealed segments
+    #   of a run into the database every interval. If the database is not
+    #   available, the segments stay in the spool and are loaded by a later
+    #   pass.
+    #
+
+    def __init__(self, db_manager, spool_dir, interval):
+        ##
+        #
+        #   @param {DBManager} db_manager - Database manager in the 'ingest'
+        #   mode.
+        #   @param {string} spool_dir - Spool directory of the run.
+        #   @param {float} interval - Number of seconds between two passes.
+        #
+
+        threading.Thread.__init__(self, name="SpoolIngestor")
+        self.daemon = True
+
+        self.db_manager = db_manager
+        self.spool_dir = spool_dir
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        ##
+        #   Loads the remaining segments and waits for the thread to finish.
+        #   Has to be called after the workers finished, because the
+        #   segments that are still open are loaded as well.
+        #
+
+        self.stop_event.set()
+        self.join()
+
+    def run(self):
+
+        while not self.stop_event.wait(self.interval):
+            self.ingest()
+
+        self.ingest(include_open=True)
+
+    def ingest(self, include_open=False):
+        ##
+        #   Loads the segments of the spool directory. A pass stops at the
+        #   first segment that can not be loaded.
+        #
+        #   @param {bool} include_open - (optional) If True, the segments that
+        #   were not sealed are loaded as well, e.g. of crashed workers.
+        #
+        #   @return {int} Number of loaded segments.
+        #
+
+        loaded_segments = 0
+
+        for segment_filename in get_segment_filenames(self.spool_dir, include_open):
+
+            segment_name = os.path.splitext(os.path.basename(segment_filename))[0]
+
+            try:
+                rows, task_states = read_segment(segment_filename)
+
+                if not self.db_manager.load_segment(segment_name, rows, task_states):
+                    logging.warning("The spool segment '{0}' was loaded before.".format(segment_name))
+
+                os.rename(segment_filename, os.path.join(self.spool_dir, segment_name + SEGMENT_DONE_SUFFIX))
+
+            except:
+                logging.exception("Unable to load the spool segment '{0}'.".format(segment_name))
+                break
+
+            logging.debug("Spool segment '{0}' loaded: {1} rows.".format(segment_name, len(rows)))
+            loaded_segments += 1
+
+        return loaded_segments
+
+
+def write_segment(spool_dir, rows, task_states):
+    ##
+    #   Writes rows and task states into a new sealed segment at once, e.g.
+    #   a batch that could not be written to the database.
+    #
+    #   @param {string} spool_dir - Spool directory of the run.
+    #   @param {list} rows - List of row tuples of DBManager.write_results().
+    #   @param {list} task_states - List of row tuples for the scan ledger.
+    #
+    #   @return {string} File name of the segment.
+    #
+
+    spool_writer = SpoolWriter(
+        spool_dir=spool_dir,
+        fsync_rows=0,
+        fsync_seconds=0,
+        segment_rows=0,
+        segment_seconds=0
+    )
+
+    spool_writer._append(rows, task_states)
+    segment_filename = spool_writer.segment_filename[:-len(SEGMENT_OPEN_SUFFIX)] + SEGMENT_SEALED_SUFFIX
+    spool_writer._seal()
+
+    return segment_filename
+
+
+def get_run_spool_dir(spool_dir, run_name):
+
+    return os.path.join(spool_dir, run_name)
+
+
+def get_segment_filenames(spool_dir, include_open=False):
+    ##
+    #   Returns the segments of a spool directory, which are not loaded yet,
+    #   in the order they were started.
+    #
+    #   @param {string} spool_dir - Spool directory of the run.
+    #   @param {bool} include_open - (optional) If True, the segments that
+    #   were not sealed are returned as well.
+    #
+    #   @return {list} File names.
+    #
+
+    suffixes = [SEGMENT_SEALED_SUFFIX]
+    if include_open:
+        suffixes.append(SEGMENT_OPEN_SUFFIX)
+
+    segment_filenames = []
+    for suffix in suffixes:
+        segment_filenames.extend(glob.glob(os.path.join(spool_dir, "*" + suffix)))
+
+    return sorted(segment_filenames)
+
+
+def read_segment(segment_filename):
+    ##
+    #   Reads the records of a segment.
+    #
+    #   @param {string} segment_filename - File name of the segment.
+    #
+    #   @return {list} Row tuples of DBManager.write_results(), {list} row
+    #   tuples for the scan ledger.
+    #
+
+    rows = []
+    task_states = []
+
+    with open(segment_filename, "rb") as segment_file:
+
+        while True:
+
+            header = segment_file.read(RECORD_HEADER.size)
+
+            if len(header) == 0:
+                break
+
+            record = None
+            if len(header) == RECORD_HEADER.size:
+                record_length, = RECORD_HEADER.unpack(header)
+                record = segment_file.read(record_length)
+
+                if len(record) < record_length:
+                    record = None
+
+            if record is None:
+                # The last record was cut off by a crash of the worker.
+                logging.warning("Skipped an incomplete record of the spool segment '{0}'.".format(segment_filename))
+                break
+
+            record_rows, record_task_states = json.loads(record)
+
+            rows.extend(restore_row(row) for row in record_rows)
+            task_states.extend(tuple(task_state) for task_state in record_task_states)
+
+    return rows, task_states
+
+
+def restore_row(row):
+    ##
+    #   Converts a row of a JSON record back into the row tuple of
+    #   DBManager.write_results(). The values of the dimensions are tuples.
+    #
+
+    return tuple(tuple(value) if isinstance(value, list) else value for value in row)
+
+
+def _json_default(value):
+
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+
+    raise TypeError("{0!r} is not JSON serializable".format(value))
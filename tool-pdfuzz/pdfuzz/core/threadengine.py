@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##
+#   This module contains an alternative fuzzing engine, which drives all
+#   webdriver sessions from a single process. Every session is handled by a
+#   thread. A WebDriver call is a blocking HTTP request, which releases the
+#   interpreter lock while it waits for the browser. So one process can keep
+#   many sessions busy without the memory and fork overhead of the process
+#   tree of the fuzzengine.
+#
+#   @date   18.10.2026
+#
+
+import logging
+import threading
+import Queue
+
+# Import the module before the threads start, because the first import of
+# strptime in concurrent threads is not thread-safe in Python 2.
+import _strptime
+
+import pdfuzz.config.config as cfg
+import pdfuzz.core.fuzzengine as fuzzengine
+import pdfuzz.core.fpfuzzer as fpfuzzer
+import pdfuzz.core.db_connection as db_connection
+
+
+def start_fuzzing(cl_settings, search_parameters_id):
+    ##
+    #   The function represents the main-routine of the thread engine.
+    #
+    #   @param {argparse.results} cl_settings - Object of parsed parameters
+    #   from the commandline.
+    #   @param {int} search_parameters_id - Database id of the search
+    #   parameters entry.
+    #
+
+    navscraper_list, phwd_manager, phantom_wrapper_list, rate_limiter, health_monitor, metrics_collector = \
+        fuzzengine.init_fuzzing(cl_settings=cl_settings)
+
+    # ----- MAIN Routine -----
+    print("[*] Start Fuzzing..")
+    logging.info("Start Fuzzing..")
+
+    # Every local webdriver server scans all fingerprints on its own. The
+    # webdriver servers of a VM share the fingerprints of the VM.
+    phantom_wrapper_sets = [[phantom_wrapper_info] for phantom_wrapper_info in phantom_wrapper_list["local"]]
+    phantom_wrapper_sets.extend(phantom_wrapper_list["vm"])
+
+    worker_list = []
+
+    for phantom_wrapper_set in phantom_wrapper_sets:
+
+        worker_list.extend(start_workers(
+            phantom_wrapper_set=phantom_wrapper_set,
+            navscraper_list=navscraper_list,
+            search_parameters_id=search_parameters_id,
+            cl_settings=cl_settings,
+            rate_limiter=rate_limiter,
+            health_monitor=health_monitor,
+            metrics_collector=metrics_collector
+        ))
+
+    health_monitor.start()
+    metrics_collector.start()
+    spool_ingestor = fuzzengine.start_spool_ingestor(cl_settings=cl_settings)
+
+    print("[**] {num} sessions are driven by one process.".format(num=len(worker_list)))
+    logging.info("{num} sessions are driven by one process.".format(num=len(worker_list)))
+
+    # Waiting for all threads. A timeout keeps the main thread responsive
+    # to KeyboardInterrupt.
+    for worker in worker_list:
+        while worker.is_alive():
+            worker.join(1)
+
+    health_monitor.stop()
+    metrics_collector.stop()
+
+    if spool_ingestor is not None:
+        # Load the remaining spool segments.
+        spool_ingestor.stop()
+
+    print("[*] Finished")
+    logging.info("[*] Finished")
+
+
+def start_workers(phantom_wrapper_set, navscraper_list, search_parameters_id, cl_settings, rate_limiter, health_monitor, metrics_collector):
+    ##
+    #   Fills the task queues of a set of webdriver servers and starts a
+    #   worker thread for each server.
+    #
+    #   @param {list} phantom_wrapper_set - Information about the webdriver
+    #   servers that share their tasks.
+    #   @param {list} navscraper_list - List that holds the various NavScraper
+    #   classes.
+    #   @param {int} search_parameters_id - Database id of the search
+    #   parameters entry.
+    #   @param {argparse.results} cl_settings - Object of parsed parameters
+    #   from the commandline.
+    #   @param {ratelimiter.HostRateLimiter} rate_limiter - Rate limiter that
+    #   is shared by all workers.
+    #   @param {healthmonitor.EndpointHealthMonitor} health_monitor - Health
+    #   monitor of the webdriver servers.
+    #   @param {metrics.MetricsCollector} metrics_collector - Collector of
+    #   the live metrics.
+    #
+    #   @return {list} Started threads.
+    #
+
+    # Init database connection
+    db_manager = db_connection.DBManager(
+        settings=cfg.MYSQL,
+        mode="fuzzing_read",
+        website_type=cl_settings.target_website_type,
+        run_name=cl_settings.result_table_name
+    )
+
+    # Tasks of this run that were completed before a restart.
+    completed_tasks = db_manager.get_completed_tasks(
+        worker_country=phantom_wrapper_set[0]["country"])
+
+    task_queues = fuzzengine.create_task_queues(
+        navscraper_list=navscraper_list,
+        target_website_type=cl_settings.target_website_type,
+        queue_class=Queue.Queue
+    )
+
+    # Events to tell all workers of this set that a website has to be
+    # skipped, because its timeout limit is reached.
+    skip_events = [threading.Event() for _ in navscraper_list]
+
+    worker_list = []
+
+    for phantom_wrapper_index, phantom_wrapper_info in enumerate(phantom_wrapper_set):
+
+        # The worker name starts with the country, like the process names
+        # of the fuzzengine.
+        thread = threading.Thread(
+            name="{} (thread {}:{})".format(
+                phantom_wrapper_info["country"],
+                phantom_wrapper_info["ip"],
+                phantom_wrapper_info["port"]
+            ),
+            target=fuzzengine.inner_fuzzing_vm,
+            args=(phantom_wrapper_info, copy_navscraper_list(navscraper_list),
+                  search_parameters_id, cl_settings, task_queues, skip_events,
+                  rate_limiter, health_monitor, metrics_collector,)
+        )
+        thread.daemon = True
+        worker_list.append(thread)
+        thread.start()
+
+    # Stream the fingerprints into the task queues while the workers consume
+    # them. The feeders read the fingerprints through the database manager.
+    fuzzengine.start_task_feeders(
+        task_queues=task_queues,
+        navscraper_list=navscraper_list,
+        load_fingerprints=lambda: fpfuzzer.load_fingerprints(
+            db_manager=db_manager,
+            timezone_offset=phantom_wrapper_set[0]["timezone_offset"]
+        ),
+        num_workers=len(phantom_wrapper_set),
+        skip_events=skip_events,
+        completed_tasks=completed_tasks
+    )
+
+    return worker_list
+
+
+def copy_navscraper_list(navscraper_list):
+    ##
+    #   Returns a copy of the navscraper list for a single thread. The
+    #   NavScrapers keep the state of a scan, like the search parameters and
+    #   the waiting times, on their instances and classes. copy.deepcopy()
+    #   does not copy classes, so every class is replaced by a subclass of its
+    #   own. Thus the threads never share the state of their NavScrapers.
+    #
+    #   @param {list} navscraper_list - List that holds the various NavScraper
+    #   classes.
+    #
+    #   @return {list}
+    #
+
+    return [
+        type(navscraper_class)(
+            navscraper_class.__name__,
+            (navscraper_class,),
+            {"__module__": navscraper_class.__module__}
+        )
+        for navscraper_class in navscraper_list
+    ]
+
@@ -27,4 +27,143 @@ class text_to_be_not_present_in_element(object):
             element_text = EC._find_element(driver, self.locator).text.encode("utf-8")
             return self.text not in element_text
         except StaleElementReferenceException:
-            return False
\ No newline at end of file
+            return False
+
+# Installs a counter of the pending XMLHttpRequests in the page. It is part of
+# the injection code of every scan, so the requests are counted from the start
+# of every document, also the ones that are started by the action before a
+# wait.
+NETWORK_MONITOR_INSTALL_SCRIPT = '''
+    if (!window.__pdfuzzNetworkMonitor) {
+        var monitor = window.__pdfuzzNetworkMonitor = {
+            pending: 0,
+            lastActivity: new Date().getTime()
+        };
+        var send = XMLHttpRequest.prototype.send;
+
+        XMLHttpRequest.prototype.send = function () {
+            var request = this;
+            var finished = false;
+
+            monitor.pending++;
+            monitor.lastActivity = new Date().getTime();
+
+            request.addEventListener("readystatechange", function () {
+                if (request.readyState === 4 && !finished) {
+                    finished = true;
+                    monitor.pending--;
+                    monitor.lastActivity = new Date().getTime();
+                }
+            });
+
+            return send.apply(request, arguments);
+        };
+    }
+'''
+
+# Returns the number of pending XMLHttpRequests and the milliseconds since the
+# last request started or finished. The counter is installed, if the page was
+# loaded without the injection code.
+NETWORK_MONITOR_SCRIPT = NETWORK_MONITOR_INSTALL_SCRIPT + '''
+    return [
+        window.__pdfuzzNetworkMonitor.pending,
+        new Date().getTime() - window.__pdfuzzNetworkMonitor.lastActivity,
+        document.readyState
+    ];
+'''
+
+# Installs an observer of the DOM tree and returns the milliseconds since the
+# last change of the tree. Without MutationObserver the number of elements is
+# compared between the calls.
+DOM_MONITOR_SCRIPT = '''
+    if (!window.__pdfuzzDomMonitor) {
+        var monitor = window.__pdfuzzDomMonitor = {
+            size: -1,
+            lastMutation: new Date().getTime()
+        };
+        var Observer = window.MutationObserver || window.WebKitMutationObserver;
+
+        if (Observer) {
+            new Observer(function () {
+                monitor.lastMutation = new Date().getTime();
+            }).observe(document.documentElement, {
+                childList: true,
+                subtree: true,
+                characterData: true
+            });
+        }
+    }
+
+    var monitor = window.__pdfuzzDomMonitor;
+    var size = document.getElementsByTagName("*").length;
+
+    if (size !== monitor.size) {
+        monitor.size = size;
+        monitor.lastMutation = new Date().getTime();
+    }
+
+    return new Date().getTime() - monitor.lastMutation;
+'''
+
+
+class network_to_be_idle(object):
+    """ An expectation for checking that the page is loaded and no
+    XMLHttpRequest was pending for the given number of seconds.
+    idle_time
+    """
+    def __init__(self, idle_time):
+        self.idle_time = idle_time
+
+    def __call__(self, driver):
+        pending, idle_milliseconds, ready_state = \
+            driver.execute_script(NETWORK_MONITOR_SCRIPT)
+        return ready_state == "complete" and pending <= 0 and \
+            idle_milliseconds >= self.idle_time * 1000
+
+
+class dom_to_be_settled(object):
+    """ An expectation for checking that the DOM tree was not changed for the
+    given number of seconds.
+    quiet_time
+    """
+    def __init__(self, quiet_time):
+        self.quiet_time = quiet_time
+
+    def __call__(self, driver):
+        quiet_milliseconds = driver.execute_script(DOM_MONITOR_SCRIPT)
+        return quiet_milliseconds >= self.quiet_time * 1000
+
+
+class number_of_elements_to_be_more_than(object):
+    """ An expectation for checking that more than the given number of
+    elements are present in the page. Returns the elements.
+    locator, number
+    """
+    def __init__(self, locator, number):
+        self.locator = locator
+        self.number = number
+
+    def __call__(self, driver):
+        elements = EC._find_elements(driver, self.locator)
+        if len(elements) > self.number:
+            return elements
+        return False
+
+
+class visibility_of_any_element_located(object):
+    """ An expectation for checking that at least one of the elements is
+    visible. Returns the first visible element.
+    locators
+    """
+    def __init__(self, locators):
+        self.locators = locators
+
+    def __call__(self, driver):
+        for locator in self.locators:
+            try:
+                for element in EC._find_elements(driver, locator):
+                    if element.is_displayed():
+                        return element
+            except StaleElementReferenceException:
+                continue
+        return False
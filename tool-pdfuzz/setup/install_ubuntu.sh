@@ -1,3 +1,3 @@
 sudo apt-get install python python-pip python-mysqldb
 sudo pip install --upgrade pip
-sudo pip install selenium jsmin jinja2 beautifulsoup4 pytz requests MySQLdb
+sudo pip install selenium jsmin jinja2 beautifulsoup4 lxml cssselect pytz requests MySQLdb